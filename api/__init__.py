@@ -12,8 +12,12 @@ from .routes.ontology_routes import api as ontology_ns
 from .routes.document_routes import api as document_ns
 from .routes.error_checking_routes import api as error_checking_ns
 from .routes.analysis_routes import api as analysis_ns
+from .routes.job_routes import api as jobs_ns
+from .routes.profile_routes import api as profiles_ns
 
 api.add_namespace(ontology_ns, path='/ontology')
 api.add_namespace(document_ns, path='/document')
 api.add_namespace(error_checking_ns, path='/error_checking')
-api.add_namespace(analysis_ns, path='/analysis')
\ No newline at end of file
+api.add_namespace(analysis_ns, path='/analysis')
+api.add_namespace(jobs_ns, path='/jobs')
+api.add_namespace(profiles_ns, path='/profiles')
\ No newline at end of file
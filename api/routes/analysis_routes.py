@@ -1,8 +1,14 @@
+import json
+import os
+import tempfile
+import zipfile
+from flask import Response
 from flask_restx import Namespace, Resource, fields
 from werkzeug.datastructures import FileStorage
-from services.ontology_processor import OntologyProcessor
-from services.document_processor import DocumentProcessor
-from services.error_checker import ErrorChecker
+from api.uploads import load_ontology
+from services.analysis_processor import AnalysisProcessor
+from services.batch_analyzer import BatchAnalyzer, CHECKS
+from services.single_flight import SingleFlight
 
 api = Namespace('analysis', description='Combined analysis operations')
 
@@ -10,6 +16,12 @@ analysis_upload = api.parser()
 analysis_upload.add_argument('ontology', location='files', type=FileStorage, required=True)
 analysis_upload.add_argument('document', location='files', type=FileStorage, required=True)
 
+batch_upload = api.parser()
+batch_upload.add_argument('ontologies', location='files', type=FileStorage, required=True,
+                          help='Zip archive of ontology files')
+batch_upload.add_argument('check', location='args', action='append', choices=sorted(CHECKS), default=[],
+                          help='Error checker to run on every file (repeatable)')
+
 prock_error_model = api.model('PROCKError', {
     'name': fields.String(description='Name of the error'),
     'candidates': fields.List(fields.Raw(description='Error candidates'))
@@ -29,7 +41,8 @@ ontology_analysis_model = api.model('OntologyAnalysis', {
     'competency_questions': fields.List(fields.String, description='List of competency questions'),
     'ontology_metrics': fields.Raw(description='Metrics of the ontology'),
     'prock_errors': fields.List(fields.Nested(prock_error_model), description='PROCK errors'),
-    'oops_errors': fields.List(fields.Nested(oops_error_model), description='OOPS! errors')
+    'oops_errors': fields.List(fields.Nested(oops_error_model), description='OOPS! errors'),
+    'stage_timings': fields.Raw(description='Wall-clock seconds spent in each analysis stage')
 })
 
 @api.route('/analyze_ontology')
@@ -38,39 +51,60 @@ class AnalyzeOntologyResource(Resource):
     @api.expect(analysis_upload)
     @api.response(200, 'Success', ontology_analysis_model)
     @api.response(400, 'Validation Error')
+    @api.response(413, 'Upload too large')
     @api.response(500, 'Internal Server Error')
     def post(self):
         args = analysis_upload.parse_args()
-        ontology_file = args['ontology']
         document_file = args['document']
 
-        if not ontology_file.filename.endswith('.ttl'):
-            api.abort(400, "Ontology file must be in Turtle format (.ttl)")
+        ontology = load_ontology(args['ontology'])
 
         if not document_file.filename.endswith('.pdf'):
             api.abort(400, "Document file must be in PDF format (.pdf)")
 
-        # Process ontology
-        metrics, ontology_error = OntologyProcessor.process_ontology(ontology_file)
-        if ontology_error:
-            api.abort(500, f"Error processing ontology: {ontology_error}")
-
-        # Process document
-        document_data, document_error = DocumentProcessor.process_document(document_file)
-        if document_error:
-            api.abort(500, f"Error processing document: {document_error}")
-
-        # Perform error checks
-        prock_errors = ErrorChecker.check_prock(ontology_file)
-        oops_errors = ErrorChecker.check_oops(ontology_file)
-
-        result = {
-            "ontology_description": document_data.get('ontology_description', ''),
-            "application_domain": document_data.get('application_domain', ''),
-            "competency_questions": document_data.get('competency_questions', []),
-            "ontology_metrics": metrics,
-            "prock_errors": prock_errors,
-            "oops_errors": oops_errors
-        }
-
-        return result
\ No newline at end of file
+        result, error = AnalysisProcessor.analyze(ontology, document_file)
+        if error:
+            api.abort(500, error)
+
+        return result
+
+@api.route('/batch')
+class BatchAnalysisResource(Resource):
+    @api.doc(description='Compute metrics (and optionally error checks) for every ontology in a zip archive. '
+                         'Streams one JSON line per ontology as it completes.')
+    @api.expect(batch_upload)
+    @api.produces(['application/x-ndjson'])
+    @api.response(200, 'Success')
+    @api.response(400, 'Validation Error')
+    def post(self):
+        args = batch_upload.parse_args()
+        archive_file = args['ontologies']
+
+        if not archive_file.filename.endswith('.zip'):
+            api.abort(400, "Ontologies must be uploaded as a zip archive (.zip)")
+
+        # Pool processes reopen the archive by path, so it has to live on disk
+        fd, archive_path = tempfile.mkstemp(suffix='.zip')
+        with os.fdopen(fd, 'wb') as f:
+            archive_file.save(f)
+        if not zipfile.is_zipfile(archive_path):
+            os.remove(archive_path)
+            api.abort(400, "Uploaded file is not a valid zip archive")
+
+        def generate():
+            for record in BatchAnalyzer.run(archive_path, args['check']):
+                record["filepath"] = record["filepath"][len(archive_path) + 1:]
+                yield json.dumps(record) + "\n"
+
+        # The server closes the response once the body is sent, the client
+        # disconnects or the body is never read, and the archive goes with it
+        response = Response(generate(), mimetype='application/x-ndjson')
+        response.call_on_close(lambda: os.remove(archive_path))
+        return response
+
+@api.route('/in_flight')
+class InFlightResource(Resource):
+    @api.doc(description='Computations in progress per operation and the identical requests waiting on them')
+    @api.response(200, 'Success')
+    def get(self):
+        return [flight.stats() for flight in SingleFlight.instances]
@@ -1,7 +1,8 @@
-from flask_restx import Resource, fields
+from flask_restx import Namespace, Resource, fields
 from werkzeug.datastructures import FileStorage
 from services.document_processor import DocumentProcessor
-from api import api
+
+api = Namespace('document', description='Document extraction operations')
 
 document_upload = api.parser()
 document_upload.add_argument('document', location='files', type=FileStorage, required=True)
@@ -9,7 +10,8 @@ document_upload.add_argument('document', location='files', type=FileStorage, req
 document_extract_model = api.model('DocumentExtract', {
     'ontology_description': fields.String(description='Description of the ontology'),
     'application_domain': fields.String(description='Application domain of the ontology'),
-    'competency_questions': fields.List(fields.String, description='List of competency questions')
+    'competency_questions': fields.List(fields.String, description='List of competency questions'),
+    'timings': fields.Raw(description='Seconds spent per processing step')
 })
 
 @api.route('/extract_document')
@@ -31,4 +33,11 @@ class ExtractDocumentResource(Resource):
         if error:
             api.abort(500, f"Error processing document: {error}")
         
-        return result
\ No newline at end of file
+        return result
+
+@api.route('/llm_cache')
+class LlmCacheResource(Resource):
+    @api.doc(description='Hit ratio and LLM time saved by the completion cache of this process')
+    @api.response(200, 'Success')
+    def get(self):
+        return DocumentProcessor.cache_stats()
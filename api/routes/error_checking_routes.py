@@ -1,5 +1,6 @@
 from flask_restx import Resource, fields, Namespace
 from werkzeug.datastructures import FileStorage
+from api.uploads import load_ontology
 from services.error_checker import ErrorChecker
 
 api = Namespace('error_checking', description='Error checking operations')
@@ -26,15 +27,13 @@ class CheckPROCKResource(Resource):
     @api.expect(ontology_upload)
     @api.response(200, 'Success', fields.List(fields.Nested(prock_error_model)))
     @api.response(400, 'Validation Error')
+    @api.response(413, 'Upload too large')
     @api.response(500, 'Internal Server Error')
     def post(self):
         args = ontology_upload.parse_args()
-        ontology_file = args['ontology']
+        ontology = load_ontology(args['ontology'])
         
-        if not ontology_file.filename.endswith('.ttl'):
-            api.abort(400, "Ontology file must be in Turtle format (.ttl)")
-        
-        prock_errors = ErrorChecker.check_prock(ontology_file)
+        prock_errors = ErrorChecker.check_prock(ontology)
         if prock_errors is None:
             api.abort(500, "Error processing ontology with PROCK")
         
@@ -46,15 +45,13 @@ class CheckOOPSResource(Resource):
     @api.expect(ontology_upload)
     @api.response(200, 'Success', fields.List(fields.Nested(oops_error_model)))
     @api.response(400, 'Validation Error')
+    @api.response(413, 'Upload too large')
     @api.response(500, 'Internal Server Error')
     def post(self):
         args = ontology_upload.parse_args()
-        ontology_file = args['ontology']
-        
-        if not ontology_file.filename.endswith('.ttl'):
-            api.abort(400, "Ontology file must be in Turtle format (.ttl)")
+        ontology = load_ontology(args['ontology'])
         
-        oops_errors = ErrorChecker.check_oops(ontology_file)
+        oops_errors = ErrorChecker.check_oops(ontology)
         if oops_errors is None:
             api.abort(500, "Error processing ontology with OOPS!")
         
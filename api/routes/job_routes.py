@@ -0,0 +1,85 @@
+from flask_restx import Namespace, Resource, fields
+from werkzeug.datastructures import FileStorage
+from api.uploads import UNSUPPORTED_ONTOLOGY
+from services.job_queue import JobQueue
+from utils.upload_utils import is_supported_ontology
+
+api = Namespace('jobs', description='Asynchronous analysis jobs')
+
+job_upload = api.parser()
+job_upload.add_argument('ontology', location='files', type=FileStorage, required=False)
+job_upload.add_argument('document', location='files', type=FileStorage, required=False)
+
+job_model = api.model('Job', {
+    'job_id': fields.String(description='Job identifier'),
+    'operation': fields.String(description='Requested operation'),
+    'status': fields.String(description='queued, running, succeeded or failed'),
+    'progress': fields.Float(description='Progress between 0 and 1; analyze_ontology advances by a quarter per finished stage'),
+    'error': fields.String(description='Error message of a failed job'),
+    'created_at': fields.String(description='Submission time (UTC)'),
+    'started_at': fields.String(description='Start of the latest attempt (UTC)'),
+    'finished_at': fields.String(description='Completion time (UTC)'),
+    'expires_at': fields.String(description='Time after which the result is discarded (UTC)')
+})
+
+@api.route('/submit/<string:operation>')
+@api.doc(params={'operation': ', '.join(JobQueue.OPERATIONS)})
+class SubmitJobResource(Resource):
+    @api.doc(description='Queue an analysis operation and return its job id immediately')
+    @api.expect(job_upload)
+    @api.response(202, 'Accepted', job_model)
+    @api.response(400, 'Validation Error')
+    @api.response(413, 'Upload too large')
+    @api.response(404, 'Unknown operation')
+    def post(self, operation):
+        if operation not in JobQueue.OPERATIONS:
+            api.abort(404, f"Unknown operation: {operation}")
+        _, needs_ontology, needs_document = JobQueue.OPERATIONS[operation]
+
+        args = job_upload.parse_args()
+        ontology_file = args['ontology'] if needs_ontology else None
+        document_file = args['document'] if needs_document else None
+
+        if needs_ontology and (ontology_file is None or not is_supported_ontology(ontology_file.filename)):
+            api.abort(400, UNSUPPORTED_ONTOLOGY)
+        if needs_document and (document_file is None or not document_file.filename.endswith('.pdf')):
+            api.abort(400, "Document file must be in PDF format (.pdf)")
+
+        job = JobQueue.submit(operation, ontology_file, document_file)
+        return job.to_dict(), 202
+
+@api.route('/<string:job_id>')
+class JobResource(Resource):
+    @api.doc(description='Get the status and progress of a job')
+    @api.response(200, 'Success', job_model)
+    @api.response(404, 'Job not found')
+    def get(self, job_id):
+        job = JobQueue.get(job_id)
+        if job is None:
+            api.abort(404, f"Job {job_id} not found")
+        return job.to_dict()
+
+    @api.doc(description='Cancel a queued job or discard a finished job and its result')
+    @api.response(204, 'Deleted')
+    @api.response(404, 'Job not found')
+    def delete(self, job_id):
+        if not JobQueue.delete(job_id):
+            api.abort(404, f"Job {job_id} not found")
+        return '', 204
+
+@api.route('/<string:job_id>/result')
+class JobResultResource(Resource):
+    @api.doc(description='Get the result of a finished job')
+    @api.response(200, 'Success')
+    @api.response(404, 'Job not found')
+    @api.response(409, 'Job has not finished yet')
+    @api.response(500, 'Job failed')
+    def get(self, job_id):
+        job = JobQueue.get(job_id)
+        if job is None:
+            api.abort(404, f"Job {job_id} not found")
+        if job.status == job.FAILED:
+            api.abort(500, job.error)
+        if job.status != job.SUCCEEDED:
+            api.abort(409, f"Job {job_id} is {job.status}")
+        return JobQueue.get_result(job)
@@ -1,30 +1,96 @@
-from flask_restx import Resource, fields
+from flask_restx import Namespace, Resource, fields
 from werkzeug.datastructures import FileStorage
+from api.uploads import load_ontology
 from services.ontology_processor import OntologyProcessor
-from api import api
+from services.incremental_metrics import IncrementalMetricsService
+
+api = Namespace('ontology', description='Ontology metrics operations')
 
 ontology_upload = api.parser()
 ontology_upload.add_argument('ontology', location='files', type=FileStorage, required=True)
 
 ontology_metrics_model = api.model('OntologyMetrics', {
+    'ontology_hash': fields.String(description='Identifies this version for /delta and /diff; '
+                                   'omitted when the version cannot be updated incrementally'),
     'ontology_metrics': fields.Raw(description='Metrics of the ontology')
 })
 
+ontology_delta_model = api.model('OntologyDelta', {
+    'added': fields.String(description='Triples to add (Turtle or N-Triples)'),
+    'removed': fields.String(description='Triples to remove (Turtle or N-Triples)'),
+    'format': fields.String(description='RDF format of added and removed', default='turtle')
+})
+
+incremental_metrics_model = api.model('IncrementalMetrics', {
+    'ontology_hash': fields.String(description='Identifies the updated version'),
+    'base_hash': fields.String(description='Version the change was applied to'),
+    'added': fields.Integer(description='Triples added to the ontology'),
+    'removed': fields.Integer(description='Triples removed from the ontology'),
+    'ontology_metrics': fields.Raw(description='Metrics of the updated ontology'),
+    'metrics_diff': fields.Raw(description='Old and new value of every metric that changed')
+})
+
 @api.route('/ontology_metrics')
 class OntologyMetricsResource(Resource):
     @api.doc(description='Get metrics for an ontology file')
     @api.expect(ontology_upload)
     @api.response(200, 'Success', ontology_metrics_model)
     @api.response(400, 'Validation Error')
+    @api.response(413, 'Upload too large')
     @api.response(500, 'Internal Server Error')
     def post(self):
         args = ontology_upload.parse_args()
         ontology_file = args['ontology']
         
-        if not ontology_file.filename.endswith('.ttl'):
-            api.abort(400, "Ontology file must be in Turtle format (.ttl)")
-        
-        metrics, error = OntologyProcessor.process_ontology(ontology_file)
+        ontology = load_ontology(ontology_file)
+        metrics, error = OntologyProcessor.process_ontology(ontology)
         if error:
             api.abort(500, f"Error processing ontology: {error}")
+        # Only versions that /delta and /diff can find get a hash
+        if IncrementalMetricsService.has_version(ontology.content_hash):
+            return {"ontology_hash": ontology.content_hash, "ontology_metrics": metrics}
         return {"ontology_metrics": metrics}
+
+@api.route('/<string:ontology_hash>/delta')
+class OntologyDeltaResource(Resource):
+    @api.doc(description='Add and remove triples from a previously analyzed ontology and get its updated metrics')
+    @api.expect(ontology_delta_model)
+    @api.response(200, 'Success', incremental_metrics_model)
+    @api.response(400, 'Validation Error')
+    @api.response(404, 'Unknown ontology version')
+    @api.response(500, 'Internal Server Error')
+    def post(self, ontology_hash):
+        if not IncrementalMetricsService.has_version(ontology_hash):
+            api.abort(404, f"Unknown ontology version {ontology_hash}")
+        delta = api.payload or {}
+        try:
+            added = IncrementalMetricsService.parse_triples(delta.get('added'), delta.get('format', 'turtle'))
+            removed = IncrementalMetricsService.parse_triples(delta.get('removed'), delta.get('format', 'turtle'))
+        except Exception as e:
+            api.abort(400, f"Invalid delta: {e}")
+
+        result, error = IncrementalMetricsService.apply_delta(ontology_hash, added, removed)
+        if error:
+            api.abort(500, f"Error updating ontology metrics: {error}")
+        return result
+
+@api.route('/<string:ontology_hash>/diff')
+class OntologyDiffResource(Resource):
+    @api.doc(description='Upload a new version of a previously analyzed ontology and get its metrics with the changes')
+    @api.expect(ontology_upload)
+    @api.response(200, 'Success', incremental_metrics_model)
+    @api.response(400, 'Validation Error')
+    @api.response(413, 'Upload too large')
+    @api.response(404, 'Unknown ontology version')
+    @api.response(500, 'Internal Server Error')
+    def post(self, ontology_hash):
+        args = ontology_upload.parse_args()
+        ontology_file = args['ontology']
+
+        if not IncrementalMetricsService.has_version(ontology_hash):
+            api.abort(404, f"Unknown ontology version {ontology_hash}")
+
+        result, error = IncrementalMetricsService.apply_version(ontology_hash, load_ontology(ontology_file))
+        if error:
+            api.abort(500, f"Error updating ontology metrics: {error}")
+        return result
@@ -0,0 +1,38 @@
+from flask import request, send_file
+from flask_restx import Namespace, Resource
+from services import profiler
+
+api = Namespace('profiles', description='Stored request profiles (requires X-Admin-Token)')
+
+profile_filter = api.parser()
+profile_filter.add_argument('content_hash', location='args', help='Only profiles of requests for this ontology')
+
+def _require_admin():
+    if not profiler.is_admin(request.headers.get('X-Admin-Token')):
+        api.abort(403, "A valid X-Admin-Token is required")
+
+@api.route('')
+class ProfileListResource(Resource):
+    @api.doc(description='Stored profiles, newest first, with their hottest functions')
+    @api.expect(profile_filter)
+    @api.response(200, 'Success')
+    @api.response(403, 'Forbidden')
+    def get(self):
+        _require_admin()
+        args = profile_filter.parse_args()
+        return profiler.list_profiles(args['content_hash'])
+
+@api.route('/<string:profile_id>')
+class ProfileResource(Resource):
+    @api.doc(description='Download a profile: pstats data (.prof) for requested profiles, '
+                         'sample counts (JSON) for slow requests')
+    @api.response(200, 'Success')
+    @api.response(403, 'Forbidden')
+    @api.response(404, 'Profile not found')
+    def get(self, profile_id):
+        _require_admin()
+        profile = profiler.load_profile(profile_id)
+        if profile is None:
+            api.abort(404, f"Profile {profile_id} not found")
+        meta, path = profile
+        return send_file(path, as_attachment=True, download_name=meta["file"])
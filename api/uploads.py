@@ -0,0 +1,17 @@
+from flask_restx import abort
+from models.parsed_ontology import ParsedOntology
+from utils.upload_utils import ONTOLOGY_FORMATS, UploadTooLarge, is_supported_ontology
+
+UNSUPPORTED_ONTOLOGY = (f"Ontology file must be {', '.join(sorted(ONTOLOGY_FORMATS))}, optionally gzipped (.gz), "
+                        "or a .zip archive containing one of them")
+
+def load_ontology(ontology_file):
+    # Reads an uploaded ontology once, for every service the request uses
+    if not is_supported_ontology(ontology_file.filename):
+        abort(400, UNSUPPORTED_ONTOLOGY)
+    try:
+        return ParsedOntology.from_file(ontology_file)
+    except UploadTooLarge as e:
+        abort(413, str(e))
+    except ValueError as e:
+        abort(400, str(e))
@@ -2,6 +2,10 @@ from flask import Flask
 from config import Config
 from extensions import db
 from api import api_bp
+from models import cache_entry, job  # noqa: F401 - registers the tables
+from services.document_processor import DocumentProcessor
+from services.error_checker import ErrorChecker
+from services import instrumentation, profiler
 import logging
 
 def create_app(config_class=Config):
@@ -10,13 +14,22 @@ def create_app(config_class=Config):
 
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        db.create_all()
 
     # Register blueprints
     app.register_blueprint(api_bp)
+    instrumentation.init_app(app)
+    profiler.init_app(app)
 
     # Configure logging
     logging.basicConfig(level=logging.INFO)
 
+    # Load the document and checker stacks before the first request needs
+    # them, unless this process is configured to start lean
+    DocumentProcessor.warm_up()
+    ErrorChecker.warm_up()
+
     return app
 
 if __name__ == '__main__':
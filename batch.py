@@ -0,0 +1,42 @@
+import argparse
+import json
+import logging
+import sys
+from services.batch_analyzer import BatchAnalyzer, CHECKS
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a corpus of ontologies and write one JSON line per file.")
+    parser.add_argument('source', help="Directory, glob pattern (quote it) or zip archive of ontologies (.ttl, .nt, .owl, .rdf, optionally .gz)")
+    parser.add_argument('--output', '-o', help="JSONL output file (default: stdout). Existing output is resumed.")
+    parser.add_argument('--check', action='append', choices=sorted(CHECKS), default=[],
+                        help="Also run an error checker on every file (repeatable)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of worker processes (default: BATCH_MAX_WORKERS or all cores)")
+    parser.add_argument('--restart', action='store_true',
+                        help="Ignore existing output instead of skipping files that already succeeded")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+
+    skip = set()
+    if args.output and not args.restart:
+        skip = BatchAnalyzer.completed_filepaths(args.output)
+        if skip:
+            logging.info(f"Resuming: skipping {len(skip)} already analyzed files")
+
+    out = open(args.output, 'w' if args.restart else 'a', encoding='utf-8') if args.output else sys.stdout
+    failed = 0
+    try:
+        for record in BatchAnalyzer.run(args.source, args.check, args.workers, skip):
+            if record["error"]:
+                failed += 1
+                logging.warning(f"{record['filepath']}: {record['error']}")
+            out.write(json.dumps(record) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+import argparse
+import json
+import math
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from test_api import ENDPOINTS, post_endpoint
+from benchmarks.sample_pdf import LOREM, build_pdf
+from benchmarks.stub_services import build_services, start_service
+
+def percentile(sorted_values, q):
+    # Nearest-rank percentile
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def run_endpoint(api_url, endpoint, contents, total_requests, concurrency, warmup=1):
+    local = threading.local()
+
+    def send(_):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            status = post_endpoint(api_url, endpoint, contents, session).status_code
+        except requests.RequestException:
+            status = None
+        return time.perf_counter() - start, status
+
+    for i in range(warmup):
+        send(i)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(send, range(total_requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    ok = sum(1 for _, status in results if status == 200)
+    return {
+        "endpoint": endpoint,
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "ok": ok,
+        "errors": total_requests - ok,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "mean": statistics.fmean(latencies) if latencies else None,
+        "max": latencies[-1] if latencies else None,
+        "rps": total_requests / elapsed if elapsed else None,
+    }
+
+def print_report(reports):
+    print(f"{'endpoint':<12} {'conc':>4} {'reqs':>5} {'errors':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8}")
+    for r in reports:
+        print(f"{r['endpoint']:<12} {r['concurrency']:>4} {r['requests']:>5} {r['errors']:>6} "
+              f"{r['p50'] * 1000:>9.1f} {r['p95'] * 1000:>9.1f} {r['p99'] * 1000:>9.1f} {r['rps']:>8.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure latency and throughput of the Ontology Analysis API endpoints.")
+    parser.add_argument('--endpoint', choices=list(ENDPOINTS) + ['all'], default='all')
+    parser.add_argument('--api-url', default='http://localhost:5000')
+    parser.add_argument('--ontology-path', required=True, help="Ontology (.ttl) to upload")
+    parser.add_argument('--pdf-path', help="PDF to upload (default: a generated 5-page text PDF)")
+    parser.add_argument('--requests', type=int, default=50, help="Requests per endpoint and concurrency level")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8],
+                        help="One or more concurrency levels to measure")
+    parser.add_argument('--warmup', type=int, default=1, help="Unmeasured requests sent first")
+    parser.add_argument('--start-stubs', action='store_true',
+                        help="Also start the PROCK/OOPS!/Ollama stand-ins (see benchmarks/stub_services.py)")
+    parser.add_argument('--prock-latency', type=float, default=0.5)
+    parser.add_argument('--oops-latency', type=float, default=2.0)
+    parser.add_argument('--llm-latency', type=float, default=3.0)
+    parser.add_argument('--llm-seconds-per-1k-tokens', type=float, default=0.0)
+    parser.add_argument('--json', dest='json_path', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    if args.start_stubs:
+        stub_args = argparse.Namespace(prock_port=8085, oops_port=8086, ollama_port=11434, jitter=0.0,
+                                       prock_latency=args.prock_latency, oops_latency=args.oops_latency,
+                                       llm_latency=args.llm_latency, llm_seconds_per_1k_tokens=args.llm_seconds_per_1k_tokens,
+                                       prock_payload=None, oops_payload=None, llm_payload=None)
+        for service, port in build_services(stub_args):
+            start_service(service, '127.0.0.1', port)
+
+    with open(args.ontology_path, 'rb') as f:
+        contents = {'ontology': f.read()}
+    if args.pdf_path:
+        with open(args.pdf_path, 'rb') as f:
+            contents['document'] = f.read()
+    else:
+        contents['document'] = build_pdf([LOREM * 4] * 5)
+
+    endpoints = list(ENDPOINTS) if args.endpoint == 'all' else [args.endpoint]
+    reports = [run_endpoint(args.api_url, endpoint, contents, args.requests, concurrency, args.warmup)
+               for endpoint in endpoints for concurrency in args.concurrency]
+    print_report(reports)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(reports, f, indent=2)
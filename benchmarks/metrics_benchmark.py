@@ -0,0 +1,181 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+import rdflib
+from models.ontology_metrics import OntologyMetrics
+from models.triple_index import TripleIndex
+from models.streaming_index import parallel_triple_index, stream_triple_index
+from models.compact_graph import CompactGraph
+from benchmarks.synthetic_ontology import generate_file
+
+# Each stage takes the shared context dict and may add to it. Stages run in
+# order in a fresh process per ontology size, so peak RSS is per size.
+def _format(path):
+    return 'nt' if path.endswith('.nt') else 'turtle'
+
+def _parse(ctx):
+    graph = rdflib.Graph()
+    graph.parse(ctx['path'], format=_format(ctx['path']))
+    ctx['graph'] = graph
+    ctx['triples'] = len(graph)
+
+def _index(ctx):
+    ctx['index'] = TripleIndex.from_triples(ctx['graph'])
+
+def _gci(ctx):
+    ctx['index'].gci_count()
+    ctx['index'].hidden_gci_count()
+
+def _metrics(ctx):
+    OntologyMetrics(ctx['graph'], ctx['index']).calculate_ontology_metrics()
+
+def _expressivity(ctx):
+    OntologyMetrics(ctx['graph'], ctx['index']).calculate_dl_expressivity()
+
+def _constructs(ctx):
+    OntologyMetrics(ctx['graph'], ctx['index']).detect_dl_constructs()
+
+def _end_to_end(ctx):
+    OntologyMetrics(ctx['graph']).calculate_ontology_metrics()
+
+def _streaming(ctx):
+    # Parse straight into a TripleIndex without a graph; run it on its own
+    # (--stages streaming) to see its peak RSS
+    index = stream_triple_index(source=ctx['path'], format=_format(ctx['path']))
+    OntologyMetrics(index=index).calculate_ontology_metrics()
+    ctx.setdefault('triples', index.triple_count)
+
+def _parallel_streaming(ctx):
+    # N-Triples only (--format nt): chunks parsed on --processes processes.
+    # Returns the reason when the stage does not apply to the input.
+    if _format(ctx['path']) != 'nt':
+        return "skipped: needs N-Triples input (--format nt)"
+    with open(ctx['path'], 'rb') as f, ProcessPoolExecutor(max_workers=ctx['processes']) as executor:
+        index = parallel_triple_index(f.read(), executor, ctx['chunk_bytes'], 2 * ctx['processes'])
+    OntologyMetrics(index=index).calculate_ontology_metrics()
+    ctx.setdefault('triples', index.triple_count)
+
+def _compact_store(ctx):
+    CompactGraph.from_graph(ctx['graph']).save(ctx['path'] + '.compact')
+
+def _compact_metrics(ctx):
+    # What a graph cache hit costs: memory-map the stored graph and index it.
+    # Runs on its own once compact_store has written the file for this size.
+    compact = CompactGraph.load(ctx['path'] + '.compact')
+    OntologyMetrics(index=TripleIndex.from_compact_graph(compact)).calculate_ontology_metrics()
+    ctx.setdefault('triples', len(compact))
+
+def _compact_metrics_python(ctx):
+    compact = CompactGraph.load(ctx['path'] + '.compact')
+    OntologyMetrics(index=TripleIndex.from_triples(compact.iter_triples())).calculate_ontology_metrics()
+    ctx.setdefault('triples', len(compact))
+
+STAGES = {
+    'parse': _parse,
+    'index': _index,
+    'gci': _gci,
+    'ontology_metrics': _metrics,
+    'dl_expressivity': _expressivity,
+    'dl_constructs': _constructs,
+    'metrics_end_to_end': _end_to_end,
+    'streaming_metrics': _streaming,
+    'parallel_metrics': _parallel_streaming,
+    'compact_store': _compact_store,
+    'compact_metrics': _compact_metrics,
+    'compact_metrics_python': _compact_metrics_python,
+}
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def measure(path, stages, trace_memory=False, processes=None, chunk_bytes=16 * 1024 * 1024):
+    ctx = {'path': path, 'processes': processes or os.cpu_count(), 'chunk_bytes': chunk_bytes}
+    results = []
+    for name in stages:
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        skipped = STAGES[name](ctx)
+        seconds = time.perf_counter() - start
+        result = {"stage": name, "seconds": seconds, "peak_rss_mb": peak_rss_mb()}
+        if skipped:
+            result["skipped"] = skipped
+        if trace_memory:
+            result["traced_peak_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+        results.append(result)
+    return {"triples": ctx.get('triples'), "stages": results}
+
+def measure_in_subprocess(path, stages, trace_memory, timeout, processes, chunk_bytes):
+    command = [sys.executable, '-m', 'benchmarks.metrics_benchmark', '--measure', path,
+               '--stages', *stages, '--processes', str(processes), '--chunk-bytes', str(chunk_bytes)]
+    command += ['--tracemalloc'] if trace_memory else []
+    try:
+        completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout, check=True)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {timeout}s"}
+    except subprocess.CalledProcessError as e:
+        return {"error": e.stderr.strip().splitlines()[-1] if e.stderr.strip() else f"exit code {e.returncode}"}
+    return json.loads(completed.stdout)
+
+def print_header():
+    print(f"{'size':>10} {'triples':>10} {'stage':<24} {'seconds':>10} {'peak RSS MB':>12}")
+
+def print_report(report):
+    if "error" in report:
+        print(f"{report['size']:>10} {'-':>10} {'-':<24} {report['error']}")
+        return
+    for stage in report["stages"]:
+        if "skipped" in stage:
+            print(f"{report['size']:>10} {report['triples']:>10} {stage['stage']:<24} {stage['skipped']}")
+            continue
+        print(f"{report['size']:>10} {report['triples']:>10} {stage['stage']:<24} "
+              f"{stage['seconds']:>10.3f} {stage['peak_rss_mb']:>12.1f}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure how the ontology metrics scale with ontology size.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000],
+                        help="Approximate triple counts of the generated ontologies (up to 10000000)")
+    parser.add_argument('--format', choices=['ttl', 'nt'], default='ttl')
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--data-dir', help="Keep generated ontologies here and reuse them on later runs")
+    parser.add_argument('--timeout', type=float, default=1800, help="Seconds allowed per size")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="Also record Python-level peak allocations per stage (slows every stage down)")
+    parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                        help="Processes for the parallel_metrics stage")
+    parser.add_argument('--chunk-bytes', type=int, default=16 * 1024 * 1024,
+                        help="Chunk size for the parallel_metrics stage")
+    parser.add_argument('--json', dest='json_path', help="Also write the results to this JSON file")
+    parser.add_argument('--measure', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.stages, args.tracemalloc, args.processes, args.chunk_bytes)))
+        sys.exit(0)
+
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='metrics-benchmark-')
+    os.makedirs(data_dir, exist_ok=True)
+    reports = []
+    print_header()
+    for size in args.sizes:
+        path = os.path.join(data_dir, f"synthetic_{size}.{args.format}")
+        if not os.path.exists(path):
+            generate_file(path, triples=size)
+        report = measure_in_subprocess(path, args.stages, args.tracemalloc, args.timeout, args.processes,
+                                      args.chunk_bytes)
+        report["size"] = size
+        reports.append(report)
+        print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(reports, f, indent=2)
@@ -0,0 +1,62 @@
+import argparse
+
+# Writes small text-only PDFs so document extraction can be benchmarked
+# without shipping binary fixtures.
+
+LOREM = ("This ontology models the domain of university course management. "
+         "It describes courses, lecturers, students and the rooms in which lectures take place. "
+         "Competency question: Which lecturer teaches a given course in a given semester? "
+         "Competency question: Which students are enrolled in more than three courses? ")
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def _wrap(text, width=90):
+    words, lines, line = text.split(), [], ''
+    for word in words:
+        if len(line) + len(word) + 1 > width:
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}".strip()
+    if line:
+        lines.append(line)
+    return lines
+
+def build_pdf(page_texts):
+    objects = []
+    page_ids = [4 + 2 * i for i in range(len(page_texts))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = ' '.join(f"{page_id} 0 R" for page_id in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode())
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for page_id, text in zip(page_ids, page_texts):
+        lines = ' T* '.join(f"({_escape(line)}) Tj" for line in _wrap(text)[:48])
+        stream = f"BT /F1 10 Tf 14 TL 56 760 Td {lines} ET".encode('latin-1', 'replace')
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode())
+        objects.append(b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+def write_sample_pdf(path, pages=5):
+    page_texts = [f"Page {i + 1}. " + LOREM * 4 for i in range(pages)]
+    with open(path, 'wb') as f:
+        f.write(build_pdf(page_texts))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Write a text-only sample PDF for benchmarks.")
+    parser.add_argument('path')
+    parser.add_argument('--pages', type=int, default=5)
+    args = parser.parse_args()
+    write_sample_pdf(args.path, args.pages)
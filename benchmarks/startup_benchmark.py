@@ -0,0 +1,97 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Modules that only document extraction and the error checkers need. A
+# process with the default configuration (no warm-up) must start without any
+# of them.
+HEAVY_MODULES = ['langchain', 'langchain_together', 'ollama', 'tiktoken', 'PyPDF2', 'requests']
+
+SCENARIOS = {
+    # Default configuration: both stacks are loaded on first use
+    'default': {},
+    # Both stacks are loaded by create_app
+    'warm': {'DOCUMENT_PROCESSOR_WARMUP': '1', 'CHECKER_WARMUP': 'true'},
+}
+WARMUP_SETTINGS = ('DOCUMENT_PROCESSOR_WARMUP', 'CHECKER_WARMUP')
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app()
+created = time.perf_counter()
+print(json.dumps({
+    "import_seconds": imported - start,
+    "create_app_seconds": created - imported,
+    "heavy_modules": [name for name in %r if name in sys.modules],
+}))
+"""
+
+def measure(env, timeout):
+    # A fresh interpreter per run, so nothing is imported yet
+    completed = subprocess.run([sys.executable, '-c', PROBE % (HEAVY_MODULES,)], env=env, capture_output=True,
+                               text=True, timeout=timeout, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def run_scenario(name, runs, timeout, database_dir):
+    # Warm-up settings of the calling environment would hide the defaults
+    env = {key: value for key, value in os.environ.items() if key not in WARMUP_SETTINGS}
+    env.update(SCENARIOS[name])
+    env['DATABASE_URL'] = f"sqlite:///{os.path.join(database_dir, 'startup.db')}"
+    samples = [measure(env, timeout) for _ in range(runs)]
+    imports = [sample["import_seconds"] for sample in samples]
+    creates = [sample["create_app_seconds"] for sample in samples]
+    totals = [i + c for i, c in zip(imports, creates)]
+    return {
+        "scenario": name,
+        "runs": runs,
+        "import_seconds": statistics.median(imports),
+        "create_app_seconds": statistics.median(creates),
+        "total_seconds": statistics.median(totals),
+        "heavy_modules": samples[-1]["heavy_modules"],
+    }
+
+def print_report(report):
+    print(f"{report['scenario']:<8} {report['import_seconds']:>10.3f} {report['create_app_seconds']:>12.3f} "
+          f"{report['total_seconds']:>10.3f}  {', '.join(report['heavy_modules']) or '-'}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Measure how long a fresh process takes to import and create the app.")
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--runs', type=int, default=5, help="Fresh processes per scenario (the median is reported)")
+    parser.add_argument('--timeout', type=float, default=120, help="Seconds allowed per process")
+    parser.add_argument('--max-default-seconds', type=float,
+                        help="Exit with an error if the default scenario takes longer than this")
+    parser.add_argument('--json', dest='json_path', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    database_dir = tempfile.mkdtemp(prefix='startup-benchmark-')
+    reports = []
+    print(f"{'scenario':<8} {'import s':>10} {'create_app s':>12} {'total s':>10}  heavy modules loaded")
+    for name in args.scenarios:
+        report = run_scenario(name, args.runs, args.timeout, database_dir)
+        reports.append(report)
+        print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(reports, f, indent=2)
+
+    failures = []
+    for report in reports:
+        if report["scenario"] != 'default':
+            continue
+        if report["heavy_modules"]:
+            failures.append(f"default startup imported {', '.join(report['heavy_modules'])}")
+        if args.max_default_seconds is not None and report["total_seconds"] > args.max_default_seconds:
+            failures.append(f"default startup took {report['total_seconds']:.3f}s "
+                            f"(limit {args.max_default_seconds}s)")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,174 @@
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Local stand-ins for the external services the API depends on, so benchmarks
+# run offline with controlled latency:
+#   PROCK   POST /defectCandidates  (Turtle in, JSON out)
+#   OOPS!   POST /rest              (XML request in, RDF/XML out)
+#   Ollama  POST /api/chat          (chat request in, chat response out)
+
+DEFAULT_PROCK_PAYLOAD = json.dumps([
+    {"name": "Missing domain or range", "candidates": ["http://example.org/onto#relatedTo"]},
+    {"name": "Unconnected class", "candidates": ["http://example.org/onto#Orphan"]}
+])
+
+DEFAULT_OOPS_PAYLOAD = """<?xml version="1.0" encoding="UTF-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:oops="http://oops.linkeddata.es/def#">
+  <rdf:Description rdf:about="http://oops.linkeddata.es/data/p04">
+    <oops:hasName rdf:datatype="http://www.w3.org/2001/XMLSchema#string">Creating unconnected ontology elements</oops:hasName>
+    <oops:hasDescription rdf:datatype="http://www.w3.org/2001/XMLSchema#string">Ontology elements are created isolated, with no relation to the rest of the ontology.</oops:hasDescription>
+    <oops:hasImportanceLevel rdf:datatype="http://www.w3.org/2001/XMLSchema#string">Minor</oops:hasImportanceLevel>
+    <oops:hasCode rdf:datatype="http://www.w3.org/2001/XMLSchema#string">P04</oops:hasCode>
+    <oops:hasNumberAffectedElements rdf:datatype="http://www.w3.org/2001/XMLSchema#int">2</oops:hasNumberAffectedElements>
+  </rdf:Description>
+  <rdf:Description rdf:about="http://oops.linkeddata.es/data/p08">
+    <oops:hasName rdf:datatype="http://www.w3.org/2001/XMLSchema#string">Missing annotations</oops:hasName>
+    <oops:hasDescription rdf:datatype="http://www.w3.org/2001/XMLSchema#string">Ontology terms lack annotations properties.</oops:hasDescription>
+    <oops:hasImportanceLevel rdf:datatype="http://www.w3.org/2001/XMLSchema#string">Minor</oops:hasImportanceLevel>
+    <oops:hasCode rdf:datatype="http://www.w3.org/2001/XMLSchema#string">P08</oops:hasCode>
+    <oops:hasNumberAffectedElements rdf:datatype="http://www.w3.org/2001/XMLSchema#int">5</oops:hasNumberAffectedElements>
+  </rdf:Description>
+</rdf:RDF>
+"""
+
+DEFAULT_LLM_PAYLOAD = json.dumps({
+    "application_domain": "Benchmarking",
+    "summary": "A stand-in ontology description returned by the local Ollama stub.",
+    "competency_questions": [
+        "Which classes have no instances?",
+        "Which properties lack a domain or range?"
+    ]
+})
+
+class StubService:
+    def __init__(self, name, path, content_type, payload, latency=0.0, jitter=0.0):
+        self.name = name
+        self.path = path
+        self.content_type = content_type
+        self.payload = payload
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def delay(self, request_body):
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def respond(self, request_body):
+        return self.payload.encode('utf-8')
+
+class OllamaStub(StubService):
+    # Real LLM latency grows with the prompt; approximate it at 4 characters per token
+    def __init__(self, name, path, content_type, payload, latency=0.0, jitter=0.0, seconds_per_1k_tokens=0.0):
+        super().__init__(name, path, content_type, payload, latency, jitter)
+        self.seconds_per_1k_tokens = seconds_per_1k_tokens
+
+    def delay(self, request_body):
+        return super().delay(request_body) + self.seconds_per_1k_tokens * len(request_body) / 4000
+
+    def respond(self, request_body):
+        request = json.loads(request_body or b'{}')
+        return json.dumps({
+            "model": request.get("model", "stub"),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "message": {"role": "assistant", "content": self.payload},
+            "done": True,
+            "done_reason": "stop"
+        }).encode('utf-8')
+
+def make_handler(service):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            request_body = self.rfile.read(length) if length else self._read_chunked()
+            if self.path.split('?')[0] != service.path:
+                self.send_error(404)
+                return
+            with service._lock:
+                service.requests += 1
+            time.sleep(service.delay(request_body))
+            body = service.respond(request_body)
+            self.send_response(200)
+            self.send_header('Content-Type', service.content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_chunked(self):
+            if self.headers.get('Transfer-Encoding', '').lower() != 'chunked':
+                return b''
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip() or b'0', 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return b''.join(chunks)
+                chunks.append(self.rfile.read(size))
+                self.rfile.readline()
+
+        def log_message(self, format, *args):
+            logger.debug(f"{service.name}: {format % args}")
+
+    return StubHandler
+
+def start_service(service, host, port):
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name=f"stub-{service.name}", daemon=True)
+    thread.start()
+    logger.info(f"{service.name} stub listening on http://{host}:{server.server_port}{service.path}")
+    return server
+
+def build_services(args):
+    def payload(path, default):
+        if path is None:
+            return default
+        with open(path, encoding='utf-8') as f:
+            return f.read()
+
+    return [
+        (StubService('PROCK', '/defectCandidates', 'application/json',
+                     payload(args.prock_payload, DEFAULT_PROCK_PAYLOAD), args.prock_latency, args.jitter), args.prock_port),
+        (StubService('OOPS', '/rest', 'application/rdf+xml',
+                     payload(args.oops_payload, DEFAULT_OOPS_PAYLOAD), args.oops_latency, args.jitter), args.oops_port),
+        (OllamaStub('Ollama', '/api/chat', 'application/json',
+                    payload(args.llm_payload, DEFAULT_LLM_PAYLOAD), args.llm_latency, args.jitter,
+                    args.llm_seconds_per_1k_tokens), args.ollama_port),
+    ]
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run local stand-ins for the PROCK, OOPS! and Ollama services.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--prock-port', type=int, default=8085)
+    parser.add_argument('--oops-port', type=int, default=8086)
+    parser.add_argument('--ollama-port', type=int, default=11434)
+    parser.add_argument('--prock-latency', type=float, default=0.5, help="Seconds per PROCK response")
+    parser.add_argument('--oops-latency', type=float, default=2.0, help="Seconds per OOPS! response")
+    parser.add_argument('--llm-latency', type=float, default=3.0, help="Seconds per Ollama chat response")
+    parser.add_argument('--llm-seconds-per-1k-tokens', type=float, default=0.0,
+                        help="Extra Ollama latency per 1000 prompt tokens")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Uniform +/- jitter added to every latency")
+    parser.add_argument('--prock-payload', help="File with the JSON body PROCK should return")
+    parser.add_argument('--oops-payload', help="File with the RDF/XML body OOPS! should return")
+    parser.add_argument('--llm-payload', help="File with the message content the LLM should return")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    servers = [start_service(service, args.host, port) for service, port in build_services(args)]
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for server in servers:
+            server.shutdown()
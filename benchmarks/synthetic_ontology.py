@@ -0,0 +1,152 @@
+import argparse
+import random
+
+# Streams synthetic OWL ontologies of a given shape to disk without building a
+# graph in memory, so 10M-triple inputs can be generated on a laptop.
+
+NAMESPACES = {
+    'rdf': 'http://www.w3.org/1999/02/22-rdf-syntax-ns#',
+    'rdfs': 'http://www.w3.org/2000/01/rdf-schema#',
+    'owl': 'http://www.w3.org/2002/07/owl#',
+    'xsd': 'http://www.w3.org/2001/XMLSchema#',
+    '': 'http://example.org/synthetic#',
+}
+
+# Approximate share of the triple budget and triples per item for each kind
+# of axiom, used by counts_for_triples()
+SHAPE = {
+    'classes': (0.25, 3),
+    'object_properties': (0.02, 4),
+    'data_properties': (0.02, 3),
+    'restrictions': (0.20, 4),
+    'individuals': (0.40, 4),
+    'gcis': (0.11, 8.5),
+}
+
+PROPERTY_CHARACTERISTICS = ['TransitiveProperty', 'FunctionalProperty', 'InverseFunctionalProperty',
+                            'SymmetricProperty', 'AsymmetricProperty', 'ReflexiveProperty',
+                            'IrreflexiveProperty']
+
+def counts_for_triples(triples):
+    counts = {kind: max(1, int(triples * share / per_item)) for kind, (share, per_item) in SHAPE.items()}
+    counts['classes'] = max(2, counts['classes'])
+    return counts
+
+class TripleWriter:
+    def __init__(self, out, format='ttl'):
+        self.out = out
+        self.format = format
+        self.count = 0
+        if format == 'ttl':
+            for prefix, iri in NAMESPACES.items():
+                out.write(f"@prefix {prefix}: <{iri}> .\n")
+
+    def term(self, name):
+        # 'owl:Class' -> prefixed or full IRI; '_:b1' and literals pass through
+        if name.startswith('_:') or name.startswith('"'):
+            return name
+        prefix, local = name.split(':', 1)
+        if self.format == 'ttl':
+            return name
+        return f"<{NAMESPACES[prefix]}{local}>"
+
+    def triple(self, s, p, o):
+        self.out.write(f"{self.term(s)} {self.term(p)} {self.term(o)} .\n")
+        self.count += 1
+
+def generate(out, classes=100, object_properties=10, data_properties=5, restrictions=50,
+             individuals=200, gcis=10, format='ttl', seed=0):
+    rng = random.Random(seed)
+    w = TripleWriter(out, format)
+    bnodes = iter(range(1, 1 << 62))
+
+    def random_class():
+        return f":C{rng.randrange(classes)}"
+
+    w.triple(':Ontology', 'rdf:type', 'owl:Ontology')
+    for i in range(classes):
+        w.triple(f":C{i}", 'rdf:type', 'owl:Class')
+        w.triple(f":C{i}", 'rdfs:label', f'"Class {i}"')
+        if i > 0:
+            w.triple(f":C{i}", 'rdfs:subClassOf', f":C{rng.randrange(i)}")
+
+    for i in range(object_properties):
+        w.triple(f":p{i}", 'rdf:type', 'owl:ObjectProperty')
+        w.triple(f":p{i}", 'rdfs:domain', random_class())
+        w.triple(f":p{i}", 'rdfs:range', random_class())
+        if i % 3 == 0:
+            w.triple(f":p{i}", 'rdf:type', f"owl:{PROPERTY_CHARACTERISTICS[(i // 3) % len(PROPERTY_CHARACTERISTICS)]}")
+        if i > 0 and i % 4 == 0:
+            w.triple(f":p{i}", 'rdfs:subPropertyOf', f":p{rng.randrange(i)}")
+        if i > 0 and i % 5 == 0:
+            w.triple(f":p{i}", 'owl:inverseOf', f":p{rng.randrange(i)}")
+
+    for i in range(data_properties):
+        w.triple(f":d{i}", 'rdf:type', 'owl:DatatypeProperty')
+        w.triple(f":d{i}", 'rdfs:domain', random_class())
+        w.triple(f":d{i}", 'rdfs:range', 'xsd:string')
+
+    restriction_kinds = ['owl:someValuesFrom', 'owl:allValuesFrom', 'owl:maxCardinality']
+    for i in range(restrictions):
+        node = f"_:r{next(bnodes)}"
+        w.triple(random_class(), 'rdfs:subClassOf', node)
+        w.triple(node, 'rdf:type', 'owl:Restriction')
+        w.triple(node, 'owl:onProperty', f":p{rng.randrange(object_properties)}")
+        kind = restriction_kinds[i % len(restriction_kinds)]
+        if kind == 'owl:maxCardinality':
+            w.triple(node, kind, f'"{rng.randint(1, 5)}"^^<{NAMESPACES["xsd"]}nonNegativeInteger>')
+        else:
+            w.triple(node, kind, random_class())
+
+    for i in range(individuals):
+        w.triple(f":i{i}", 'rdf:type', 'owl:NamedIndividual')
+        w.triple(f":i{i}", 'rdf:type', random_class())
+        if i > 0:
+            w.triple(f":i{i}", f":p{rng.randrange(object_properties)}", f":i{rng.randrange(i)}")
+        w.triple(f":i{i}", f":d{rng.randrange(data_properties)}", f'"value {i}"')
+
+    # General class inclusions with a blank-node left-hand side:
+    # (C_a and (p some C_b)) SubClassOf C_c, or (C_a or C_b) SubClassOf C_c
+    for i in range(gcis):
+        expression = f"_:g{next(bnodes)}"
+        first, rest = f"_:l{next(bnodes)}", f"_:l{next(bnodes)}"
+        w.triple(expression, 'rdf:type', 'owl:Class')
+        if i % 2 == 0:
+            restriction = f"_:r{next(bnodes)}"
+            w.triple(expression, 'owl:intersectionOf', first)
+            w.triple(restriction, 'rdf:type', 'owl:Restriction')
+            w.triple(restriction, 'owl:onProperty', f":p{rng.randrange(object_properties)}")
+            w.triple(restriction, 'owl:someValuesFrom', random_class())
+            second = restriction
+        else:
+            w.triple(expression, 'owl:unionOf', first)
+            second = random_class()
+        w.triple(first, 'rdf:first', random_class())
+        w.triple(first, 'rdf:rest', rest)
+        w.triple(rest, 'rdf:first', second)
+        w.triple(rest, 'rdf:rest', 'rdf:nil')
+        w.triple(expression, 'rdfs:subClassOf', random_class())
+
+    return w.count
+
+def generate_file(path, triples=None, format=None, seed=0, **counts):
+    format = format or ('nt' if path.endswith('.nt') else 'ttl')
+    if triples is not None:
+        counts = {**counts_for_triples(triples), **counts}
+    with open(path, 'w', encoding='utf-8', buffering=1 << 20) as out:
+        return generate(out, format=format, seed=seed, **counts)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate a synthetic OWL ontology (Turtle or N-Triples).")
+    parser.add_argument('path', help="Output file; a .nt suffix writes N-Triples, anything else Turtle")
+    parser.add_argument('--triples', type=int, help="Approximate total size; sets every count not given explicitly")
+    for kind in SHAPE:
+        parser.add_argument(f"--{kind.replace('_', '-')}", type=int, dest=kind)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    counts = {kind: getattr(args, kind) for kind in SHAPE if getattr(args, kind) is not None}
+    if args.triples is None and not counts:
+        args.triples = 10000
+    written = generate_file(args.path, args.triples, seed=args.seed, **counts)
+    print(f"Wrote {written} triples to {args.path}")
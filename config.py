@@ -9,4 +9,124 @@ class Config:
     OLLAMA_SERVICE = os.getenv('OLLAMA_SERVICE', 'ollama')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'sqlite:///app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key')
\ No newline at end of file
+    SECRET_KEY = os.getenv('SECRET_KEY', 'your-secret-key')
+
+    # Uploads larger than MAX_UPLOAD_BYTES are rejected before they are read;
+    # compressed ontologies may expand to at most MAX_DECOMPRESSED_BYTES.
+    # Ontologies above UPLOAD_SPOOL_BYTES are kept in temporary files and
+    # memory-mapped instead of being held in memory.
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_UPLOAD_BYTES', 512 * 1024 * 1024))
+    MAX_DECOMPRESSED_BYTES = int(os.getenv('MAX_DECOMPRESSED_BYTES', 2 * 1024 * 1024 * 1024))
+    UPLOAD_SPOOL_BYTES = int(os.getenv('UPLOAD_SPOOL_BYTES', 1024 * 1024))
+
+    # Pool of ready document processors (LLM client, tokenizer, prompt). By
+    # default the LLM stack is only imported by the first document
+    # extraction; the first DOCUMENT_PROCESSOR_WARMUP processors can instead
+    # be built when the app starts
+    DOCUMENT_PROCESSOR_POOL_SIZE = int(os.getenv('DOCUMENT_PROCESSOR_POOL_SIZE', 4))
+    DOCUMENT_PROCESSOR_WARMUP = int(os.getenv('DOCUMENT_PROCESSOR_WARMUP', 0))
+    # Import the PROCK and OOPS! clients when the app starts instead of on the
+    # first check
+    CHECKER_WARMUP = os.getenv('CHECKER_WARMUP', 'false').lower() == 'true'
+
+    # Cache of LLM completions for document extraction, keyed by service,
+    # model and prompt; bump LLM_CACHE_VERSION to drop all cached completions
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    LLM_CACHE_VERSION = os.getenv('LLM_CACHE_VERSION', '1')
+    LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', 30 * 24 * 3600))
+    LLM_CACHE_DB_ENTRIES = int(os.getenv('LLM_CACHE_DB_ENTRIES', 5000))
+
+    # 'truncate' sends the first 7000 tokens of a document in one prompt;
+    # 'chunked' extracts every DOCUMENT_CHUNK_TOKENS chunk (up to
+    # DOCUMENT_MAX_TOKENS) concurrently and merges the answers
+    DOCUMENT_EXTRACTION_MODE = os.getenv('DOCUMENT_EXTRACTION_MODE', 'truncate')
+    DOCUMENT_CHUNK_TOKENS = int(os.getenv('DOCUMENT_CHUNK_TOKENS', 3000))
+    DOCUMENT_MAX_TOKENS = int(os.getenv('DOCUMENT_MAX_TOKENS', 60000))
+    DOCUMENT_CHUNK_WORKERS = int(os.getenv('DOCUMENT_CHUNK_WORKERS', 16))
+
+    # Concurrent LLM calls allowed per backend in this process
+    OLLAMA_MAX_CONCURRENCY = int(os.getenv('OLLAMA_MAX_CONCURRENCY', 4))
+    TOGETHER_MAX_CONCURRENCY = int(os.getenv('TOGETHER_MAX_CONCURRENCY', 8))
+
+    # Parallel PDF text extraction (0 extracts pages in the request thread)
+    PDF_EXTRACT_PROCESSES = int(os.getenv('PDF_EXTRACT_PROCESSES', 0))
+    PDF_PAGES_PER_TASK = int(os.getenv('PDF_PAGES_PER_TASK', 8))
+
+    # Result cache for metrics and checker results, keyed by ontology content hash
+    RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+    RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', 7 * 24 * 3600))
+    RESULT_CACHE_MEMORY_ENTRIES = int(os.getenv('RESULT_CACHE_MEMORY_ENTRIES', 256))
+    RESULT_CACHE_MEMORY_BYTES = int(os.getenv('RESULT_CACHE_MEMORY_BYTES', 64 * 1024 * 1024))
+    RESULT_CACHE_DB_ENTRIES = int(os.getenv('RESULT_CACHE_DB_ENTRIES', 10000))
+    RESULT_CACHE_DB_BYTES = int(os.getenv('RESULT_CACHE_DB_BYTES', 256 * 1024 * 1024))
+    METRICS_CACHE_VERSION = '3'
+    PROCK_CACHE_VERSION = os.getenv('PROCK_CACHE_VERSION', '1')
+    OOPS_CACHE_VERSION = os.getenv('OOPS_CACHE_VERSION', '1')
+
+    # Ontologies larger than this (in bytes) are indexed while parsing instead
+    # of being loaded into an in-memory graph for /ontology/ontology_metrics
+    STREAMING_METRICS_THRESHOLD = int(os.getenv('STREAMING_METRICS_THRESHOLD', 50 * 1024 * 1024))
+
+    # Streamed N-Triples ontologies are split into chunks of about
+    # PARALLEL_PARSE_CHUNK_BYTES at line breaks and parsed on this many
+    # processes (0 parses them in the request thread)
+    PARALLEL_PARSE_PROCESSES = int(os.getenv('PARALLEL_PARSE_PROCESSES', 0))
+    PARALLEL_PARSE_CHUNK_BYTES = int(os.getenv('PARALLEL_PARSE_CHUNK_BYTES', 16 * 1024 * 1024))
+
+    # On-disk cache of parsed graphs in compact binary form, keyed by content hash
+    GRAPH_CACHE_ENABLED = os.getenv('GRAPH_CACHE_ENABLED', 'true').lower() == 'true'
+    GRAPH_CACHE_DIR = os.getenv('GRAPH_CACHE_DIR', 'instance/graph_cache')
+    GRAPH_CACHE_MAX_BYTES = int(os.getenv('GRAPH_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+
+    # 'numpy' computes the metrics with array operations over the compact graph;
+    # 'python' iterates over the triples one by one
+    METRICS_BACKEND = os.getenv('METRICS_BACKEND', 'numpy')
+
+    # Ontology versions kept in memory for incremental metric updates; they
+    # are per process, so derived versions are unknown to other workers
+    INCREMENTAL_STATE_ENTRIES = int(os.getenv('INCREMENTAL_STATE_ENTRIES', 8))
+    # Changes chained onto an uploaded version before they are folded into one
+    INCREMENTAL_MAX_CHAIN = int(os.getenv('INCREMENTAL_MAX_CHAIN', 16))
+
+    # Thread pool shared by the stages of /analysis/analyze_ontology
+    ANALYSIS_MAX_WORKERS = int(os.getenv('ANALYSIS_MAX_WORKERS', 16))
+
+    # Prometheus metrics at /metrics, and an optional Server-Timing header
+    # with the time each processing stage of a request took
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'false').lower() == 'true'
+
+    # Request profiling. An admin (X-Admin-Token: ADMIN_TOKEN) can profile any
+    # request with X-Profile: 1 or ?profile=1; with PROFILE_SLOW_REQUEST_SECONDS
+    # set, every request is sampled and the hottest functions of slower ones
+    # are logged. Profiles are kept in PROFILE_DIR.
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'instance/profiles')
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 200))
+    PROFILE_TOP_FUNCTIONS = int(os.getenv('PROFILE_TOP_FUNCTIONS', 15))
+    PROFILE_SLOW_REQUEST_SECONDS = float(os.getenv('PROFILE_SLOW_REQUEST_SECONDS', 0))
+    PROFILE_SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', 0.01))
+
+    # Asynchronous job queue
+    JOB_RESULT_TTL = int(os.getenv('JOB_RESULT_TTL', 24 * 3600))
+    JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', 3600))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 2))
+
+    # Process pool size for batch analysis (0 uses every core)
+    BATCH_MAX_WORKERS = int(os.getenv('BATCH_MAX_WORKERS', 0))
+
+    # External error checking services
+    PROCK_API_ENDPOINT = os.getenv('PROCK_API_ENDPOINT', 'http://localhost:8085/defectCandidates')
+    OOPS_API_ENDPOINT = os.getenv('OOPS_API_ENDPOINT', 'https://oops.linkeddata.es/rest')
+    PROCK_TIMEOUT = float(os.getenv('PROCK_TIMEOUT', 600))
+    OOPS_TIMEOUT = float(os.getenv('OOPS_TIMEOUT', 600))
+    # Comma-separated OOPS! pitfall codes to check
+    OOPS_PITFALLS = os.getenv('OOPS_PITFALLS', ','.join(f"P{number:02d}" for number in range(1, 42))).replace(' ', '')
+    CHECKER_CONNECT_TIMEOUT = float(os.getenv('CHECKER_CONNECT_TIMEOUT', 10))
+    CHECKER_MAX_RETRIES = int(os.getenv('CHECKER_MAX_RETRIES', 3))
+    CHECKER_BACKOFF_BASE = float(os.getenv('CHECKER_BACKOFF_BASE', 0.5))
+    CHECKER_BACKOFF_MAX = float(os.getenv('CHECKER_BACKOFF_MAX', 10))
+    CHECKER_POOL_SIZE = int(os.getenv('CHECKER_POOL_SIZE', 10))
+    CHECKER_CIRCUIT_FAILURES = int(os.getenv('CHECKER_CIRCUIT_FAILURES', 5))
+    CHECKER_CIRCUIT_RESET = float(os.getenv('CHECKER_CIRCUIT_RESET', 30))
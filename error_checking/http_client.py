@@ -0,0 +1,134 @@
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from config import Config
+from services.instrumentation import external_call_failed
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+class CircuitOpenError(requests.RequestException):
+    pass
+
+class CircuitBreaker:
+    # Opens after `failure_threshold` consecutive failed calls and lets a single
+    # trial call through once `reset_timeout` seconds have passed.
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return 'half-open'
+            return 'open'
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.reset_timeout or self._trial_in_progress:
+                return False
+            self._trial_in_progress = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_progress = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+class CheckerClient:
+    # One pooled session per host, shared by every client talking to that host
+    _sessions = {}
+    _sessions_lock = threading.Lock()
+
+    def __init__(self, name, endpoint, timeout, connect_timeout=None, max_retries=None,
+                 backoff_base=None, backoff_max=None, failure_threshold=None, reset_timeout=None):
+        self.name = name
+        self.endpoint = endpoint
+        self.timeout = (connect_timeout or Config.CHECKER_CONNECT_TIMEOUT, timeout)
+        self.max_retries = max_retries if max_retries is not None else Config.CHECKER_MAX_RETRIES
+        self.backoff_base = backoff_base if backoff_base is not None else Config.CHECKER_BACKOFF_BASE
+        self.backoff_max = backoff_max if backoff_max is not None else Config.CHECKER_BACKOFF_MAX
+        self.circuit = CircuitBreaker(
+            failure_threshold if failure_threshold is not None else Config.CHECKER_CIRCUIT_FAILURES,
+            reset_timeout if reset_timeout is not None else Config.CHECKER_CIRCUIT_RESET
+        )
+
+    @classmethod
+    def session_for(cls, url):
+        parts = urlsplit(url)
+        host = f"{parts.scheme}://{parts.netloc}"
+        with cls._sessions_lock:
+            session = cls._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.CHECKER_POOL_SIZE)
+                session.mount(host, adapter)
+                cls._sessions[host] = session
+            return session
+
+    def post(self, data, headers=None, stream=False):
+        # `data` may be a callable returning the body (e.g. a generator for a
+        # streamed upload); it is called again for every attempt
+        if not self.circuit.allow():
+            external_call_failed(self.name, 'circuit_open')
+            raise CircuitOpenError(f"{self.name} circuit is open after repeated failures; not calling {self.endpoint}")
+
+        session = self.session_for(self.endpoint)
+        attempt = 0
+        while True:
+            try:
+                body = data() if callable(data) else data
+                response = session.post(self.endpoint, data=body, headers=headers, timeout=self.timeout,
+                                        stream=stream)
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    self.circuit.record_success()
+                    return response
+                response.close()
+                error = requests.HTTPError(f"{self.name} returned HTTP {response.status_code}", response=response)
+                external_call_failed(self.name, f"http_{response.status_code}")
+            except requests.ReadTimeout:
+                # Not retried: the service may still be working on the request
+                # and a retry would only double the wait.
+                self.circuit.record_failure()
+                external_call_failed(self.name, 'timeout')
+                raise
+            except requests.ConnectionError as e:
+                error = e
+                external_call_failed(self.name, 'connection')
+            except BaseException:
+                # Anything else (a broken response, a failing body callable) is
+                # not retried, but must still count against the circuit so a
+                # half-open trial never stays in progress
+                self.circuit.record_failure()
+                external_call_failed(self.name, 'error')
+                raise
+
+            if attempt >= self.max_retries:
+                self.circuit.record_failure()
+                raise error
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            attempt += 1
+            logger.warning(f"{self.name} request failed ({error}); retry {attempt}/{self.max_retries} in {delay:.2f}s")
+            time.sleep(delay)
@@ -1,56 +1,98 @@
 import requests
-import xmltodict
 import logging
+from xml.etree import ElementTree
+from config import Config
+from error_checking.http_client import CheckerClient
+from models.parsed_ontology import ParsedOntology
 from utils.rdf_utils import validate_and_convert_to_owl
+from services.instrumentation import stage
 
 logger = logging.getLogger(__name__)
 
+CHUNK_SIZE = 64 * 1024
+UNEXPECTED_ERROR = b"unexpected_error"
+RDF_DESCRIPTION = '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}Description'
+OOPS_NS = '{http://oops.linkeddata.es/def#}'
+
+def _request_body(owl_data, pitfalls):
+    # The ontology is encoded and sent a chunk at a time instead of being
+    # copied into one envelope string and then into bytes; the envelope is
+    # byte for byte the one OOPS! has always been sent
+    yield b"""<?xml version="1.0" encoding="UTF-8"?>
+                    <OOPSRequest>
+                        <OntologyURI></OntologyURI>
+                        <OntologyContent><![CDATA["""
+    for start in range(0, len(owl_data), CHUNK_SIZE):
+        yield owl_data[start:start + CHUNK_SIZE].encode('utf-8')
+    yield f"""]]></OntologyContent>
+                        <Pitfalls>{pitfalls}</Pitfalls>
+                        <OutputFormat>RDF/XML</OutputFormat>
+                    </OOPSRequest>""".encode('utf-8')
+
+def _text(description, field):
+    element = description.find(OOPS_NS + field)
+    return None if element is None else element.text
+
+def _read_pitfalls(chunks):
+    # Parses the RDF/XML report as it arrives and keeps only the pitfall
+    # fields; every finished rdf:Description is dropped from the tree
+    parser = ElementTree.XMLPullParser(events=('start', 'end'))
+    root = None
+    tail = b''
+    errors_oops = []
+    for chunk in chunks:
+        window = tail + chunk
+        if UNEXPECTED_ERROR in window:
+            logger.error("Unexpected error from OOPS!")
+            return None
+        tail = window[-(len(UNEXPECTED_ERROR) - 1):]
+        parser.feed(chunk)
+        for event, element in parser.read_events():
+            if event == 'start':
+                if root is None:
+                    root = element
+                continue
+            if element.tag != RDF_DESCRIPTION:
+                continue
+            if _text(element, 'hasName'):
+                errors_oops.append({
+                    "name": _text(element, 'hasName'),
+                    "description": _text(element, 'hasDescription'),
+                    "importanceLevel": _text(element, 'hasImportanceLevel'),
+                    "code": _text(element, 'hasCode'),
+                    "numberAffectedElements": int(_text(element, 'hasNumberAffectedElements') or 0)
+                })
+            root.clear()
+    parser.close()
+    return errors_oops
+
 class OOPSChecker:
-    API_ENDPOINT = "https://oops.linkeddata.es/rest"
+    API_ENDPOINT = Config.OOPS_API_ENDPOINT
+    client = CheckerClient("OOPS!", API_ENDPOINT, Config.OOPS_TIMEOUT)
 
     @staticmethod
     def check(ontology_file):
         logger.info("Sending OOPS! API request...")
         try:
-            rdf_data = ontology_file.read().decode('utf-8')
-            owl_data = validate_and_convert_to_owl(rdf_data)
+            ontology = ParsedOntology.from_file(ontology_file)
+            with stage('oops_serialize'):
+                owl_data = validate_and_convert_to_owl(ontology)
             if not owl_data:
                 return None
 
-            body = f"""<?xml version="1.0" encoding="UTF-8"?>
-                    <OOPSRequest>
-                        <OntologyURI></OntologyURI>
-                        <OntologyContent><![CDATA[{owl_data}]]></OntologyContent>
-                        <Pitfalls>P01,P02,P03,P04,P05,P06,P07,P08,P09,P10,P11,P12,P13,P14,P15,P16,P17,P18,P19,P20,P21,P22,P23,P24,P25,P26,P27,P28,P29,P30,P31,P32,P33,P34,P35,P36,P37,P38,P39,P40,P41</Pitfalls>
-                        <OutputFormat>RDF/XML</OutputFormat>
-                    </OOPSRequest>"""
-            
-            response = requests.post(
-                url=OOPSChecker.API_ENDPOINT,
-                headers={"Content-Type": "text/xml"},
-                data=body.encode('utf-8'),
-                timeout=600  # 10 minutes timeout
-            )
-            errors_oops_xml = response.text
-            if "unexpected_error" in errors_oops_xml:
-                logger.error("Unexpected error from OOPS!")
-                return None
-            oops_dict = xmltodict.parse(errors_oops_xml)
-            errors_oops = []
-            for s in oops_dict.get("rdf:RDF", {}).get("rdf:Description", []):
-                if isinstance(s, dict) and s.get("oops:hasName"):
-                    errors_oops.append({
-                        "name": s.get("oops:hasName", {}).get("#text"),
-                        "description": s.get("oops:hasDescription", {}).get("#text"),
-                        "importanceLevel": s.get("oops:hasImportanceLevel", {}).get("#text"),
-                        "code": s.get("oops:hasCode", {}).get("#text"),
-                        "numberAffectedElements": int(s.get("oops:hasNumberAffectedElements", {}).get("#text", 0))
-                    })
-            return errors_oops
+            with stage('oops_request'):
+                # A fresh body generator for every attempt, since a failed one may have consumed it
+                response = OOPSChecker.client.post(
+                    headers={"Content-Type": "text/xml"},
+                    data=lambda: _request_body(owl_data, Config.OOPS_PITFALLS),
+                    stream=True
+                )
+            with response, stage('oops_parse'):
+                return _read_pitfalls(response.iter_content(CHUNK_SIZE))
         except requests.Timeout:
             logger.error("Timeout error for OOPS! API request")
         except requests.RequestException as e:
             logger.error(f"Request error for OOPS! API request: {e}")
         except Exception as e:
             logger.error(f"Error processing OOPS! response: {e}")
-        return None
\ No newline at end of file
+        return None
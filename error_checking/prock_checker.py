@@ -1,28 +1,31 @@
 import requests
 import json
 import logging
-from rdflib import Graph
+from config import Config
+from error_checking.http_client import CheckerClient
+from models.parsed_ontology import ParsedOntology
+from services.instrumentation import stage
 
 logger = logging.getLogger(__name__)
 
 class PROCKChecker:
-    API_ENDPOINT = "http://localhost:8085/defectCandidates"
+    API_ENDPOINT = Config.PROCK_API_ENDPOINT
+    client = CheckerClient("PROCK", API_ENDPOINT, Config.PROCK_TIMEOUT)
 
     @staticmethod
     def check(ontology_file):
         logger.info("Sending PROCK API request...")
         try:
-            rdf_data = ontology_file.read().decode('utf-8')
-            g = Graph()
-            g.parse(data=rdf_data, format="turtle")
-            rdf_data = g.serialize(format="ttl")
-            response = requests.post(
-                url=PROCKChecker.API_ENDPOINT,
-                headers={"Content-Type": "text/turtle"},
-                data=rdf_data.encode('utf-8'),
-                timeout=600  # 10 minutes timeout
-            )
-            return response.json()
+            ontology = ParsedOntology.from_file(ontology_file)
+            with stage('prock_serialize'):
+                rdf_data = ontology.turtle
+            with stage('prock_request'):
+                response = PROCKChecker.client.post(
+                    headers={"Content-Type": "text/turtle"},
+                    data=rdf_data.encode('utf-8')
+                )
+            with stage('prock_decode'):
+                return response.json()
         except requests.Timeout:
             logger.error("Timeout error for PROCK API request")
         except requests.RequestException as e:
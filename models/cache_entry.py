@@ -0,0 +1,14 @@
+from datetime import datetime
+from extensions import db
+
+
+class CacheEntry(db.Model):
+    __tablename__ = 'cache_entries'
+
+    key = db.Column(db.String(255), primary_key=True)
+    namespace = db.Column(db.String(64), nullable=False, index=True)
+    value = db.Column(db.Text, nullable=False)
+    size = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    accessed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
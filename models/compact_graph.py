@@ -0,0 +1,153 @@
+import json
+import os
+import numpy as np
+import rdflib
+from rdflib import BNode, Literal, URIRef
+
+FORMAT_VERSION = 3
+CHUNK_SIZE = 65536
+# Every file of a saved graph; the .npy file of triples is written last
+FILE_SUFFIXES = ('.json', '.text', '.offsets', '.tags', '.npy')
+
+def _term_kind(term):
+    if isinstance(term, URIRef):
+        return 0
+    if isinstance(term, BNode):
+        return 1
+    if isinstance(term, Literal):
+        return 2
+    raise ValueError(f"Cannot store term of type {type(term).__name__}")
+
+
+def _tag_id(ids, value):
+    if value is None:
+        return -1
+    return ids.setdefault(str(value), len(ids))
+
+
+class CompactGraph:
+    # A read-only graph as a term dictionary plus an (n, 3) int32 array of
+    # term ids, with rows sorted by predicate and then subject. Ids are
+    # assigned by kind (URIs, then blank nodes, then literals), so a kind test
+    # is a range check. The dictionary is one UTF-8 blob of term strings with
+    # an array of their offsets, and per literal the ids of its language and
+    # datatype (-1 for none) in two short lists. Only those lists and the
+    # namespaces are JSON; every array is memory-mapped on load, so loading
+    # costs the same for any size and a term is only decoded when asked for.
+    def __init__(self, uri_count, bnode_count, text, offsets, tags, languages, datatypes, triples,
+                 namespaces=()):
+        self.uri_count = uri_count
+        self.bnode_count = bnode_count
+        self.text = text
+        self.offsets = offsets
+        self.tags = tags
+        self.languages = languages
+        self.datatypes = datatypes
+        self.triples = triples
+        self.namespaces = list(namespaces)
+        self._terms = None
+
+    def __len__(self):
+        return len(self.triples)
+
+    @property
+    def term_count(self):
+        return len(self.offsets) - 1
+
+    @classmethod
+    def from_graph(cls, graph):
+        ids = {}
+        rows = np.empty((len(graph), 3), dtype=np.int32)
+        for i, triple in enumerate(graph):
+            for j, term in enumerate(triple):
+                term_id = ids.get(term)
+                if term_id is None:
+                    term_id = ids[term] = len(ids)
+                rows[i, j] = term_id
+
+        terms = list(ids)
+        kinds = [_term_kind(term) for term in terms]
+        order = sorted(range(len(terms)), key=kinds.__getitem__)
+        remap = np.empty(len(terms), dtype=np.int32)
+        remap[order] = np.arange(len(terms), dtype=np.int32)
+        rows = remap[rows]
+        rows = rows[np.lexsort((rows[:, 0], rows[:, 1]))]
+
+        encoded = [str(terms[i]).encode('utf-8') for i in order]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(string) for string in encoded], out=offsets[1:])
+        text = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        languages, datatypes = {}, {}
+        tags = np.array([(_tag_id(languages, terms[i].language), _tag_id(datatypes, terms[i].datatype))
+                         for i in order if kinds[i] == 2], dtype=np.int32).reshape(-1, 2)
+        namespaces = [(prefix, str(namespace)) for prefix, namespace in graph.namespaces()]
+        return cls(kinds.count(0), kinds.count(1), text, offsets, tags, list(languages), list(datatypes), rows,
+                   namespaces)
+
+    def is_uri(self, ids):
+        return ids < self.uri_count
+
+    def is_bnode(self, ids):
+        return (ids >= self.uri_count) & (ids < self.uri_count + self.bnode_count)
+
+    def term(self, term_id):
+        value = self.text[self.offsets[term_id]:self.offsets[term_id + 1]].tobytes().decode('utf-8')
+        if term_id < self.uri_count:
+            return URIRef(value)
+        if term_id < self.uri_count + self.bnode_count:
+            return BNode(value)
+        language, datatype = self.tags[term_id - self.uri_count - self.bnode_count].tolist()
+        return Literal(value, lang=self.languages[language] if language >= 0 else None,
+                       datatype=self.datatypes[datatype] if datatype >= 0 else None)
+
+    @property
+    def terms(self):
+        if self._terms is None:
+            self._terms = [self.term(i) for i in range(self.term_count)]
+        return self._terms
+
+    def iter_triples(self):
+        terms = self.terms
+        for start in range(0, len(self.triples), CHUNK_SIZE):
+            for s, p, o in self.triples[start:start + CHUNK_SIZE].tolist():
+                yield terms[s], terms[p], terms[o]
+
+    def to_graph(self):
+        graph = rdflib.Graph()
+        for prefix, namespace in self.namespaces:
+            graph.bind(prefix, namespace, override=True, replace=True)
+        graph.addN((s, p, o, graph) for s, p, o in self.iter_triples())
+        return graph
+
+    def save(self, prefix):
+        # The .npy file is written last and marks the entry as complete; every
+        # file is renamed into place so readers never see a partial write.
+        header = {
+            "version": FORMAT_VERSION,
+            "namespaces": self.namespaces,
+            "uri_count": self.uri_count,
+            "bnode_count": self.bnode_count,
+            "languages": self.languages,
+            "datatypes": self.datatypes,
+        }
+        pid = os.getpid()
+        with open(f"{prefix}.json.{pid}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(header, f, separators=(',', ':'))
+        for suffix, array, dtype in (('.text', self.text, np.uint8), ('.offsets', self.offsets, np.int64),
+                                     ('.tags', self.tags, np.int32), ('.npy', self.triples, np.int32)):
+            with open(f"{prefix}{suffix}.{pid}.tmp", 'wb') as f:
+                np.save(f, np.ascontiguousarray(array, dtype=dtype))
+        for suffix in FILE_SUFFIXES:
+            os.replace(f"{prefix}{suffix}.{pid}.tmp", f"{prefix}{suffix}")
+
+    @classmethod
+    def load(cls, prefix, mmap=True):
+        with open(f"{prefix}.json", encoding='utf-8') as f:
+            header = json.load(f)
+        if header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact graph version {header.get('version')}")
+        mmap_mode = 'r' if mmap else None
+        text, offsets, tags, triples = (np.load(f"{prefix}{suffix}", mmap_mode=mmap_mode)
+                                        for suffix in ('.text', '.offsets', '.tags', '.npy'))
+        return cls(header["uri_count"], header["bnode_count"], text, offsets, tags, header["languages"],
+                   header["datatypes"], triples, [tuple(ns) for ns in header["namespaces"]])
@@ -1,20 +1,52 @@
-from PyPDF2 import PdfReader
-import tiktoken
-from langchain.prompts import PromptTemplate
-from langchain.output_parsers import ResponseSchema, StructuredOutputParser
-from langchain_together import Together
-from ollama import Client as OllamaClient
+# PyPDF2, tiktoken, langchain and the LLM clients take seconds to import, so
+# they are imported when a processor is first built (or a PDF first read)
+# rather than with the app, which keeps processes that never extract a
+# document quick to start.
+from collections import Counter, deque
+from contextlib import nullcontext
+import logging
 import os
 import re
 import json
+import tempfile
+import time
+from services.instrumentation import external_call_failed, observe_size, record_stage, stage, stage_failed
+
+logger = logging.getLogger(__name__)
+
+def extract_page_range(path, start, end):
+    # Runs in a pool process for parallel extraction; returns (text, seconds) per page.
+    # The PDF is read from a file, so its bytes are not pickled into every task.
+    from PyPDF2 import PdfReader
+    reader = PdfReader(path)
+    pages = []
+    for number in range(start, end):
+        page_start = time.perf_counter()
+        text = reader.pages[number].extract_text() or ""
+        pages.append((text, time.perf_counter() - page_start))
+    return pages
 
 class DocumentProcessor:
-    def __init__(self, api_key_or_host, model_name, service='ollama'):
+    MAX_CONTENT_TOKENS = 7000
+    # Bump whenever the prompt template or the output schema changes, so that
+    # cached completions for the old prompt are not reused
+    PROMPT_VERSION = '1'
+
+    def __init__(self, api_key_or_host, model_name, service='ollama', pages_per_task=8, completion_cache=None,
+                 llm_limiter=None, pages_in_flight=4):
         self.service = service
         self.model_name = model_name
+        self.pages_per_task = pages_per_task
+        # Page ranges submitted ahead of the one being counted
+        self.pages_in_flight = pages_in_flight
+        self.completion_cache = completion_cache
+        # Bounds concurrent calls to the LLM backend across all processors
+        self.llm_limiter = llm_limiter if llm_limiter is not None else nullcontext()
         if service == 'ollama':
+            from ollama import Client as OllamaClient
             self.client = OllamaClient(host=api_key_or_host)
         elif service == 'together':
+            from langchain_together import Together
             os.environ["TOGETHER_API_KEY"] = api_key_or_host
             self.llm = Together(
                 model=model_name,
@@ -26,9 +58,17 @@ class DocumentProcessor:
             raise ValueError(f"Unsupported service: {service}")
         
         self.entity_output_schema_parser = self.setup_output_schema_parser()
-        self.entity_prompt_template = self.setup_prompt_template()
+        # Everything that does not depend on the document is prepared once per
+        # processor, so a pooled processor only pays for the LLM call per request
+        self.format_instructions = self.entity_output_schema_parser.get_format_instructions()
+        self.entity_prompt_template = self.setup_prompt_template().partial(
+            format_instructions=self.format_instructions
+        )
+        import tiktoken
+        self.encoding = tiktoken.get_encoding("cl100k_base")
 
     def setup_output_schema_parser(self):
+        from langchain.output_parsers import ResponseSchema, StructuredOutputParser
         return StructuredOutputParser.from_response_schemas([
             ResponseSchema(name="application_domain", description="The application domain of the ontology described in the document."),
             ResponseSchema(name="summary", description="A brief summary or description of the ontology."),
@@ -36,6 +76,7 @@ class DocumentProcessor:
         ])
 
     def setup_prompt_template(self):
+        from langchain.prompts import PromptTemplate
         return PromptTemplate.from_template("""
         Given the text content of a PDF document, extract the following information according to the format instructions:
 
@@ -60,7 +101,34 @@ class DocumentProcessor:
         << OUTPUT >>
         """)
 
-    def get_completion(self, prompt):
+    def get_completion(self, prompt, timings=None):
+        cache = self.completion_cache
+        if cache is not None:
+            completion = cache.lookup(self.service, self.model_name, prompt)
+            if completion is not None:
+                if timings is not None:
+                    timings["llm_cached"] = True
+                return completion
+
+        queued = time.perf_counter()
+        with self.llm_limiter:
+            record_stage('llm_queue', time.perf_counter() - queued)
+            start = time.perf_counter()
+            with stage('llm'):
+                try:
+                    completion = self.request_completion(prompt)
+                except Exception as e:
+                    external_call_failed(self.service, type(e).__name__)
+                    raise
+            seconds = time.perf_counter() - start
+        if timings is not None:
+            timings["llm"] = round(seconds, 6)
+            timings["llm_cached"] = False
+        if cache is not None:
+            cache.store(self.service, self.model_name, prompt, completion, seconds)
+        return completion
+
+    def request_completion(self, prompt):
         if self.service == 'ollama':
             response = self.client.chat(model=self.model_name, messages=[{'role': 'user', 'content': prompt}])
             return response['message']['content']
@@ -70,25 +138,86 @@ class DocumentProcessor:
         else:
             raise ValueError(f"Unsupported service: {self.service}")
 
+    def get_encoding(self, encoding_name):
+        if encoding_name == self.encoding.name:
+            return self.encoding
+        import tiktoken
+        return tiktoken.get_encoding(encoding_name)
+
     def count_tokens(self, text, encoding_name):
-        encoding = tiktoken.get_encoding(encoding_name)
-        return len(encoding.encode(text))
+        return len(self.get_encoding(encoding_name).encode(text))
 
-    def extract_text_from_pdf(self, file):
+    def extract_text_from_pdf(self, file, max_tokens=None, executor=None, pages_per_task=8, timings=None):
+        # Pages are extracted in order and counted as they come, so extraction
+        # stops once the token budget is met (with a token of slack per page,
+        # since a page boundary can merge tokens). With an executor, ranges of
+        # pages are extracted in parallel in pool processes.
         try:
-            pdf_reader = PdfReader(file)
-            return "".join(page.extract_text() for page in pdf_reader.pages if page.extract_text())
+            start = time.perf_counter()
+            pages = self._pages(file) if executor is None else self._pages_parallel(file, executor, pages_per_task)
+            texts, page_timings, total_tokens, token_seconds = [], [], 0, 0.0
+            try:
+                for batch in pages:
+                    for text, seconds in batch:
+                        count_start = time.perf_counter()
+                        tokens = len(self.encoding.encode(text)) if text else 0
+                        token_seconds += time.perf_counter() - count_start
+                        texts.append(text)
+                        page_timings.append({"page": len(texts), "seconds": round(seconds, 6), "tokens": tokens})
+                        total_tokens += tokens
+                    if max_tokens is not None and total_tokens >= max_tokens + len(texts):
+                        break
+            finally:
+                # Cancels page ranges that have not started yet
+                pages.close()
         except Exception as e:
-            print(f"Failed to extract text from PDF: {str(e)}")
+            stage_failed('pdf_extract')
+            logger.warning(f"Failed to extract text from PDF: {e}")
             return None
+        record_stage('pdf_extract', time.perf_counter() - start - token_seconds)
+        record_stage('token_count', token_seconds)
+        observe_size('pages', len(texts))
+        observe_size('tokens', total_tokens)
+        if timings is not None:
+            timings["pages"] = page_timings
+        return "".join(texts)
+
+    def _pages(self, file):
+        from PyPDF2 import PdfReader
+        for page in PdfReader(file).pages:
+            start = time.perf_counter()
+            text = page.extract_text() or ""
+            yield [(text, time.perf_counter() - start)]
+
+    def _pages_parallel(self, file, executor, pages_per_task):
+        # Ranges are submitted as earlier ones are consumed, at most
+        # pages_in_flight ahead, so little work is wasted once the token
+        # budget is met and the pool stays free for other documents
+        from PyPDF2 import PdfReader
+        with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+            f.write(file.read())
+            path = f.name
+        futures = deque()
+        try:
+            page_count = len(PdfReader(path).pages)
+            ranges = ((start, min(start + pages_per_task, page_count))
+                      for start in range(0, page_count, pages_per_task))
+            for start, end in ranges:
+                futures.append(executor.submit(extract_page_range, path, start, end))
+                if len(futures) >= self.pages_in_flight:
+                    yield futures.popleft().result()
+            while futures:
+                yield futures.popleft().result()
+        finally:
+            for future in futures:
+                future.cancel()
+            os.remove(path)
 
     def truncate_content_if_necessary(self, content, max_tokens=7000):
-        token_count = self.count_tokens(content, "cl100k_base")
-        if token_count > max_tokens:
-            encoding = tiktoken.get_encoding("cl100k_base")
-            encoded_tokens = encoding.encode(content)
-            truncated_tokens = encoded_tokens[:max_tokens]
-            return encoding.decode(truncated_tokens)
+        # Encode once and reuse the tokens for both the count and the cut
+        encoded_tokens = self.encoding.encode(content)
+        if len(encoded_tokens) > max_tokens:
+            return self.encoding.decode(encoded_tokens[:max_tokens])
         return content
 
     def clean_output(self, raw_output):
@@ -99,23 +228,90 @@ class DocumentProcessor:
         cleaned = re.sub(r',\s*]', ']', cleaned)
         return cleaned
 
-    def process_pdf_raw(self, file):
-        pdf_content = self.extract_text_from_pdf(file)
+    def process_pdf_raw(self, file, executor=None, timings=None):
+        start = time.perf_counter()
+        pdf_content = self.extract_text_from_pdf(file, self.MAX_CONTENT_TOKENS, executor, self.pages_per_task, timings)
         if not pdf_content:
             return None
 
-        pdf_content = self.truncate_content_if_necessary(pdf_content)
+        with stage('token_count'):
+            pdf_content = self.truncate_content_if_necessary(pdf_content, self.MAX_CONTENT_TOKENS)
+        if timings is not None:
+            timings["extract"] = round(time.perf_counter() - start, 6)
 
-        entity_prompt = self.entity_prompt_template.format(
-            pdf_content=pdf_content,
-            format_instructions=self.entity_output_schema_parser.get_format_instructions()
-        )
+        entity_prompt = self.entity_prompt_template.format(pdf_content=pdf_content)
 
-        raw_output = self.get_completion(entity_prompt)
+        raw_output = self.get_completion(entity_prompt, timings)
         return self.clean_output(raw_output)
 
-    def process_pdf(self, file):
-        raw_output = self.process_pdf_raw(file)
+    def split_into_chunks(self, content, chunk_tokens):
+        tokens = self.encoding.encode(content)
+        return [self.encoding.decode(tokens[start:start + chunk_tokens])
+                for start in range(0, len(tokens), chunk_tokens)]
+
+    def extract_chunk(self, content, timings=None):
+        prompt = self.entity_prompt_template.format(pdf_content=content)
+        return self.entity_output_schema_parser.parse(self.clean_output(self.get_completion(prompt, timings)))
+
+    @staticmethod
+    def merge_results(partials):
+        # The most frequent domain wins (earliest on ties), the first summary is
+        # kept since the opening of a document usually describes it best, and
+        # competency questions are concatenated without repeats
+        domains = Counter(str(p.get("application_domain") or "").strip() for p in partials)
+        domains.pop("", None)
+        summary = next((str(p.get("summary")).strip() for p in partials if str(p.get("summary") or "").strip()), "")
+
+        questions, seen = [], set()
+        for partial in partials:
+            chunk_questions = partial.get("competency_questions") or []
+            if isinstance(chunk_questions, str):
+                chunk_questions = [chunk_questions]
+            for question in chunk_questions:
+                key = " ".join(str(question).casefold().split()).rstrip("?. ")
+                if key and key not in seen:
+                    seen.add(key)
+                    questions.append(str(question).strip())
+
+        return {
+            "application_domain": domains.most_common(1)[0][0] if domains else "",
+            "summary": summary,
+            "competency_questions": questions,
+        }
+
+    def process_pdf_chunked(self, file, chunk_tokens, max_tokens, map_chunks=map, executor=None, timings=None):
+        # Map-reduce over the whole document (up to max_tokens): every chunk of
+        # chunk_tokens is extracted on its own, as concurrently as map_chunks
+        # allows, and the partial answers are merged. A chunk that fails is
+        # left out; the document fails only if every chunk does.
+        start = time.perf_counter()
+        pdf_content = self.extract_text_from_pdf(file, max_tokens, executor, self.pages_per_task, timings)
+        if not pdf_content:
+            return None
+        with stage('token_count'):
+            chunks = self.split_into_chunks(self.truncate_content_if_necessary(pdf_content, max_tokens), chunk_tokens)
+        chunk_timings = [{"chunk": number + 1} for number in range(len(chunks))]
+        if timings is not None:
+            timings["extract"] = round(time.perf_counter() - start, 6)
+            timings["chunks"] = chunk_timings
+
+        def extract(chunk, chunk_timing):
+            try:
+                return self.extract_chunk(chunk, chunk_timing)
+            except Exception as e:
+                chunk_timing["error"] = str(e)
+                return None
+
+        start = time.perf_counter()
+        partials = [partial for partial in map_chunks(extract, chunks, chunk_timings) if partial is not None]
+        if timings is not None:
+            timings["llm"] = round(time.perf_counter() - start, 6)
+        if not partials:
+            raise ValueError(chunk_timings[0].get("error", "No chunk could be extracted"))
+        return self.merge_results(partials)
+
+    def process_pdf(self, file, executor=None, timings=None):
+        raw_output = self.process_pdf_raw(file, executor, timings)
         if raw_output is None:
             return None
         return self.entity_output_schema_parser.parse(raw_output)
\ No newline at end of file
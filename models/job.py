@@ -0,0 +1,42 @@
+import uuid
+from datetime import datetime
+from extensions import db
+
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    operation = db.Column(db.String(64), nullable=False)
+    status = db.Column(db.String(16), nullable=False, default=QUEUED, index=True)
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+    ontology_filename = db.Column(db.String(255))
+    ontology_data = db.Column(db.LargeBinary)
+    document_filename = db.Column(db.String(255))
+    document_data = db.Column(db.LargeBinary)
+    result = db.Column(db.Text)
+    error = db.Column(db.Text)
+    worker_id = db.Column(db.String(255))
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime, index=True)
+
+    def to_dict(self):
+        return {
+            "job_id": self.id,
+            "operation": self.operation,
+            "status": self.status,
+            "progress": self.progress,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "expires_at": self.expires_at.isoformat() if self.expires_at else None
+        }
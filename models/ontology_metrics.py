@@ -1,78 +1,84 @@
-import rdflib
 from rdflib.namespace import RDF, RDFS, OWL
+from models.triple_index import TripleIndex
 
 class OntologyMetrics:
-    def __init__(self, graph):
+    def __init__(self, graph=None, index=None):
         self.graph = graph
+        self._index = index
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = TripleIndex.from_triples(self.graph)
+        return self._index
 
     def calculate_dl_expressivity(self):
         expressivity = set()
         
-        graph = self.graph
+        has_predicate = self.index.has_predicate
+        has_type = self.index.has_type
 
         # Check for complex class constructors
-        if any(graph.triples((None, OWL.unionOf, None))):
+        if has_predicate(OWL.unionOf):
             expressivity.add('U')
-        if any(graph.triples((None, OWL.intersectionOf, None))):
+        if has_predicate(OWL.intersectionOf):
             expressivity.add('C')
-        if any(graph.triples((None, OWL.complementOf, None))):
+        if has_predicate(OWL.complementOf):
             expressivity.add('C')
-        if any(graph.triples((None, OWL.someValuesFrom, None))):
+        if has_predicate(OWL.someValuesFrom):
             expressivity.add('E')
-        if any(graph.triples((None, OWL.allValuesFrom, None))):
+        if has_predicate(OWL.allValuesFrom):
             expressivity.add('E')
             
         # Check for object and data properties
-        if any(graph.triples((None, RDF.type, OWL.ObjectProperty))):
+        if has_type(OWL.ObjectProperty):
             expressivity.add('R')
-        if any(graph.triples((None, RDF.type, OWL.DatatypeProperty))):
+        if has_type(OWL.DatatypeProperty):
             expressivity.add('D')
 
         # Check for functional properties
-        if any(graph.triples((None, RDF.type, OWL.FunctionalProperty))):
+        if has_type(OWL.FunctionalProperty):
             expressivity.add('F')
-        if any(graph.triples((None, RDF.type, OWL.InverseFunctionalProperty))):
+        if has_type(OWL.InverseFunctionalProperty):
             expressivity.add('I')
 
         # Check for cardinality restrictions
-        if any(graph.triples((None, OWL.maxCardinality, None))) or \
-        any(graph.triples((None, OWL.minCardinality, None))) or \
-        any(graph.triples((None, OWL.cardinality, None))):
+        if has_predicate(OWL.maxCardinality) or \
+        has_predicate(OWL.minCardinality) or \
+        has_predicate(OWL.cardinality):
             expressivity.add('N')
 
         # Role hierarchies (subproperties)
-        if any(graph.triples((None, RDFS.subPropertyOf, None))):
+        if has_predicate(RDFS.subPropertyOf):
             expressivity.add('H')
 
         # Role composition (property chains)
-        if any(graph.triples((None, OWL.propertyChainAxiom, None))):
+        if has_predicate(OWL.propertyChainAxiom):
             expressivity.add('R')
 
         # Reflexivity and irreflexivity
-        if any(graph.triples((None, RDF.type, OWL.ReflexiveProperty))):
+        if has_type(OWL.ReflexiveProperty):
             expressivity.add('X')
-        if any(graph.triples((None, RDF.type, OWL.IrreflexiveProperty))):
+        if has_type(OWL.IrreflexiveProperty):
             expressivity.add('Y')
 
         # Transitivity
-        if any(graph.triples((None, RDF.type, OWL.TransitiveProperty))):
+        if has_type(OWL.TransitiveProperty):
             expressivity.add('T')
 
         # Symmetric and Asymmetric properties
-        if any(graph.triples((None, RDF.type, OWL.SymmetricProperty))):
+        if has_type(OWL.SymmetricProperty):
             expressivity.add('S')
-        if any(graph.triples((None, RDF.type, OWL.AsymmetricProperty))):
+        if has_type(OWL.AsymmetricProperty):
             expressivity.add('A')
 
         # Inverse properties
-        if any(graph.triples((None, OWL.inverseOf, None))):
+        if has_predicate(OWL.inverseOf):
             expressivity.add('I')
 
         # Qualified cardinality restrictions (checking if a property restriction has a specific type)
-        for s, _, _ in graph.triples((None, OWL.onProperty, None)):
-            if any(graph.triples((s, OWL.someValuesFrom, None))) or \
-            any(graph.triples((s, OWL.allValuesFrom, None))):
-                expressivity.add('Q')
+        if self.index.has_qualified_restriction():
+            expressivity.add('Q')
 
         return ''.join(sorted(expressivity))
 
@@ -100,108 +106,101 @@ class OntologyMetrics:
         return "\n".join(explanation_list)
 
     def detect_dl_constructs(self):
-        graph = self.graph
+        has_predicate = self.index.has_predicate
+        has_type = self.index.has_type
         
         constructs = {
-            "is_unionExists": any(graph.triples((None, OWL.unionOf, None))),
-            "is_intersectionExists": any(graph.triples((None, OWL.intersectionOf, None))),
-            "is_complementExists": any(graph.triples((None, OWL.complementOf, None))),
-            "is_existentialRestrictionExists": any(graph.triples((None, OWL.someValuesFrom, None))),
-            "is_universalRestrictionExists": any(graph.triples((None, OWL.allValuesFrom, None))),
-            "is_objectPropertyExists": any(graph.triples((None, RDF.type, OWL.ObjectProperty))),
-            "is_dataPropertyExists": any(graph.triples((None, RDF.type, OWL.DatatypeProperty))),
-            "is_functionalPropertyExists": any(graph.triples((None, RDF.type, OWL.FunctionalProperty))),
-            "is_inverseFunctionalPropertyExists": any(graph.triples((None, RDF.type, OWL.InverseFunctionalProperty))),
-            "is_cardinalityRestrictionExists": any(graph.triples((None, OWL.maxCardinality, None))) or 
-                                            any(graph.triples((None, OWL.minCardinality, None))) or 
-                                            any(graph.triples((None, OWL.cardinality, None))),
-            "is_roleHierarchyExists": any(graph.triples((None, RDFS.subPropertyOf, None))),
-            "is_roleCompositionExists": any(graph.triples((None, OWL.propertyChainAxiom, None))),
-            "is_reflexivePropertyExists": any(graph.triples((None, RDF.type, OWL.ReflexiveProperty))),
-            "is_irreflexivePropertyExists": any(graph.triples((None, RDF.type, OWL.IrreflexiveProperty))),
-            "is_transitivePropertyExists": any(graph.triples((None, RDF.type, OWL.TransitiveProperty))),
-            "is_symmetricPropertyExists": any(graph.triples((None, RDF.type, OWL.SymmetricProperty))),
-            "is_asymmetricPropertyExists": any(graph.triples((None, RDF.type, OWL.AsymmetricProperty))),
-            "is_inversePropertyExists": any(graph.triples((None, OWL.inverseOf, None))),
-            "is_qualifiedCardinalityRestrictionExists": False  # We'll set this below
+            "is_unionExists": has_predicate(OWL.unionOf),
+            "is_intersectionExists": has_predicate(OWL.intersectionOf),
+            "is_complementExists": has_predicate(OWL.complementOf),
+            "is_existentialRestrictionExists": has_predicate(OWL.someValuesFrom),
+            "is_universalRestrictionExists": has_predicate(OWL.allValuesFrom),
+            "is_objectPropertyExists": has_type(OWL.ObjectProperty),
+            "is_dataPropertyExists": has_type(OWL.DatatypeProperty),
+            "is_functionalPropertyExists": has_type(OWL.FunctionalProperty),
+            "is_inverseFunctionalPropertyExists": has_type(OWL.InverseFunctionalProperty),
+            "is_cardinalityRestrictionExists": has_predicate(OWL.maxCardinality) or 
+                                            has_predicate(OWL.minCardinality) or 
+                                            has_predicate(OWL.cardinality),
+            "is_roleHierarchyExists": has_predicate(RDFS.subPropertyOf),
+            "is_roleCompositionExists": has_predicate(OWL.propertyChainAxiom),
+            "is_reflexivePropertyExists": has_type(OWL.ReflexiveProperty),
+            "is_irreflexivePropertyExists": has_type(OWL.IrreflexiveProperty),
+            "is_transitivePropertyExists": has_type(OWL.TransitiveProperty),
+            "is_symmetricPropertyExists": has_type(OWL.SymmetricProperty),
+            "is_asymmetricPropertyExists": has_type(OWL.AsymmetricProperty),
+            "is_inversePropertyExists": has_predicate(OWL.inverseOf),
+            "is_qualifiedCardinalityRestrictionExists": self.index.has_qualified_restriction()
         }
 
-        # Check for qualified cardinality restrictions
-        for s, _, _ in graph.triples((None, OWL.onProperty, None)):
-            if any(graph.triples((s, OWL.someValuesFrom, None))) or any(graph.triples((s, OWL.allValuesFrom, None))):
-                constructs["is_qualifiedCardinalityRestrictionExists"] = True
-                break
-
         return constructs
     
     def calculate_ontology_metrics(self):
-        g = self.graph
+        index = self.index
+        count_predicate = index.count_predicate
+        count_type = index.count_type
 
         # Count of explicit subclass relations
-        subclass_triples = list(g.triples((None, RDFS.subClassOf, None)))
+        subclass_count = count_predicate(RDFS.subClassOf)
         
-        # Calculate GCI: Any subclass relation where either side is not a simple class reference
-        gci_count = 0
-        for s, p, o in subclass_triples:
-            if (not isinstance(s, rdflib.URIRef) or not isinstance(o, rdflib.URIRef)) or \
-            any(g.triples((s, None, None))) or any(g.triples((o, None, None))):
-                gci_count += 1
+        # GCI: a subclass relation whose subclass is an anonymous class expression
+        gci_count = index.gci_count()
 
-        # Attempt to calculate Hidden GCI (very simplistic approach)
-        hidden_gci_count = 0
-        # This could be extended with specific rules or patterns you expect to form hidden GCIs
+        # Hidden GCI: a named class that is both defined by an equivalence and has
+        # a subclass relation of its own
+        hidden_gci_count = index.hidden_gci_count()
 
         metrics = {
-            "Axioms": len(g),
+            "Axioms": index.triple_count,
             "Logical axioms": 0,
             "Declaration axioms count": 0,
             
-            "Class count": len(list(g.triples((None, RDF.type, OWL.Class)))),
-            "Object Property count": len(list(g.triples((None, RDF.type, OWL.ObjectProperty)))),
-            "Data Property count": len(list(g.triples((None, RDF.type, OWL.DatatypeProperty)))),
-            "Individual count": len(list(g.triples((None, RDF.type, OWL.NamedIndividual)))),
-            "Annotation Property count": len(list(g.triples((None, RDF.type, OWL.AnnotationProperty)))),
+            "Class count": count_type(OWL.Class),
+            "Object Property count": count_type(OWL.ObjectProperty),
+            "Data Property count": count_type(OWL.DatatypeProperty),
+            "Individual count": count_type(OWL.NamedIndividual),
+            "Annotation Property count": count_type(OWL.AnnotationProperty),
             
-            "SubClassOf": len(subclass_triples),
-            "EquivalentClasses": len(list(g.triples((None, OWL.equivalentClass, None)))),
-            "DisjointClasses": len(list(g.triples((None, OWL.disjointWith, None)))),
+            "SubClassOf": subclass_count,
+            "EquivalentClasses": count_predicate(OWL.equivalentClass),
+            "DisjointClasses": count_predicate(OWL.disjointWith),
             "GCI Count": gci_count,
             "Hidden GCI Count": hidden_gci_count,
             
-            "SubObjectPropertyOf": len(list(g.triples((None, RDFS.subPropertyOf, None)))),
-            "EquivalentObjectProperties": len(list(g.triples((None, OWL.equivalentProperty, None)))),
-            "InverseObjectProperties": len(list(g.triples((None, OWL.inverseOf, None)))),
-            "DisjointObjectProperties": len(list(g.triples((None, OWL.propertyDisjointWith, None)))),
-            "FunctionalObjectProperty": len(list(g.triples((None, RDF.type, OWL.FunctionalProperty)))),
-            "InverseFunctionalObjectProperty": len(list(g.triples((None, RDF.type, OWL.InverseFunctionalProperty)))),
-            "TransitiveObjectProperty": len(list(g.triples((None, RDF.type, OWL.TransitiveProperty)))),
-            "SymmetricObjectProperty": len(list(g.triples((None, RDF.type, OWL.SymmetricProperty)))),
-            "AsymmetricObjectProperty": len(list(g.triples((None, RDF.type, OWL.AsymmetricProperty)))),
-            "ReflexiveObjectProperty": len(list(g.triples((None, RDF.type, OWL.ReflexiveProperty)))),
-            "IrreflexiveObjectProperty": len(list(g.triples((None, RDF.type, OWL.IrreflexiveProperty)))),
-            "ObjectPropertyDomain": len(list(g.triples((None, RDFS.domain, None)))),
-            "ObjectPropertyRange": len(list(g.triples((None, RDFS.range, None)))),
-            "SubPropertyChainOf": len(list(g.triples((None, OWL.propertyChainAxiom, None)))),
+            "SubObjectPropertyOf": count_predicate(RDFS.subPropertyOf),
+            "EquivalentObjectProperties": count_predicate(OWL.equivalentProperty),
+            "InverseObjectProperties": count_predicate(OWL.inverseOf),
+            "DisjointObjectProperties": count_predicate(OWL.propertyDisjointWith),
+            "FunctionalObjectProperty": count_type(OWL.FunctionalProperty),
+            "InverseFunctionalObjectProperty": count_type(OWL.InverseFunctionalProperty),
+            "TransitiveObjectProperty": count_type(OWL.TransitiveProperty),
+            "SymmetricObjectProperty": count_type(OWL.SymmetricProperty),
+            "AsymmetricObjectProperty": count_type(OWL.AsymmetricProperty),
+            "ReflexiveObjectProperty": count_type(OWL.ReflexiveProperty),
+            "IrreflexiveObjectProperty": count_type(OWL.IrreflexiveProperty),
+            "ObjectPropertyDomain": count_predicate(RDFS.domain),
+            "ObjectPropertyRange": count_predicate(RDFS.range),
+            "SubPropertyChainOf": count_predicate(OWL.propertyChainAxiom),
             
-            "SubDataPropertyOf": len(list(g.triples((None, RDFS.subPropertyOf, None)))),
-            "EquivalentDataProperties": len(list(g.triples((None, OWL.equivalentProperty, None)))),
-            "DisjointDataProperties": len(list(g.triples((None, OWL.propertyDisjointWith, None)))),
-            "FunctionalDataProperty": len(list(g.triples((None, RDF.type, OWL.FunctionalProperty)))),
-            "DataPropertyDomain": len(list(g.triples((None, RDFS.domain, None)))),
-            "DataPropertyRange": len(list(g.triples((None, RDFS.range, None)))),
+            "SubDataPropertyOf": count_predicate(RDFS.subPropertyOf),
+            "EquivalentDataProperties": count_predicate(OWL.equivalentProperty),
+            "DisjointDataProperties": count_predicate(OWL.propertyDisjointWith),
+            "FunctionalDataProperty": count_type(OWL.FunctionalProperty),
+            "DataPropertyDomain": count_predicate(RDFS.domain),
+            "DataPropertyRange": count_predicate(RDFS.range),
             
-            "ClassAssertion": len(list(g.triples((None, RDF.type, None)))),
-            "ObjectPropertyAssertion": len(list(g.triples((None, None, None)))),
-            "DataPropertyAssertion": len(list(g.triples((None, None, None)))),
-            "NegativeObjectPropertyAssertion": len(list(g.triples((None, OWL.sourceIndividual, None)))),
-            "NegativeDataPropertyAssertion": len(list(g.triples((None, OWL.sourceIndividual, None)))),
-            "SameIndividual": len(list(g.triples((None, OWL.sameAs, None)))),
-            "DifferentIndividuals": len(list(g.triples((None, OWL.differentFrom, None)))),
+            "ClassAssertion": count_predicate(RDF.type),
+            "ObjectPropertyAssertion": index.triple_count,
+            "DataPropertyAssertion": index.triple_count,
+            "NegativeObjectPropertyAssertion": count_predicate(OWL.sourceIndividual),
+            "NegativeDataPropertyAssertion": count_predicate(OWL.sourceIndividual),
+            "SameIndividual": count_predicate(OWL.sameAs),
+            "DifferentIndividuals": count_predicate(OWL.differentFrom),
             
-            "AnnotationAssertion": len(list(g.triples((None, None, None)))),
-            "AnnotationPropertyDomain": len(list(g.triples((None, RDFS.domain, None)))),
-            "AnnotationPropertyRange": len(list(g.triples((None, RDFS.range, None)))),
-            "SubAnnotationPropertyOf": len(list(g.triples((None, RDFS.subPropertyOf, None)))),
+            "AnnotationAssertion": index.triple_count,
+            "AnnotationPropertyDomain": count_predicate(RDFS.domain),
+            "AnnotationPropertyRange": count_predicate(RDFS.range),
+            "SubAnnotationPropertyOf": count_predicate(RDFS.subPropertyOf),
         }
 
         metrics["Logical axioms"] = (
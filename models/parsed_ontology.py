@@ -0,0 +1,109 @@
+import hashlib
+import threading
+import rdflib
+from services.graph_cache import graph_cache
+from services.profiler import note_content_hash
+from utils.upload_utils import COPY_CHUNK_SIZE, ontology_format, open_buffer, read_ontology_upload, sniff_format
+
+BOM = b'\xef\xbb\xbf'
+
+def _normalized_hash(buffer):
+    # sha256 of the contents without a byte-order mark, with \r\n line endings
+    # as \n and without trailing whitespace, computed chunk by chunk so that a
+    # memory-mapped upload is never copied as a whole. Trailing whitespace is
+    # held back until something follows it, which also keeps a \r\n that
+    # straddles two chunks together.
+    view = memoryview(buffer)
+    digest = hashlib.sha256()
+    pending = b''
+    start = len(BOM) if view[:len(BOM)] == BOM else 0
+    for offset in range(start, len(view), COPY_CHUNK_SIZE):
+        chunk = pending + bytes(view[offset:offset + COPY_CHUNK_SIZE])
+        content = chunk.rstrip()
+        digest.update(content.replace(b'\r\n', b'\n'))
+        pending = chunk[len(content):]
+    return digest.hexdigest()
+
+
+class ParsedOntology:
+    # One uploaded ontology, parsed at most once per request and shared by the
+    # metrics service and both checkers. Serializations are cached by format,
+    # and parsed graphs are kept in the on-disk graph cache across requests.
+    # `data` is bytes or a read-only memory map of a spooled upload, and is
+    # only ever read through views of it.
+    def __init__(self, data, filename=None, format=None):
+        self.data = data
+        self.filename = filename
+        self.format = format or ontology_format(filename) or sniff_format(memoryview(data)[:512])
+        self._lock = threading.RLock()
+        self._graph = None
+        self._compact = None
+        self._compact_checked = False
+        self._parse_error = None
+        self._serializations = {}
+        self._content_hash = None
+
+    @classmethod
+    def from_file(cls, ontology_file, filename=None):
+        # Uploads (FileStorage) and open binary files; .gz and .zip files are
+        # decompressed, and large ones end up memory-mapped rather than read
+        if isinstance(ontology_file, cls):
+            return ontology_file
+        data, filename = read_ontology_upload(getattr(ontology_file, 'stream', ontology_file),
+                                              filename or getattr(ontology_file, 'filename', None))
+        return cls(data, filename=filename)
+
+    def open(self):
+        return open_buffer(self.data)
+
+    @property
+    def content_hash(self):
+        # Byte-order marks and line-ending differences do not change the ontology,
+        # so they must not change its cache key either.
+        if self._content_hash is None:
+            self._content_hash = _normalized_hash(self.data)
+            note_content_hash(self._content_hash)
+        return self._content_hash
+
+    @property
+    def compact(self):
+        # The cached compact graph if this ontology was parsed before; never parses
+        with self._lock:
+            if not self._compact_checked:
+                self._compact = graph_cache.get(self.content_hash)
+                self._compact_checked = True
+            return self._compact
+
+    @property
+    def graph(self):
+        with self._lock:
+            if self._graph is None:
+                if self._parse_error is not None:
+                    raise self._parse_error
+                if self.compact is not None:
+                    self._graph = self.compact.to_graph()
+                    return self._graph
+                graph = rdflib.Graph()
+                try:
+                    graph.parse(source=self.open(), format=self.format)
+                except Exception as e:
+                    self._parse_error = e
+                    raise
+                self._compact = graph_cache.put(self.content_hash, graph)
+                self._compact_checked = True
+                self._graph = graph
+            return self._graph
+
+    def serialize(self, format):
+        with self._lock:
+            if format not in self._serializations:
+                self._serializations[format] = self.graph.serialize(format=format)
+            return self._serializations[format]
+
+    @property
+    def turtle(self):
+        return self.serialize("turtle")
+
+    @property
+    def rdf_xml(self):
+        return self.serialize("xml")
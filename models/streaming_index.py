@@ -0,0 +1,164 @@
+import hashlib
+import io
+from concurrent.futures import FIRST_COMPLETED, wait
+import numpy as np
+import rdflib
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser
+from rdflib.store import Store
+from models.triple_index import TripleIndex
+from utils.upload_utils import open_buffer
+
+
+def triple_key(triple):
+    # 128-bit digest used to recognise repeated triples; unlike hash(), a
+    # collision (and with it a dropped distinct triple) is not a practical risk
+    s, p, o = triple
+    return hashlib.blake2b(f"{s.n3()} {p.n3()} {o.n3()}".encode('utf-8'), digest_size=16).digest()
+
+
+class IndexingStore(Store):
+    # Write-only rdflib store: parsed triples are folded into a TripleIndex in
+    # batches and then dropped. Like a Graph, it counts a repeated triple
+    # once, which means remembering a 16-byte digest of every distinct triple
+    # seen: memory still grows with the ontology (about 80 bytes per distinct
+    # triple for the digest set), just far more slowly than a graph's.
+    def __init__(self, index, batch_size=10000):
+        super().__init__()
+        self.index = index
+        self.batch_size = batch_size
+        self._batch = []
+        self._seen = set()
+        self._namespaces = {}
+
+    def add(self, triple, context, quoted=False):
+        self.add_new(triple)
+
+    def add_new(self, triple):
+        # The triple's key if it had not been seen before, else None
+        key = triple_key(triple)
+        if key in self._seen:
+            return None
+        self._seen.add(key)
+        self._batch.append(triple)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+        return key
+
+    def addN(self, quads):
+        for s, p, o, _ in quads:
+            self.add((s, p, o), None)
+
+    def flush(self):
+        if self._batch:
+            self.index.update(self._batch)
+            self._batch = []
+
+    def bind(self, prefix, namespace, override=True):
+        if override or prefix not in self._namespaces:
+            self._namespaces[prefix] = namespace
+
+    def namespace(self, prefix):
+        return self._namespaces.get(prefix)
+
+    def prefix(self, namespace):
+        for prefix, bound in self._namespaces.items():
+            if bound == namespace:
+                return prefix
+        return None
+
+    def namespaces(self):
+        return iter(self._namespaces.items())
+
+    def __len__(self, context=None):
+        return self.index.triple_count + len(self._batch)
+
+
+def stream_triple_index(data=None, source=None, format="turtle"):
+    index = TripleIndex()
+    store = IndexingStore(index)
+    rdflib.Graph(store=store).parse(data=data, source=source, format=format)
+    store.flush()
+    return index
+
+
+class _DocumentBNodes(dict):
+    # Blank node context that keeps the labels of the input, so that `_:b1`
+    # parsed in two chunks of the same file is one node once merged
+    def get(self, label, default=None):
+        return label
+
+
+class _IndexingSink:
+    # Also records the first 64 bits of every distinct triple's key, which
+    # (unlike hash()) is stable across processes, to find triples repeated in
+    # different chunks. A collision there only makes the merge fall back to a
+    # single pass, it never drops a triple.
+    def __init__(self, store):
+        self.store = store
+        self.digests = []
+
+    def triple(self, s, p, o):
+        key = self.store.add_new((s, p, o))
+        if key is not None:
+            self.digests.append(int.from_bytes(key[:8], 'little'))
+
+
+def index_ntriples_chunk(chunk):
+    # Runs in a pool process on a run of complete N-Triples lines; returns the
+    # chunk's index (repeats within the chunk counted once) and the sorted
+    # digests of its distinct triples
+    index = TripleIndex()
+    store = IndexingStore(index)
+    sink = _IndexingSink(store)
+    W3CNTriplesParser(sink).parse(io.BytesIO(chunk), bnode_context=_DocumentBNodes())
+    store.flush()
+    return index, np.unique(np.array(sink.digests, dtype=np.uint64))
+
+
+def line_ranges(data, chunk_bytes):
+    # (start, end) byte ranges of about chunk_bytes that end at a line break;
+    # N-Triples cannot break a statement across lines, so each is parseable
+    start, size = 0, len(data)
+    while start < size:
+        end = start + chunk_bytes
+        if end >= size:
+            end = size
+        else:
+            newline = data.find(b'\n', end)
+            end = size if newline < 0 else newline + 1
+        yield start, end
+        start = end
+
+
+def parallel_triple_index(data, executor, chunk_bytes, max_in_flight):
+    # N-Triples only: chunks are parsed on the executor's processes and their
+    # partial indexes merged as they complete. At most max_in_flight chunks
+    # are copied out of `data` (bytes or a memory map) at any time. A triple
+    # repeated in two chunks would be counted twice by the merge, so in that
+    # (rare) case the file is indexed again in one pass.
+    index = TripleIndex()
+    digests = []
+    ranges = line_ranges(data, chunk_bytes)
+    in_flight = set()
+    for start, end in ranges:
+        in_flight.add(executor.submit(index_ntriples_chunk, data[start:end]))
+        if len(in_flight) >= max_in_flight:
+            break
+    try:
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                partial, chunk_digests = future.result()
+                index.merge(partial)
+                digests.append(chunk_digests)
+                next_range = next(ranges, None)
+                if next_range is not None:
+                    in_flight.add(executor.submit(index_ntriples_chunk, data[next_range[0]:next_range[1]]))
+    finally:
+        # After a parse error, chunks that have not started are dropped
+        for future in in_flight:
+            future.cancel()
+    distinct = np.unique(np.concatenate(digests)) if digests else ()
+    if len(distinct) != index.triple_count:
+        return stream_triple_index(source=open_buffer(data), format='nt')
+    return index
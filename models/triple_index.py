@@ -0,0 +1,258 @@
+import hashlib
+from collections import Counter
+import numpy as np
+from rdflib import BNode, URIRef
+from rdflib.namespace import RDF, RDFS, OWL
+
+# Predicates whose subject is an anonymous class expression when it is a blank node
+CLASS_CONSTRUCTORS = frozenset([
+    OWL.unionOf, OWL.intersectionOf, OWL.complementOf, OWL.oneOf, OWL.onProperty
+])
+CLASS_EXPRESSION_TYPES = frozenset([OWL.Restriction, OWL.Class])
+
+def triple_digest(triple):
+    # 64-bit digest of a triple that, unlike hash(), is the same in every process
+    s, p, o = triple
+    return int.from_bytes(hashlib.blake2b(f"{s.n3()} {p.n3()} {o.n3()}".encode('utf-8'), digest_size=8).digest(),
+                          'little')
+
+
+class TripleIndex:
+    # Single-pass summary of a graph: everything OntologyMetrics needs is
+    # derived from these histograms instead of repeated store lookups. Term
+    # sets are kept as counts of supporting triples so that triples can be
+    # removed again.
+    COUNTERS = ('predicate_counts', 'type_counts', 'on_property_subjects', 'value_restriction_subjects',
+                'class_expressions', 'anonymous_subclass_counts', 'named_subclasses', 'named_equivalent_classes')
+
+    def __init__(self):
+        self.triple_count = 0
+        self.predicate_counts = Counter()
+        self.type_counts = Counter()
+        self.on_property_subjects = Counter()
+        self.value_restriction_subjects = Counter()
+        self.class_expressions = Counter()
+        self.anonymous_subclass_counts = Counter()
+        self.named_subclasses = Counter()
+        self.named_equivalent_classes = Counter()
+
+    @classmethod
+    def from_triples(cls, triples):
+        index = cls()
+        index.update(triples)
+        return index
+
+    @classmethod
+    def from_compact_graph(cls, compact):
+        # Vectorized build: the rows of a CompactGraph are sorted by predicate,
+        # so each predicate is one slice and every histogram is a bincount over
+        # it. Only the terms that end up in the index are decoded.
+        index = cls()
+        triples = compact.triples
+        s_col = np.asarray(triples[:, 0])
+        p_col = np.asarray(triples[:, 1])
+        o_col = np.asarray(triples[:, 2])
+        index.triple_count = len(p_col)
+
+        slices = {}
+        if len(p_col):
+            boundaries = (np.flatnonzero(p_col[1:] != p_col[:-1]) + 1).tolist()
+            for start, end in zip([0] + boundaries, boundaries + [len(p_col)]):
+                slices[compact.term(int(p_col[start]))] = (start, end)
+        index.predicate_counts.update({p: end - start for p, (start, end) in slices.items()})
+
+        def rows(*predicates):
+            parts = [slices[p] for p in predicates if p in slices]
+            if not parts:
+                empty = np.empty(0, dtype=np.int32)
+                return empty, empty
+            return (np.concatenate([s_col[start:end] for start, end in parts]),
+                    np.concatenate([o_col[start:end] for start, end in parts]))
+
+        def decode(ids):
+            term_ids, counts = np.unique(ids, return_counts=True)
+            return {compact.term(term_id): count for term_id, count in zip(term_ids.tolist(), counts.tolist())}
+
+        subjects, objects = rows(RDF.type)
+        type_ids, type_counts = np.unique(objects, return_counts=True)
+        types = [compact.term(term_id) for term_id in type_ids.tolist()]
+        index.type_counts.update(dict(zip(types, type_counts.tolist())))
+        expression_type_ids = [term_id for term_id, t in zip(type_ids.tolist(), types)
+                               if t in CLASS_EXPRESSION_TYPES]
+        typed_expressions = subjects[np.isin(objects, expression_type_ids) & compact.is_bnode(subjects)]
+        constructed, _ = rows(*CLASS_CONSTRUCTORS)
+        index.class_expressions.update(decode(np.concatenate(
+            (typed_expressions, constructed[compact.is_bnode(constructed)]))))
+
+        subjects, _ = rows(RDFS.subClassOf)
+        index.anonymous_subclass_counts.update(decode(subjects[compact.is_bnode(subjects)]))
+        index.named_subclasses.update(decode(subjects[compact.is_uri(subjects)]))
+
+        subjects, objects = rows(OWL.equivalentClass)
+        equivalents = np.concatenate((subjects, objects))
+        index.named_equivalent_classes.update(decode(equivalents[compact.is_uri(equivalents)]))
+
+        index.on_property_subjects.update(decode(rows(OWL.onProperty)[0]))
+        index.value_restriction_subjects.update(decode(rows(OWL.someValuesFrom, OWL.allValuesFrom)[0]))
+        return index
+
+    def update(self, triples):
+        predicate_counts = self.predicate_counts
+        type_counts = self.type_counts
+        on_property_subjects = self.on_property_subjects
+        value_restriction_subjects = self.value_restriction_subjects
+        class_expressions = self.class_expressions
+        anonymous_subclass_counts = self.anonymous_subclass_counts
+        named_subclasses = self.named_subclasses
+        named_equivalent_classes = self.named_equivalent_classes
+        rdf_type = RDF.type
+        on_property = OWL.onProperty
+        sub_class_of = RDFS.subClassOf
+        equivalent_class = OWL.equivalentClass
+        value_restrictions = (OWL.someValuesFrom, OWL.allValuesFrom)
+
+        count = 0
+        for s, p, o in triples:
+            count += 1
+            predicate_counts[p] += 1
+            if p == rdf_type:
+                type_counts[o] += 1
+                if o in CLASS_EXPRESSION_TYPES and isinstance(s, BNode):
+                    class_expressions[s] += 1
+            elif p == sub_class_of:
+                if isinstance(s, BNode):
+                    anonymous_subclass_counts[s] += 1
+                elif isinstance(s, URIRef):
+                    named_subclasses[s] += 1
+            elif p == equivalent_class:
+                if isinstance(s, URIRef):
+                    named_equivalent_classes[s] += 1
+                if isinstance(o, URIRef):
+                    named_equivalent_classes[o] += 1
+            elif p in CLASS_CONSTRUCTORS:
+                if p == on_property:
+                    on_property_subjects[s] += 1
+                if isinstance(s, BNode):
+                    class_expressions[s] += 1
+            elif p in value_restrictions:
+                value_restriction_subjects[s] += 1
+        self.triple_count += count
+
+    def remove(self, triples):
+        self.subtract(TripleIndex.from_triples(triples))
+
+    def merge(self, other):
+        self.triple_count += other.triple_count
+        for name in self.COUNTERS:
+            getattr(self, name).update(getattr(other, name))
+
+    def subtract(self, other):
+        # Only the keys of the (usually small) other index can drop to zero
+        self.triple_count -= other.triple_count
+        for name in self.COUNTERS:
+            counter, removed = getattr(self, name), getattr(other, name)
+            counter.subtract(removed)
+            for key in removed:
+                if counter[key] <= 0:
+                    del counter[key]
+
+    def get(self, name, key):
+        return getattr(self, name).get(key, 0)
+
+    def count_predicate(self, predicate):
+        return self.predicate_counts.get(predicate, 0)
+
+    def count_type(self, rdf_type):
+        return self.type_counts.get(rdf_type, 0)
+
+    def has_predicate(self, predicate):
+        return self.count_predicate(predicate) > 0
+
+    def has_type(self, rdf_type):
+        return self.count_type(rdf_type) > 0
+
+    def gci_count(self):
+        # SubClassOf axioms whose subclass is an anonymous class expression; each
+        # axiom is classified with a single set lookup
+        class_expressions = self.class_expressions
+        return sum(count for s, count in self.anonymous_subclass_counts.items() if s in class_expressions)
+
+    def hidden_gci_count(self):
+        # Named classes with both an EquivalentClasses and a SubClassOf axiom,
+        # as counted by the OWL API
+        return len(self.named_subclasses.keys() & self.named_equivalent_classes.keys())
+
+    def has_qualified_restriction(self):
+        return not self.on_property_subjects.keys().isdisjoint(self.value_restriction_subjects.keys())
+
+
+class IndexOverlay:
+    # A read-only TripleIndex stored as its difference from a parent index.
+    # Counter lookups walk the chain of parents, and the aggregates the
+    # metrics need are carried over from the parent and corrected for the
+    # changed keys only, so deriving an overlay costs time in proportion to
+    # the change rather than to the index.
+    def __init__(self, parent, delta, triple_count, gci, hidden_gci, qualified):
+        self.parent = parent
+        self.delta = delta
+        self.triple_count = triple_count
+        self._gci = gci
+        self._hidden_gci = hidden_gci
+        self._qualified = qualified
+
+    @classmethod
+    def over(cls, index):
+        # An empty overlay on a full TripleIndex, which pays for the aggregates once
+        return cls(index, {name: Counter() for name in TripleIndex.COUNTERS}, index.triple_count,
+                   index.gci_count(), index.hidden_gci_count(),
+                   len(index.on_property_subjects.keys() & index.value_restriction_subjects.keys()))
+
+    def derive(self, added, removed):
+        # added and removed are TripleIndexes of the triples that changed
+        delta = {}
+        for name in TripleIndex.COUNTERS:
+            counter = Counter(getattr(added, name))
+            counter.subtract(getattr(removed, name))
+            delta[name] = Counter({key: value for key, value in counter.items() if value})
+        overlay = IndexOverlay(self, delta, self.triple_count + added.triple_count - removed.triple_count,
+                               self._gci, self._hidden_gci, self._qualified)
+
+        def change(first, second, value):
+            keys = delta[first].keys() | delta[second].keys()
+            return sum(value(overlay, key) - value(self, key) for key in keys)
+
+        overlay._gci += change('anonymous_subclass_counts', 'class_expressions', lambda index, s: (
+            index.get('anonymous_subclass_counts', s) if index.get('class_expressions', s) > 0 else 0))
+        overlay._hidden_gci += change('named_subclasses', 'named_equivalent_classes', lambda index, s: int(
+            index.get('named_subclasses', s) > 0 and index.get('named_equivalent_classes', s) > 0))
+        overlay._qualified += change('on_property_subjects', 'value_restriction_subjects', lambda index, s: int(
+            index.get('on_property_subjects', s) > 0 and index.get('value_restriction_subjects', s) > 0))
+        return overlay
+
+    def get(self, name, key):
+        value, index = 0, self
+        while isinstance(index, IndexOverlay):
+            value += index.delta[name].get(key, 0)
+            index = index.parent
+        return value + index.get(name, key)
+
+    def count_predicate(self, predicate):
+        return self.get('predicate_counts', predicate)
+
+    def count_type(self, rdf_type):
+        return self.get('type_counts', rdf_type)
+
+    def has_predicate(self, predicate):
+        return self.count_predicate(predicate) > 0
+
+    def has_type(self, rdf_type):
+        return self.count_type(rdf_type) > 0
+
+    def gci_count(self):
+        return self._gci
+
+    def hidden_gci_count(self):
+        return self._hidden_gci
+
+    def has_qualified_restriction(self):
+        return self._qualified > 0
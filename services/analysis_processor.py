@@ -0,0 +1,85 @@
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, has_app_context
+from config import Config
+from models.parsed_ontology import ParsedOntology
+from services.ontology_processor import OntologyProcessor
+from services.document_processor import DocumentProcessor
+from services.error_checker import ErrorChecker
+from services.profiler import run_profiled
+
+executor = ThreadPoolExecutor(max_workers=Config.ANALYSIS_MAX_WORKERS, thread_name_prefix='analysis')
+
+def _run_stage(app, func, *args):
+    # Each stage gets its own app context so it has its own database session
+    start = time.perf_counter()
+    if app is None:
+        result = func(*args)
+    else:
+        with app.app_context():
+            result = func(*args)
+    return result, round(time.perf_counter() - start, 3)
+
+def _submit(func, *args):
+    return executor.submit(contextvars.copy_context().run, run_profiled, func, *args)
+
+class AnalysisProcessor:
+    @staticmethod
+    def analyze(ontology_file, document_file, on_progress=None):
+        # on_progress(fraction) is called in this thread as each stage finishes
+        # Read and parse the ontology once for metrics and both checkers
+        ontology = ParsedOntology.from_file(ontology_file)
+        app = current_app._get_current_object() if has_app_context() else None
+
+        # Every stage starts at once, the document (LLM) stage first since it
+        # needs nothing from the ontology. The ontology is parsed once and
+        # shared: the checkers wait on the ParsedOntology for the parse the
+        # ontology stage does (or do it themselves, whichever comes first),
+        # and an ontology that cannot be parsed fails them before they call
+        # their service. The checkers need the full graph, so metrics never
+        # stream here. Each stage runs in a copy of the request's context, so
+        # the stages it times show up in the request's Server-Timing header
+        # and its calls in the request's profile.
+        futures = {
+            "document": _submit(_run_stage, app, DocumentProcessor.process_document, document_file),
+            "prock": _submit(_run_stage, app, ErrorChecker.check_prock, ontology),
+            "oops": _submit(_run_stage, app, ErrorChecker.check_oops, ontology),
+        }
+        stage_timings = {}
+        stages = 4
+
+        try:
+            # Results are collected in the order the stages used to run, which
+            # keeps the error precedence
+            (metrics, ontology_error), stage_timings["ontology_metrics"] = _run_stage(
+                app, OntologyProcessor.process_ontology, ontology, False)
+            if ontology_error:
+                return None, f"Error processing ontology: {ontology_error}"
+            if on_progress is not None:
+                on_progress(len(stage_timings) / stages)
+
+            (document_data, document_error), stage_timings["document"] = futures["document"].result()
+            if document_error:
+                return None, f"Error processing document: {document_error}"
+            if on_progress is not None:
+                on_progress(len(stage_timings) / stages)
+
+            prock_errors, stage_timings["prock"] = futures["prock"].result()
+            if on_progress is not None:
+                on_progress(len(stage_timings) / stages)
+            oops_errors, stage_timings["oops"] = futures["oops"].result()
+        finally:
+            for future in futures.values():
+                future.cancel()
+
+        result = {
+            "ontology_description": document_data.get('ontology_description', ''),
+            "application_domain": document_data.get('application_domain', ''),
+            "competency_questions": document_data.get('competency_questions', []),
+            "ontology_metrics": metrics,
+            "prock_errors": prock_errors,
+            "oops_errors": oops_errors,
+            "stage_timings": stage_timings
+        }
+        return result, None
@@ -0,0 +1,160 @@
+import glob
+import json
+import logging
+import os
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from config import Config
+from models.parsed_ontology import ParsedOntology
+from services.error_checker import ErrorChecker
+from services.ontology_metrics import OntologyMetricsService
+from utils.upload_utils import ontology_format
+
+logger = logging.getLogger(__name__)
+
+CHECKS = {
+    'prock': ErrorChecker.check_prock,
+    'oops': ErrorChecker.check_oops,
+}
+
+def _is_supported(path):
+    # Any ontology format, gzipped or not
+    return ontology_format(path) is not None
+
+def _load(task):
+    # Large files on disk are memory-mapped rather than read
+    filepath, archive, member = task
+    name = os.path.basename(filepath)
+    if archive is None:
+        with open(filepath, 'rb') as f:
+            return ParsedOntology.from_file(f, name)
+    with zipfile.ZipFile(archive) as z, z.open(member) as f:
+        return ParsedOntology.from_file(f, name)
+
+def _init_worker():
+    # Files are already analyzed in parallel, one per process
+    Config.PARALLEL_PARSE_PROCESSES = 0
+
+def _analyze_file(task, checks):
+    # Runs in a pool process, so any failure is reported on the file's own line
+    filepath = task[0]
+    start = time.perf_counter()
+    record = {"filepath": filepath, "error": None}
+    try:
+        ontology = _load(task)
+        record["content_hash"] = ontology.content_hash
+        # The checkers need the full graph, so only stream when none are run
+        metrics, error = OntologyMetricsService.calculate_metrics(ontology, False if checks else None)
+        if error:
+            record["error"] = f"Error processing ontology: {error}"
+        else:
+            record["ontology_metrics"] = metrics
+            for name in checks:
+                record[f"{name}_errors"] = CHECKS[name](ontology)
+    except Exception as e:
+        record["error"] = str(e)
+    record["seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+class BatchAnalyzer:
+    @staticmethod
+    def _failed(task, error):
+        if isinstance(error, BrokenProcessPool):
+            error = "The worker process analyzing this file exited unexpectedly"
+        return {"filepath": task[0], "error": str(error)}
+
+    @staticmethod
+    def collect_tasks(source):
+        # A task is (filepath, archive, member); archive and member are only set for zip entries
+        if zipfile.is_zipfile(source):
+            with zipfile.ZipFile(source) as z:
+                return [(f"{source}/{name}", source, name)
+                        for name in sorted(z.namelist()) if _is_supported(name)]
+        if os.path.isdir(source):
+            paths = glob.glob(os.path.join(source, '**', '*'), recursive=True)
+        else:
+            paths = glob.glob(source, recursive=True)
+        return [(path, None, None) for path in sorted(paths) if os.path.isfile(path) and _is_supported(path)]
+
+    @staticmethod
+    def completed_filepaths(output_path):
+        # Files that already have a successful line in a previous run's output
+        completed = set()
+        if not os.path.exists(output_path):
+            return completed
+        with open(output_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a run interrupted mid-write leaves a partial last line
+                if not record.get("error"):
+                    completed.add(record.get("filepath"))
+        return completed
+
+    @staticmethod
+    def run(source, checks=(), max_workers=None, skip=()):
+        unknown = set(checks) - set(CHECKS)
+        if unknown:
+            raise ValueError(f"Unsupported checks: {', '.join(sorted(unknown))}")
+
+        tasks = [task for task in BatchAnalyzer.collect_tasks(source) if task[0] not in skip]
+        max_workers = max_workers or Config.BATCH_MAX_WORKERS or os.cpu_count()
+        logger.info(f"Analyzing {len(tasks)} ontologies from {source} on {max_workers} processes")
+
+        # Keep a bounded number of files in flight and yield results as they
+        # complete. A worker that dies (a crash in a parser, the OOM killer)
+        # breaks the whole pool, so the pool is rebuilt and the files that were
+        # in flight are run again one at a time: only the file that kills a
+        # worker on its own is reported as failed.
+        checks = tuple(checks)
+        pending = iter(tasks)
+        suspects = deque()
+        in_flight = {}
+        executor = None
+
+        def submit(task, isolated):
+            try:
+                future = executor.submit(_analyze_file, task, checks)
+            except BrokenProcessPool as e:
+                # The pool broke after the last wait; handled like its futures
+                future = Future()
+                future.set_exception(e)
+            in_flight[future] = (task, isolated)
+
+        try:
+            while True:
+                if executor is None:
+                    executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker)
+                if suspects:
+                    if not in_flight:
+                        submit(suspects.popleft(), True)
+                else:
+                    for task in pending:
+                        submit(task, False)
+                        if len(in_flight) >= max_workers * 2:
+                            break
+                if not in_flight:
+                    return
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                if any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+                    # Every other file in flight fails with the pool
+                    done, _ = wait(in_flight)
+                    executor.shutdown(wait=True)
+                    executor = None
+                for future in done:
+                    task, isolated = in_flight.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        yield future.result()
+                    elif isinstance(error, BrokenProcessPool) and not isolated:
+                        suspects.append(task)
+                    else:
+                        yield BatchAnalyzer._failed(task, error)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
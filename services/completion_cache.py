@@ -0,0 +1,37 @@
+import hashlib
+from config import Config
+from services.result_cache import ResultCache
+
+class CompletionCache(ResultCache):
+    # LLM completions keyed by service, model and a hash of the rendered
+    # prompt; the prompt template version is part of the cache version.
+    # Each entry remembers how long the LLM took, to report the time saved.
+    def __init__(self, prompt_version):
+        super().__init__('llm_completions', f"{Config.LLM_CACHE_VERSION}:{prompt_version}",
+                         ttl=Config.LLM_CACHE_TTL, db_max_entries=Config.LLM_CACHE_DB_ENTRIES)
+        self.saved_seconds = 0.0
+
+    @staticmethod
+    def prompt_hash(service, model_name, prompt):
+        return hashlib.sha256("\0".join((service, model_name, prompt)).encode('utf-8')).hexdigest()
+
+    def enabled(self):
+        # Switched on and off on its own, independently of RESULT_CACHE_ENABLED
+        return Config.LLM_CACHE_ENABLED
+
+    def lookup(self, service, model_name, prompt):
+        entry = self.get(self.prompt_hash(service, model_name, prompt))
+        if entry is None:
+            return None
+        with self._lock:
+            self.saved_seconds += entry["seconds"]
+        return entry["completion"]
+
+    def store(self, service, model_name, prompt, completion, seconds):
+        self.set(self.prompt_hash(service, model_name, prompt), {"completion": completion, "seconds": seconds})
+
+    def stats(self):
+        stats = super().stats()
+        with self._lock:
+            stats["saved_llm_seconds"] = round(self.saved_seconds, 3)
+        return stats
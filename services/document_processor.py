@@ -1,14 +1,178 @@
+import contextvars
+import hashlib
+import io
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from flask import current_app, has_app_context
 from models.document_processor import DocumentProcessor as DocumentProcessorModel
+from services.completion_cache import CompletionCache
+from services.profiler import run_profiled
+from services.single_flight import SingleFlight
 from config import Config
 
+logger = logging.getLogger(__name__)
+
+completion_cache = CompletionCache(DocumentProcessorModel.PROMPT_VERSION)
+document_flight = SingleFlight('document')
+
+# Process-wide bound on concurrent LLM calls per backend, shared by every
+# processor and every chunk of a chunked extraction
+llm_limiters = {
+    'ollama': threading.BoundedSemaphore(Config.OLLAMA_MAX_CONCURRENCY),
+    'together': threading.BoundedSemaphore(Config.TOGETHER_MAX_CONCURRENCY),
+}
+chunk_executor = ThreadPoolExecutor(max_workers=Config.DOCUMENT_CHUNK_WORKERS, thread_name_prefix='llm-chunk')
+
+def _run_in_app(app, func, *args):
+    if app is None:
+        return func(*args)
+    with app.app_context():
+        return func(*args)
+
+def map_chunks(func, *iterables):
+    # Like chunk_executor.map, but each chunk runs in a copy of the caller's
+    # context, so its LLM stages reach the request's Server-Timing header and
+    # profile, and in its own app context, so the completion cache can use
+    # its database tier
+    app = current_app._get_current_object() if has_app_context() else None
+    futures = [chunk_executor.submit(contextvars.copy_context().run, run_profiled, _run_in_app, app, func, *args)
+               for args in zip(*iterables)]
+    try:
+        return [future.result() for future in futures]
+    finally:
+        for future in futures:
+            future.cancel()
+
+class DocumentProcessorPool:
+    # Process-wide pool of ready processors. Each keeps its LLM client (and its
+    # HTTP connections), tokenizer and prompt between requests; up to `size`
+    # are created on demand and further requests wait for a free one.
+    def __init__(self, size=None):
+        self.size = size or Config.DOCUMENT_PROCESSOR_POOL_SIZE
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.acquired = 0
+        self.setup_seconds = 0.0
+
+    def _create(self):
+        return DocumentProcessorModel(Config.OLLAMA_HOST, Config.OLLAMA_MODEL, Config.OLLAMA_SERVICE,
+                                      Config.PDF_PAGES_PER_TASK, completion_cache,
+                                      llm_limiters.get(Config.OLLAMA_SERVICE), 2 * Config.PDF_EXTRACT_PROCESSES)
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            create = self.created < self.size
+            if create:
+                self.created += 1
+        if not create:
+            return self._idle.get()
+        try:
+            return self._create()
+        except Exception:
+            with self._lock:
+                self.created -= 1
+            raise
+
+    def release(self, processor):
+        self._idle.put(processor)
+
+    @contextmanager
+    def processor(self):
+        start = time.perf_counter()
+        processor = self.acquire()
+        setup = time.perf_counter() - start
+        with self._lock:
+            self.acquired += 1
+            self.setup_seconds += setup
+        try:
+            yield processor, setup
+        finally:
+            self.release(processor)
+
+    def warm_up(self, count):
+        for _ in range(min(count, self.size) - self._idle.qsize()):
+            with self._lock:
+                if self.created >= self.size:
+                    return
+                self.created += 1
+            try:
+                self.release(self._create())
+            except Exception:
+                with self._lock:
+                    self.created -= 1
+                raise
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": self.size,
+                "created": self.created,
+                "idle": self._idle.qsize(),
+                "acquired": self.acquired,
+                "setup_seconds": round(self.setup_seconds, 6),
+            }
+
+processor_pool = DocumentProcessorPool()
+
+_extraction_executor = None
+_extraction_lock = threading.Lock()
+
+def extraction_executor():
+    # Process pool for parallel page extraction, created on first use
+    global _extraction_executor
+    if Config.PDF_EXTRACT_PROCESSES <= 0:
+        return None
+    with _extraction_lock:
+        if _extraction_executor is None:
+            _extraction_executor = ProcessPoolExecutor(max_workers=Config.PDF_EXTRACT_PROCESSES)
+        return _extraction_executor
+
 class DocumentProcessor:
+    @staticmethod
+    def warm_up():
+        try:
+            processor_pool.warm_up(Config.DOCUMENT_PROCESSOR_WARMUP)
+        except Exception as e:
+            logger.warning(f"Document processor warm-up failed: {e}")
+
+    @staticmethod
+    def cache_stats():
+        return completion_cache.stats()
+
     @staticmethod
     def process_document(document_file):
         try:
-            processor = DocumentProcessorModel(Config.OLLAMA_HOST, Config.OLLAMA_MODEL, Config.OLLAMA_SERVICE)
-            result = processor.process_pdf(document_file)
+            data = document_file.read()
+            # The same PDF submitted concurrently is extracted (and sent to the LLM) once
+            key = f"{Config.DOCUMENT_EXTRACTION_MODE}:{hashlib.sha256(data).hexdigest()}"
+            return document_flight.do(key, DocumentProcessor._process, data)
+        except Exception as e:
+            return None, str(e)
+
+    @staticmethod
+    def _process(data):
+        try:
+            with processor_pool.processor() as (processor, setup):
+                timings = {"setup": round(setup, 6)}
+                if Config.DOCUMENT_EXTRACTION_MODE == 'chunked':
+                    result = processor.process_pdf_chunked(
+                        io.BytesIO(data), Config.DOCUMENT_CHUNK_TOKENS, Config.DOCUMENT_MAX_TOKENS,
+                        map_chunks, extraction_executor(), timings
+                    )
+                else:
+                    result = processor.process_pdf(io.BytesIO(data), extraction_executor(), timings)
             if result is None:
                 return None, "Failed to process PDF document"
+            result["timings"] = timings
             return result, None
         except Exception as e:
-            return None, str(e)
\ No newline at end of file
+            return None, str(e)
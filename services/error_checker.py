@@ -1,11 +1,44 @@
-from error_checking.prock_checker import PROCKChecker
-from error_checking.oops_checker import OOPSChecker
+from services.result_cache import ResultCache
+from services.single_flight import SingleFlight
+from models.parsed_ontology import ParsedOntology
+from config import Config
+
+prock_cache = ResultCache('prock', f"{Config.PROCK_CACHE_VERSION}:{Config.PROCK_API_ENDPOINT}")
+oops_cache = ResultCache('oops', f"{Config.OOPS_CACHE_VERSION}:{Config.OOPS_API_ENDPOINT}:{Config.OOPS_PITFALLS}")
+prock_flight = SingleFlight('prock')
+oops_flight = SingleFlight('oops')
 
 class ErrorChecker:
+    @staticmethod
+    def warm_up():
+        if Config.CHECKER_WARMUP:
+            import error_checking.prock_checker  # noqa: F401
+            import error_checking.oops_checker  # noqa: F401
+
     @staticmethod
     def check_prock(ontology_file):
-        return PROCKChecker.check(ontology_file)
+        # The checker clients (requests) are loaded on first use
+        from error_checking.prock_checker import PROCKChecker
+        return ErrorChecker._cached_check(prock_cache, prock_flight, PROCKChecker.check, ontology_file)
 
     @staticmethod
     def check_oops(ontology_file):
-        return OOPSChecker.check(ontology_file)
\ No newline at end of file
+        from error_checking.oops_checker import OOPSChecker
+        return ErrorChecker._cached_check(oops_cache, oops_flight, OOPSChecker.check, ontology_file)
+
+    @staticmethod
+    def _cached_check(cache, flight, check, ontology_file):
+        ontology = ParsedOntology.from_file(ontology_file)
+        errors = cache.get(ontology.content_hash)
+        if errors is not None:
+            return errors
+
+        # Concurrent checks of the same ontology make one call to the checker
+        return flight.do(ontology.content_hash, ErrorChecker._check, cache, check, ontology)
+
+    @staticmethod
+    def _check(cache, check, ontology):
+        errors = check(ontology)
+        if errors is not None:
+            cache.set(ontology.content_hash, errors)
+        return errors
@@ -0,0 +1,102 @@
+import glob
+import logging
+import os
+import threading
+from config import Config
+from models.compact_graph import FILE_SUFFIXES, FORMAT_VERSION, CompactGraph
+
+logger = logging.getLogger(__name__)
+
+class GraphCache:
+    # Parsed graphs on disk in compact form, keyed by content hash and shared
+    # by every process using the same directory. Least recently loaded
+    # entries are removed once the directory exceeds its byte budget.
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or Config.GRAPH_CACHE_DIR
+        self.max_bytes = max_bytes if max_bytes is not None else Config.GRAPH_CACHE_MAX_BYTES
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _prefix(self, content_hash):
+        return os.path.join(self.directory, f"{content_hash}.v{FORMAT_VERSION}")
+
+    def contains(self, content_hash):
+        return Config.GRAPH_CACHE_ENABLED and os.path.exists(f"{self._prefix(content_hash)}.npy")
+
+    def get(self, content_hash):
+        if not Config.GRAPH_CACHE_ENABLED:
+            return None
+        prefix = self._prefix(content_hash)
+        try:
+            compact = CompactGraph.load(prefix)
+            os.utime(f"{prefix}.npy")
+        except FileNotFoundError:
+            compact = None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Graph cache entry {content_hash} is unreadable: {e}")
+            compact = None
+        with self._lock:
+            if compact is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return compact
+
+    def put(self, content_hash, graph):
+        if not Config.GRAPH_CACHE_ENABLED:
+            return None
+        try:
+            compact = CompactGraph.from_graph(graph)
+            os.makedirs(self.directory, exist_ok=True)
+            compact.save(self._prefix(content_hash))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Graph cache store failed for {content_hash}: {e}")
+            return None
+        with self._lock:
+            self.stores += 1
+        self.evict()
+        return compact
+
+    def evict(self):
+        entries = []
+        for npy in glob.glob(os.path.join(self.directory, '*.npy')):
+            prefix = npy[:-len('.npy')]
+            try:
+                stat = os.stat(npy)
+            except FileNotFoundError:
+                continue
+            size = 0
+            for suffix in FILE_SUFFIXES:
+                try:
+                    size += os.path.getsize(f"{prefix}{suffix}")
+                except FileNotFoundError:
+                    pass
+            entries.append((stat.st_mtime, size, prefix))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, prefix in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            # The .npy marker goes first, so the entry stops being found before it is incomplete
+            for suffix in FILE_SUFFIXES[::-1]:
+                try:
+                    os.remove(f"{prefix}{suffix}")
+                except FileNotFoundError:
+                    pass
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evictions": self.evictions,
+            }
+
+graph_cache = GraphCache()
@@ -0,0 +1,230 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+import numpy as np
+import rdflib
+from config import Config
+from models.ontology_metrics import OntologyMetrics
+from models.parsed_ontology import ParsedOntology
+from models.triple_index import IndexOverlay, TripleIndex, triple_digest
+from services.graph_cache import graph_cache
+from services.ontology_processor import metrics_cache
+
+logger = logging.getLogger(__name__)
+
+class OntologyState:
+    # A version of an ontology. An uploaded version is its compact graph from
+    # the graph cache, the sorted digests of its triples and their index. A
+    # version derived from it keeps only the triples added and removed
+    # relative to its parent and an overlay on the parent's index, so a change
+    # costs time and memory in proportion to its size. Membership walks the
+    # chain of changes down to the uploaded version; after
+    # INCREMENTAL_MAX_CHAIN changes the chain is folded into a single change
+    # against the uploaded version. A state is never modified, so the version
+    # a change was derived from stays available and a failed change leaves
+    # nothing half applied.
+    def __init__(self, index, parent=None, added=frozenset(), removed=frozenset(), compact=None, digests=None):
+        self.index = index
+        self.parent = parent
+        self.added = added
+        self.removed = removed
+        self.compact = compact
+        self.digests = digests
+        self.root = self if parent is None else parent.root
+        self.depth = 0 if parent is None else parent.depth + 1
+
+    @classmethod
+    def from_compact_graph(cls, compact):
+        digests = np.fromiter((triple_digest(triple) for triple in compact.iter_triples()),
+                              dtype=np.uint64, count=len(compact))
+        digests.sort()
+        return cls(IndexOverlay.over(TripleIndex.from_compact_graph(compact)), compact=compact, digests=digests)
+
+    def contains(self, triples):
+        found, pending = [False] * len(triples), []
+        for i, triple in enumerate(triples):
+            state = self
+            while state.parent is not None:
+                if triple in state.added:
+                    found[i] = True
+                    break
+                if triple in state.removed:
+                    break
+                state = state.parent
+            else:
+                pending.append(i)
+        digests = self.root.digests
+        if pending and len(digests):
+            keys = np.fromiter((triple_digest(triples[i]) for i in pending), dtype=np.uint64, count=len(pending))
+            positions = np.minimum(np.searchsorted(digests, keys), len(digests) - 1)
+            for i, hit in zip(pending, (digests[positions] == keys).tolist()):
+                found[i] = hit
+        return found
+
+    def __iter__(self):
+        if self.parent is None:
+            yield from self.compact.iter_triples()
+            return
+        removed = self.removed
+        for triple in self.parent:
+            if triple not in removed:
+                yield triple
+        yield from self.added
+
+    def derive(self, added, removed):
+        # Only triples that actually change the ontology are kept; returns the
+        # new state and the triples added and removed relative to this one
+        added, removed = list(set(added)), list(set(removed))
+        added = frozenset(triple for triple, found in zip(added, self.contains(added)) if not found)
+        removed = frozenset(triple for triple, found in zip(removed, self.contains(removed)) if found)
+        parent, layer_added, layer_removed = self, added, removed
+        if self.depth >= Config.INCREMENTAL_MAX_CHAIN:
+            parent, layer_added, layer_removed = self._fold(added, removed)
+        index = parent.index.derive(TripleIndex.from_triples(layer_added), TripleIndex.from_triples(layer_removed))
+        return OntologyState(index, parent, layer_added, layer_removed), added, removed
+
+    def _fold(self, added, removed):
+        # The chain plus this change as one change against the uploaded version
+        layers, state = [(added, removed)], self
+        while state.parent is not None:
+            layers.append((state.added, state.removed))
+            state = state.parent
+        net_added, net_removed = set(), set()
+        for layer_added, layer_removed in reversed(layers):
+            for triple in layer_removed:
+                if triple in net_added:
+                    net_added.remove(triple)
+                else:
+                    net_removed.add(triple)
+            for triple in layer_added:
+                if triple in net_removed:
+                    net_removed.remove(triple)
+                else:
+                    net_added.add(triple)
+        return state, frozenset(net_added), frozenset(net_removed)
+
+    def metrics(self):
+        return OntologyMetrics(index=self.index).calculate_ontology_metrics()
+
+# Recently derived versions by id, in this process only. Uploaded versions
+# can also be loaded from the graph cache, which every process on the host
+# shares.
+_states = OrderedDict()
+_lock = threading.Lock()
+
+def _get_state(ontology_hash):
+    with _lock:
+        state = _states.get(ontology_hash)
+        if state is not None:
+            _states.move_to_end(ontology_hash)
+            return state
+    compact = graph_cache.get(ontology_hash)
+    if compact is None:
+        return None
+    state = OntologyState.from_compact_graph(compact)
+    _store_state(ontology_hash, state)
+    return state
+
+def _store_state(ontology_hash, state):
+    with _lock:
+        _states[ontology_hash] = state
+        _states.move_to_end(ontology_hash)
+        while len(_states) > Config.INCREMENTAL_STATE_ENTRIES:
+            _states.popitem(last=False)
+
+def _delta_hash(base_hash, added, removed):
+    lines = sorted("+ " + " ".join(term.n3() for term in triple) for triple in added)
+    lines += sorted("- " + " ".join(term.n3() for term in triple) for triple in removed)
+    return hashlib.sha256("\n".join([base_hash] + lines).encode('utf-8')).hexdigest()
+
+def diff_metrics(old, new):
+    diff = {}
+    for name, value in new.items():
+        before = old.get(name)
+        if isinstance(value, dict):
+            nested = diff_metrics(before or {}, value)
+            if nested:
+                diff[name] = nested
+        elif value != before:
+            entry = {"old": before, "new": value}
+            if type(value) is int and type(before) is int:
+                entry["change"] = value - before
+            diff[name] = entry
+    return diff
+
+class IncrementalMetricsService:
+    @staticmethod
+    def has_version(ontology_hash):
+        with _lock:
+            if ontology_hash in _states:
+                return True
+        return graph_cache.contains(ontology_hash)
+
+    @staticmethod
+    def parse_triples(text, format="turtle"):
+        graph = rdflib.Graph()
+        if text:
+            graph.parse(data=text, format=format)
+        return list(graph)
+
+    @staticmethod
+    def apply_delta(ontology_hash, added, removed):
+        base = _get_state(ontology_hash)
+        if base is None:
+            return None, f"Unknown ontology version {ontology_hash}"
+        try:
+            old_metrics = base.metrics()
+            state, added, removed = base.derive(added, removed)
+            if not added and not removed:
+                state = base
+            new_hash = _delta_hash(ontology_hash, added, removed) if added or removed else ontology_hash
+            metrics = state.metrics()
+        except Exception as e:
+            logger.exception("An error occurred while applying an ontology delta")
+            return None, str(e)
+        _store_state(new_hash, state)
+        return {
+            "ontology_hash": new_hash,
+            "base_hash": ontology_hash,
+            "added": len(added),
+            "removed": len(removed),
+            "ontology_metrics": metrics,
+            "metrics_diff": diff_metrics(old_metrics, metrics),
+        }, None
+
+    @staticmethod
+    def apply_version(ontology_hash, ontology_file):
+        # Diff a new upload against a known version and apply the difference.
+        # Blank nodes get fresh labels on every parse, so triples that mention
+        # them always show up as removed and re-added.
+        try:
+            ontology = ParsedOntology.from_file(ontology_file)
+            new_triples = set(ontology.graph)
+        except Exception as e:
+            logger.exception("An error occurred while parsing the new ontology version")
+            return None, str(e)
+
+        base = _get_state(ontology_hash)
+        if base is None:
+            return None, f"Unknown ontology version {ontology_hash}"
+        try:
+            old_metrics = base.metrics()
+            candidates = list(new_triples)
+            added = [triple for triple, found in zip(candidates, base.contains(candidates)) if not found]
+            removed = [triple for triple in base if triple not in new_triples]
+            state, added, removed = base.derive(added, removed)
+            metrics = state.metrics()
+        except Exception as e:
+            logger.exception("An error occurred while diffing ontology versions")
+            return None, str(e)
+        _store_state(ontology.content_hash, state)
+        metrics_cache.set(ontology.content_hash, metrics)
+        return {
+            "ontology_hash": ontology.content_hash,
+            "base_hash": ontology_hash,
+            "added": len(added),
+            "removed": len(removed),
+            "ontology_metrics": metrics,
+            "metrics_diff": diff_metrics(old_metrics, metrics),
+        }, None
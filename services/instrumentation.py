@@ -0,0 +1,229 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from config import Config
+
+PREFIX = 'ontology_analysis'
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+SIZE_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000, 10000000)
+
+# Every metric created in this process, in the order they are rendered
+registry = []
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Metric:
+    # A family of samples in the Prometheus text format, one per label values
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = f"{PREFIX}_{name}"
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.extend(self._samples(key, value))
+        return lines
+
+    def _samples(self, key, value):
+        return [f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"]
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _samples(self, key, state):
+        counts, total, count = state
+        lines = [f"{self.name}_bucket{_labels(self.labelnames, key, [('le', _number(bound))])} {bucket_count}"
+                 for bound, bucket_count in zip(self.buckets, counts)]
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+stage_seconds = Histogram('stage_seconds', 'Wall-clock seconds spent in each processing stage', ['stage'])
+stages_in_progress = Gauge('stages_in_progress', 'Processing stages currently running', ['stage'])
+stage_errors = Counter('stage_errors_total', 'Processing stages that raised an exception', ['stage'])
+input_size = Histogram('input_size', 'Size of each processed input, by unit (triples, pages, tokens, bytes)',
+                       ['unit'], SIZE_BUCKETS)
+external_call_errors = Counter('external_call_errors_total',
+                               'Failed calls to external services, including retried attempts',
+                               ['service', 'reason'])
+
+# Stage durations of the current request, for the Server-Timing header
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+
+def record_stage(name, seconds):
+    stage_seconds.observe(seconds, stage=name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    stages_in_progress.inc(stage=name)
+    try:
+        yield
+    except BaseException:
+        stage_errors.inc(stage=name)
+        raise
+    finally:
+        stages_in_progress.dec(stage=name)
+        record_stage(name, time.perf_counter() - start)
+
+def observe_size(unit, value):
+    input_size.observe(value, unit=unit)
+
+def stage_failed(name):
+    # For stages that report their failure instead of raising it
+    stage_errors.inc(stage=name)
+
+def external_call_failed(service, reason):
+    external_call_errors.inc(service=service, reason=reason)
+
+def _stats_lines():
+    # Counters kept by the caches, pools and single-flight groups, read at
+    # scrape time. Imported here so that this module stays importable from
+    # the models and checkers.
+    from services.result_cache import ResultCache
+    from services.graph_cache import graph_cache
+    from services.document_processor import completion_cache, processor_pool
+    from services.single_flight import SingleFlight
+
+    samples = {}
+
+    def add(name, kind, help, value, **labels):
+        family = samples.setdefault(f"{PREFIX}_{name}", (kind, help, []))
+        family[2].append(f"{PREFIX}_{name}{_labels(labels.keys(), labels.values())} {_number(value)}")
+
+    for cache in ResultCache.instances:
+        stats = cache.stats()
+        for tier in ('memory', 'db'):
+            add('result_cache_hits_total', 'counter', 'Result cache hits by tier', stats[f"{tier}_hits"],
+                cache=cache.namespace, tier=tier)
+        add('result_cache_misses_total', 'counter', 'Result cache misses', stats["misses"], cache=cache.namespace)
+        add('result_cache_evictions_total', 'counter', 'Result cache evictions', stats["evictions"],
+            cache=cache.namespace)
+        add('result_cache_memory_bytes', 'gauge', 'Bytes held by the in-memory result cache',
+            stats["memory_bytes"], cache=cache.namespace)
+    add('llm_cache_saved_seconds_total', 'counter', 'LLM seconds saved by completion cache hits',
+        completion_cache.stats()["saved_llm_seconds"])
+
+    for name, value in graph_cache.stats().items():
+        add(f"graph_cache_{name}_total", 'counter', f"Graph cache {name}", value)
+
+    pool = processor_pool.stats()
+    add('document_processors', 'gauge', 'Document processors in the pool by state', pool["idle"], state='idle')
+    add('document_processors', 'gauge', 'Document processors in the pool by state',
+        pool["created"] - pool["idle"], state='busy')
+    add('document_processor_acquisitions_total', 'counter', 'Document processors handed out', pool["acquired"])
+    add('document_processor_wait_seconds_total', 'counter', 'Seconds spent obtaining a document processor',
+        pool["setup_seconds"])
+
+    for flight in SingleFlight.instances:
+        stats = flight.stats()
+        add('single_flight_in_progress', 'gauge', 'Coalesced computations currently running',
+            stats["in_flight"], operation=flight.name)
+        add('single_flight_waiters', 'gauge', 'Requests waiting on an identical computation',
+            stats["waiting"], operation=flight.name)
+        add('single_flight_coalesced_total', 'counter', 'Requests that shared an identical computation',
+            stats["coalesced"], operation=flight.name)
+
+    lines = []
+    for name, (kind, help, family) in samples.items():
+        lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"] + family
+    return lines
+
+def render():
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    lines.extend(_stats_lines())
+    return "\n".join(lines) + "\n"
+
+def server_timing(timings):
+    # Repeated stages (e.g. one LLM call per chunk) are summed
+    totals = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items())
+
+def init_app(app):
+    from flask import Response
+
+    if Config.SERVER_TIMING_ENABLED:
+        @app.before_request
+        def start_request_timings():
+            _request_timings.set([])
+
+        @app.after_request
+        def add_server_timing(response):
+            timings = _request_timings.get()
+            if timings:
+                response.headers['Server-Timing'] = server_timing(timings)
+            return response
+
+        @app.teardown_request
+        def clear_request_timings(exception=None):
+            _request_timings.set(None)
+
+    if Config.METRICS_ENABLED:
+        @app.route('/metrics')
+        def metrics():
+            return Response(render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,186 @@
+import io
+import json
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
+from config import Config
+from extensions import db
+from models.job import Job
+from models.parsed_ontology import ParsedOntology
+from services.analysis_processor import AnalysisProcessor
+from services.document_processor import DocumentProcessor
+from services.error_checker import ErrorChecker
+from services.ontology_processor import OntologyProcessor
+
+logger = logging.getLogger(__name__)
+
+def _ontology(job):
+    return ParsedOntology.from_file(io.BytesIO(job.ontology_data), job.ontology_filename)
+
+def _document(job):
+    return io.BytesIO(job.document_data)
+
+# Handlers take the job and a callback that records its progress (0 to 1)
+def _run_ontology_metrics(job, progress):
+    metrics, error = OntologyProcessor.process_ontology(_ontology(job))
+    if error:
+        return None, f"Error processing ontology: {error}"
+    return {"ontology_metrics": metrics}, None
+
+def _run_extract_document(job, progress):
+    result, error = DocumentProcessor.process_document(_document(job))
+    if error:
+        return None, f"Error processing document: {error}"
+    return result, None
+
+def _run_check_prock(job, progress):
+    prock_errors = ErrorChecker.check_prock(_ontology(job))
+    if prock_errors is None:
+        return None, "Error processing ontology with PROCK"
+    return prock_errors, None
+
+def _run_check_oops(job, progress):
+    oops_errors = ErrorChecker.check_oops(_ontology(job))
+    if oops_errors is None:
+        return None, "Error processing ontology with OOPS!"
+    return oops_errors, None
+
+def _run_analyze_ontology(job, progress):
+    return AnalysisProcessor.analyze(_ontology(job), _document(job), progress)
+
+class JobQueue:
+    # operation -> (handler, needs ontology, needs document)
+    OPERATIONS = {
+        'ontology_metrics': (_run_ontology_metrics, True, False),
+        'extract_document': (_run_extract_document, False, True),
+        'check_prock': (_run_check_prock, True, False),
+        'check_oops': (_run_check_oops, True, False),
+        'analyze_ontology': (_run_analyze_ontology, True, True),
+    }
+
+    @staticmethod
+    def submit(operation, ontology_file=None, document_file=None):
+        job = Job(operation=operation, status=Job.QUEUED, progress=0.0, attempts=0)
+        if ontology_file is not None:
+            job.ontology_filename = ontology_file.filename
+            job.ontology_data = ontology_file.read()
+        if document_file is not None:
+            job.document_filename = document_file.filename
+            job.document_data = document_file.read()
+        db.session.add(job)
+        db.session.commit()
+        return job
+
+    @staticmethod
+    def get(job_id):
+        job = db.session.get(Job, job_id)
+        if job is None or (job.expires_at is not None and job.expires_at < datetime.utcnow()):
+            return None
+        return job
+
+    @staticmethod
+    def get_result(job):
+        return json.loads(job.result) if job.result is not None else None
+
+    @staticmethod
+    def delete(job_id):
+        deleted = Job.query.filter_by(id=job_id).delete(synchronize_session=False)
+        db.session.commit()
+        return deleted > 0
+
+    @staticmethod
+    def claim(worker_id):
+        now = datetime.utcnow()
+        lease_expired = now - timedelta(seconds=Config.JOB_LEASE_SECONDS)
+        claimable = and_(
+            or_(Job.status == Job.QUEUED, and_(Job.status == Job.RUNNING, Job.started_at < lease_expired)),
+            Job.attempts < Config.JOB_MAX_ATTEMPTS
+        )
+        candidate = (Job.query.with_entities(Job.id, Job.status, Job.attempts)
+                     .filter(claimable)
+                     .order_by(Job.created_at)
+                     .with_for_update(skip_locked=True)
+                     .first())
+        if candidate is None:
+            db.session.commit()
+            return None
+
+        # Compare-and-set on top of the row lock, so databases without
+        # SELECT ... FOR UPDATE (SQLite) still never hand a job out twice
+        claimed = (Job.query
+                   .filter_by(id=candidate.id, status=candidate.status, attempts=candidate.attempts)
+                   .update({
+                       Job.status: Job.RUNNING,
+                       Job.worker_id: worker_id,
+                       Job.started_at: now,
+                       Job.attempts: candidate.attempts + 1,
+                       Job.progress: 0.0
+                   }, synchronize_session=False))
+        db.session.commit()
+        if not claimed:
+            return None
+        return db.session.get(Job, candidate.id)
+
+    @staticmethod
+    def _update_claimed(claim, values):
+        # Writes to a running job only while this worker still holds its claim:
+        # a job deleted meanwhile, re-claimed by another worker after its lease
+        # expired, or failed by expire() matches no row
+        updated = Job.query.filter_by(**claim).update(values, synchronize_session=False)
+        db.session.commit()
+        return updated > 0
+
+    @staticmethod
+    def run(job):
+        # Returns the finished job, or None if this worker lost it while running
+        job_id, operation = job.id, job.operation
+        claim = {"id": job.id, "worker_id": job.worker_id, "attempts": job.attempts, "status": Job.RUNNING}
+        handler, _, _ = JobQueue.OPERATIONS[operation]
+
+        def report_progress(progress):
+            JobQueue._update_claimed(claim, {Job.progress: progress})
+
+        try:
+            result, error = handler(job, report_progress)
+        except Exception as e:
+            logger.exception(f"Job {job_id} ({operation}) failed")
+            result, error = None, str(e)
+
+        now = datetime.utcnow()
+        finished = JobQueue._update_claimed(claim, {
+            Job.status: Job.FAILED if error else Job.SUCCEEDED,
+            Job.result: json.dumps(result) if result is not None else None,
+            Job.error: error,
+            Job.progress: 1.0,
+            Job.finished_at: now,
+            Job.expires_at: now + timedelta(seconds=Config.JOB_RESULT_TTL),
+            # The uploads are only needed until the job has run
+            Job.ontology_data: None,
+            Job.document_data: None
+        })
+        if not finished:
+            logger.warning(f"Job {job_id} was deleted or claimed by another worker while running; "
+                           f"discarding its result")
+            return None
+        return db.session.get(Job, job_id, populate_existing=True)
+
+    @staticmethod
+    def expire():
+        now = datetime.utcnow()
+        expired = Job.query.filter(Job.expires_at < now).delete(synchronize_session=False)
+
+        lease_expired = now - timedelta(seconds=Config.JOB_LEASE_SECONDS)
+        abandoned = (Job.query
+                     .filter(Job.status == Job.RUNNING,
+                             Job.started_at < lease_expired,
+                             Job.attempts >= Config.JOB_MAX_ATTEMPTS)
+                     .update({
+                         Job.status: Job.FAILED,
+                         Job.error: "Job exceeded its lease on every attempt",
+                         Job.finished_at: now,
+                         Job.expires_at: now + timedelta(seconds=Config.JOB_RESULT_TTL),
+                         Job.ontology_data: None,
+                         Job.document_data: None
+                     }, synchronize_session=False))
+        db.session.commit()
+        return expired, abandoned
@@ -1,18 +1,66 @@
-import rdflib
 from models.ontology_metrics import OntologyMetrics
+from models.parsed_ontology import ParsedOntology
+from concurrent.futures import ProcessPoolExecutor
+from models.streaming_index import parallel_triple_index, stream_triple_index
+from models.triple_index import TripleIndex
+from services.instrumentation import observe_size, stage
+from config import Config
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+_parse_executor = None
+_parse_lock = threading.Lock()
+
+def parse_executor():
+    # Process pool for parallel N-Triples parsing, created on first use
+    global _parse_executor
+    if Config.PARALLEL_PARSE_PROCESSES <= 0:
+        return None
+    with _parse_lock:
+        if _parse_executor is None:
+            _parse_executor = ProcessPoolExecutor(max_workers=Config.PARALLEL_PARSE_PROCESSES)
+        return _parse_executor
+
 class OntologyMetricsService:
     @staticmethod
-    def calculate_metrics(ontology_file):
+    def calculate_metrics(ontology_file, streaming=None):
         try:
-            graph = rdflib.Graph()
-            graph.parse(ontology_file, format="turtle")
-            
-            metrics = OntologyMetrics(graph)
-            return metrics.calculate_ontology_metrics(), None
+            ontology = ParsedOntology.from_file(ontology_file)
+
+            # Previously parsed ontologies are indexed straight from the graph
+            # cache. Large ontologies are indexed while parsing instead of being
+            # held in memory as a graph, unless the caller needs the graph anyway.
+            if streaming is None:
+                streaming = len(ontology.data) > Config.STREAMING_METRICS_THRESHOLD
+            observe_size('bytes', len(ontology.data))
+            compact = ontology.compact
+            if compact is None and not streaming and Config.METRICS_BACKEND == 'numpy':
+                with stage('ontology_parse'):
+                    ontology.graph  # parsing also stores the compact form
+                compact = ontology.compact
+            if compact is not None:
+                with stage('ontology_index'):
+                    if Config.METRICS_BACKEND == 'numpy':
+                        index = TripleIndex.from_compact_graph(compact)
+                    else:
+                        index = TripleIndex.from_triples(compact.iter_triples())
+            elif streaming and ontology.format == 'nt' and parse_executor() is not None:
+                with stage('ontology_parse_parallel'):
+                    index = parallel_triple_index(ontology.data, parse_executor(), Config.PARALLEL_PARSE_CHUNK_BYTES,
+                                                  2 * Config.PARALLEL_PARSE_PROCESSES)
+            elif streaming:
+                with stage('ontology_parse_streaming'):
+                    index = stream_triple_index(source=ontology.open(), format=ontology.format)
+            else:
+                with stage('ontology_parse'):
+                    graph = ontology.graph
+                with stage('ontology_index'):
+                    index = TripleIndex.from_triples(graph)
+            observe_size('triples', index.triple_count)
+            with stage('ontology_metrics'):
+                return OntologyMetrics(index=index).calculate_ontology_metrics(), None
         except Exception as e:
             logger.exception("An error occurred while processing the ontology")
             return None, str(e)
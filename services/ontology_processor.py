@@ -1,6 +1,26 @@
 from services.ontology_metrics import OntologyMetricsService
+from services.result_cache import ResultCache
+from services.single_flight import SingleFlight
+from models.parsed_ontology import ParsedOntology
+from config import Config
+
+metrics_cache = ResultCache('ontology_metrics', Config.METRICS_CACHE_VERSION)
+metrics_flight = SingleFlight('ontology_metrics')
 
 class OntologyProcessor:
     @staticmethod
-    def process_ontology(ontology_file):
-        return OntologyMetricsService.calculate_metrics(ontology_file)
\ No newline at end of file
+    def process_ontology(ontology_file, streaming=None):
+        ontology = ParsedOntology.from_file(ontology_file)
+        metrics = metrics_cache.get(ontology.content_hash)
+        if metrics is not None:
+            return metrics, None
+
+        # Identical uploads that arrive together share one computation
+        return metrics_flight.do(ontology.content_hash, OntologyProcessor._calculate, ontology, streaming)
+
+    @staticmethod
+    def _calculate(ontology, streaming):
+        metrics, error = OntologyMetricsService.calculate_metrics(ontology, streaming)
+        if error is None:
+            metrics_cache.set(ontology.content_hash, metrics)
+        return metrics, error
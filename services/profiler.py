@@ -0,0 +1,326 @@
+import contextvars
+import cProfile
+import glob
+import hmac
+import json
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ID = re.compile(r'[0-9a-f]{32}')
+
+def _function_name(filename, lineno, name):
+    return f"{filename}:{lineno}({name})"
+
+def _frame_key(frame):
+    code = frame.f_code
+    return code.co_filename, code.co_firstlineno, code.co_name
+
+def _stack(frame):
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+
+class ProfileSession:
+    # Profile of one request, covering the request thread and the analysis
+    # stage and chunk threads it starts. 'cprofile' records every call of the
+    # request thread and samples the other threads; 'sample' looks at the
+    # threads' stacks every PROFILE_SAMPLE_INTERVAL seconds, which is cheap
+    # enough to run on every request and still explain the slow ones.
+    def __init__(self, mode, method, path):
+        self.id = uuid.uuid4().hex
+        self.mode = mode
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.content_hashes = []
+        self.profiles = []
+        self.threads = set()
+        self.self_samples = Counter()
+        self.total_samples = Counter()
+        self._lock = threading.Lock()
+
+    def begin_thread(self, request_thread=False):
+        if request_thread and self.mode == 'cprofile':
+            profile = _start_cprofile()
+            if profile is not None:
+                return profile
+        with self._lock:
+            self.threads.add(threading.get_ident())
+        _sampler.watch(self)
+        return None
+
+    def end_thread(self, profile):
+        if profile is not None:
+            _stop_cprofile(profile)
+            with self._lock:
+                self.profiles.append(profile)
+        else:
+            with self._lock:
+                self.threads.discard(threading.get_ident())
+
+    def sample(self, frames):
+        with self._lock:
+            for thread_id in self.threads:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                self.self_samples[_frame_key(frame)] += 1
+                # Recursive functions count once per sample
+                for key in {_frame_key(caller) for caller in _stack(frame)}:
+                    self.total_samples[key] += 1
+
+    def has_samples(self):
+        with self._lock:
+            return bool(self.self_samples)
+
+    def top_functions(self, limit):
+        stats = self.stats()
+        if stats is None:
+            return self.top_sampled_functions(limit)
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+        return [{
+            "function": _function_name(*key),
+            "calls": calls,
+            "self_seconds": round(self_seconds, 6),
+            "cumulative_seconds": round(cumulative_seconds, 6),
+        } for key, (_, calls, self_seconds, cumulative_seconds, _) in rows]
+
+    def top_sampled_functions(self, limit):
+        interval = Config.PROFILE_SAMPLE_INTERVAL
+        with self._lock:
+            return [{
+                "function": _function_name(*key),
+                "samples": count,
+                "self_seconds": round(count * interval, 3),
+                "cumulative_seconds": round(self.total_samples[key] * interval, 3),
+            } for key, count in self.self_samples.most_common(limit)]
+
+    def stats(self):
+        with self._lock:
+            if not self.profiles:
+                return None
+            stats = pstats.Stats(self.profiles[0])
+            for profile in self.profiles[1:]:
+                stats.add(profile)
+            return stats
+
+# cProfile can be active in only one thread of the process at a time (Python
+# 3.12+ raises ValueError for a second one, or while a debugger or coverage
+# tool is active), so the first profiled request thread gets it and every
+# other profiled thread is sampled instead
+_cprofile_lock = threading.Lock()
+_cprofile_active = False
+
+def _start_cprofile():
+    global _cprofile_active
+    with _cprofile_lock:
+        if _cprofile_active:
+            return None
+        _cprofile_active = True
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError as e:
+        logger.warning(f"cProfile is unavailable, sampling instead: {e}")
+        with _cprofile_lock:
+            _cprofile_active = False
+        return None
+    return profile
+
+def _stop_cprofile(profile):
+    global _cprofile_active
+    profile.disable()
+    with _cprofile_lock:
+        _cprofile_active = False
+
+class Sampler:
+    # One background thread samples the stacks of every watched session
+    def __init__(self):
+        self._sessions = set()
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def watch(self, session):
+        with self._condition:
+            self._sessions.add(session)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def unwatch(self, session):
+        with self._condition:
+            self._sessions.discard(session)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._sessions:
+                    self._condition.wait()
+                sessions = list(self._sessions)
+            frames = sys._current_frames()
+            for session in sessions:
+                session.sample(frames)
+            del frames
+            time.sleep(Config.PROFILE_SAMPLE_INTERVAL)
+
+_sampler = Sampler()
+
+# The session of the current request, if it is being profiled
+_session = contextvars.ContextVar('profile_session', default=None)
+
+def note_content_hash(content_hash):
+    session = _session.get()
+    if session is not None and content_hash not in session.content_hashes:
+        session.content_hashes.append(content_hash)
+
+def run_profiled(func, *args):
+    # Runs func in the current thread as part of the request's profile
+    session = _session.get()
+    if session is None:
+        return func(*args)
+    profile = session.begin_thread()
+    try:
+        return func(*args)
+    finally:
+        session.end_thread(profile)
+
+def is_admin(token):
+    return bool(Config.ADMIN_TOKEN) and token is not None and hmac.compare_digest(token, Config.ADMIN_TOKEN)
+
+def _meta_path(profile_id):
+    return os.path.join(Config.PROFILE_DIR, f"{profile_id}.meta.json")
+
+def _save_samples(session, data_file):
+    with session._lock:
+        samples = {
+            "interval": Config.PROFILE_SAMPLE_INTERVAL,
+            "self_samples": {_function_name(*key): n for key, n in session.self_samples.items()},
+            "total_samples": {_function_name(*key): n for key, n in session.total_samples.items()},
+        }
+    with open(os.path.join(Config.PROFILE_DIR, data_file), 'w', encoding='utf-8') as f:
+        json.dump(samples, f)
+
+def save(session, seconds, status):
+    # A requested profile is stored as pstats data of its request thread
+    # (loadable with pstats, snakeviz and similar tools), and the hottest
+    # functions of its sampled threads are listed with it. A slow request, or
+    # one that could not get cProfile, only has sample counts.
+    os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+    stats = session.stats()
+    if stats is None:
+        data_file = f"{session.id}.samples.json"
+        _save_samples(session, data_file)
+    else:
+        data_file = f"{session.id}.prof"
+        stats.dump_stats(os.path.join(Config.PROFILE_DIR, data_file))
+    meta = {
+        "profile_id": session.id,
+        "mode": session.mode,
+        "method": session.method,
+        "path": session.path,
+        "status": status,
+        "seconds": round(seconds, 6),
+        "content_hashes": session.content_hashes,
+        "created_at": datetime.utcnow().isoformat(),
+        "file": data_file,
+        "top_functions": session.top_functions(Config.PROFILE_TOP_FUNCTIONS),
+    }
+    if stats is not None and session.has_samples():
+        meta["top_sampled_functions"] = session.top_sampled_functions(Config.PROFILE_TOP_FUNCTIONS)
+    with open(_meta_path(session.id), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    _prune()
+    return meta
+
+def _prune():
+    metas = sorted(glob.glob(os.path.join(Config.PROFILE_DIR, '*.meta.json')), key=os.path.getmtime)
+    for path in metas[:max(0, len(metas) - Config.PROFILE_MAX_FILES)]:
+        profile_id = os.path.basename(path)[:-len('.meta.json')]
+        for stale in glob.glob(os.path.join(Config.PROFILE_DIR, f"{profile_id}.*")):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+def list_profiles(content_hash=None):
+    profiles = []
+    for path in glob.glob(os.path.join(Config.PROFILE_DIR, '*.meta.json')):
+        try:
+            with open(path, encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if content_hash is None or content_hash in meta["content_hashes"]:
+            profiles.append(meta)
+    return sorted(profiles, key=lambda meta: meta["created_at"], reverse=True)
+
+def load_profile(profile_id):
+    # Metadata and the absolute path of the stored profile, or None
+    if not PROFILE_ID.fullmatch(profile_id):
+        return None
+    try:
+        with open(_meta_path(profile_id), encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta, os.path.abspath(os.path.join(Config.PROFILE_DIR, meta["file"]))
+
+def init_app(app):
+    from flask import g, jsonify, request
+
+    @app.before_request
+    def start_profile():
+        flag = request.headers.get('X-Profile') or request.args.get('profile')
+        if flag and flag.lower() in ('1', 'true', 'yes'):
+            if not is_admin(request.headers.get('X-Admin-Token')):
+                return jsonify({"message": "Profiling requires a valid X-Admin-Token"}), 403
+            session = ProfileSession('cprofile', request.method, request.path)
+        elif Config.PROFILE_SLOW_REQUEST_SECONDS > 0:
+            session = ProfileSession('sample', request.method, request.path)
+        else:
+            return None
+        g.profile_session = session
+        _session.set(session)
+        g.profile_thread = session.begin_thread(request_thread=True)
+        return None
+
+    @app.after_request
+    def add_profile_id(response):
+        session = g.get('profile_session')
+        if session is not None and session.mode == 'cprofile':
+            response.headers['X-Profile-Id'] = session.id
+        g.profile_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def finish_profile(exception=None):
+        session = g.pop('profile_session', None)
+        if session is None:
+            return
+        session.end_thread(g.pop('profile_thread', None))
+        _sampler.unwatch(session)
+        _session.set(None)
+        seconds = time.perf_counter() - session.started
+        status = g.get('profile_status', 500)
+        try:
+            if session.mode == 'cprofile':
+                save(session, seconds, status)
+            elif seconds >= Config.PROFILE_SLOW_REQUEST_SECONDS:
+                meta = save(session, seconds, status)
+                hot = "; ".join(f"{row['function']} {row['self_seconds']}s" for row in meta["top_functions"][:5])
+                logger.warning(f"Slow request {session.method} {session.path} took {seconds:.2f}s "
+                               f"(profile {session.id}); hottest functions: {hot}")
+        except OSError as e:
+            logger.warning(f"Could not store profile {session.id}: {e}")
@@ -0,0 +1,176 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import has_app_context
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+from config import Config
+from extensions import db
+from models.cache_entry import CacheEntry
+
+logger = logging.getLogger(__name__)
+
+class ResultCache:
+    # Two-tier cache: an in-process LRU in front of the shared database table.
+    # Values are stored as JSON so every hit hands out a fresh copy.
+    instances = []
+
+    def __init__(self, namespace, version, ttl=None, max_entries=None, max_bytes=None, db_max_entries=None,
+                 db_max_bytes=None):
+        self.namespace = namespace
+        self.version = version
+        self.ttl = ttl if ttl is not None else Config.RESULT_CACHE_TTL
+        self.max_entries = max_entries if max_entries is not None else Config.RESULT_CACHE_MEMORY_ENTRIES
+        self.max_bytes = max_bytes if max_bytes is not None else Config.RESULT_CACHE_MEMORY_BYTES
+        self.db_max_entries = db_max_entries if db_max_entries is not None else Config.RESULT_CACHE_DB_ENTRIES
+        self.db_max_bytes = db_max_bytes if db_max_bytes is not None else Config.RESULT_CACHE_DB_BYTES
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        ResultCache.instances.append(self)
+
+    def make_key(self, content_hash):
+        return f"{self.namespace}:{self.version}:{content_hash}"
+
+    def enabled(self):
+        return Config.RESULT_CACHE_ENABLED
+
+    def get(self, content_hash):
+        if not self.enabled():
+            return None
+        key = self.make_key(content_hash)
+        payload = self._get_memory(key)
+        if payload is None:
+            payload = self._get_db(key)
+            if payload is not None:
+                self._set_memory(key, payload)
+        if payload is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        return json.loads(payload)
+
+    def set(self, content_hash, value):
+        if not self.enabled():
+            return
+        key = self.make_key(content_hash)
+        payload = json.dumps(value)
+        self._set_memory(key, payload)
+        self._set_db(key, payload)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.db_hits
+            return {
+                "namespace": self.namespace,
+                "memory_hits": self.memory_hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "hit_ratio": round(hits / (hits + self.misses), 4) if hits + self.misses else None,
+                "evictions": self.evictions,
+                "memory_entries": len(self._entries),
+                "memory_bytes": self._bytes,
+            }
+
+    def _get_memory(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if expires_at < time.time():
+                self._remove_memory(key)
+                return None
+            self._entries.move_to_end(key)
+            self.memory_hits += 1
+            return payload
+
+    def _set_memory(self, key, payload):
+        with self._lock:
+            if key in self._entries:
+                self._remove_memory(key)
+            if len(payload) > self.max_bytes:
+                return
+            self._entries[key] = (time.time() + self.ttl, payload)
+            self._bytes += len(payload)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove_memory(oldest)
+                self.evictions += 1
+
+    def _remove_memory(self, key):
+        _, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def _get_db(self, key):
+        if not has_app_context():
+            return None
+        try:
+            entry = db.session.get(CacheEntry, key)
+            if entry is None:
+                return None
+            now = datetime.utcnow()
+            if entry.expires_at < now:
+                db.session.delete(entry)
+                db.session.commit()
+                return None
+            entry.accessed_at = now
+            payload = entry.value
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.warning(f"Result cache lookup failed for {self.namespace}: {e}")
+            return None
+        with self._lock:
+            self.db_hits += 1
+        return payload
+
+    def _set_db(self, key, payload):
+        if not has_app_context():
+            return
+        try:
+            now = datetime.utcnow()
+            db.session.merge(CacheEntry(
+                key=key,
+                namespace=self.namespace,
+                value=payload,
+                size=len(payload),
+                created_at=now,
+                accessed_at=now,
+                expires_at=now + timedelta(seconds=self.ttl)
+            ))
+            self._evict_db(now)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.warning(f"Result cache store failed for {self.namespace}: {e}")
+
+    def _evict_db(self, now):
+        query = CacheEntry.query.filter_by(namespace=self.namespace)
+        query.filter(CacheEntry.expires_at < now).delete(synchronize_session=False)
+        # Both bounds apply per namespace; the least recently used entries go first
+        count, size = query.with_entities(func.count(CacheEntry.key), func.coalesce(func.sum(CacheEntry.size), 0)).one()
+        excess_entries, excess_bytes = count - self.db_max_entries, size - self.db_max_bytes
+        if excess_entries <= 0 and excess_bytes <= 0:
+            return
+        stale = []
+        for key, entry_size in query.with_entities(CacheEntry.key, CacheEntry.size).order_by(CacheEntry.accessed_at):
+            if len(stale) >= excess_entries and excess_bytes <= 0:
+                break
+            stale.append(key)
+            excess_bytes -= entry_size
+        query.filter(CacheEntry.key.in_(stale)).delete(synchronize_session=False)
+        with self._lock:
+            self.evictions += len(stale)
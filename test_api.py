@@ -2,62 +2,55 @@ import requests
 import json
 import argparse
 
-def test_ontology_metrics(api_url, ontology_path):
-    print("\nTesting /ontology/ontology_metrics endpoint:")
-    files = {
-        'ontology': ('test_ontology.ttl', open(ontology_path, 'rb'), 'text/turtle')
-    }
+# endpoint name -> (path, upload fields)
+ENDPOINTS = {
+    'metrics': ('/ontology/ontology_metrics', ['ontology']),
+    'document': ('/document/extract_document', ['document']),
+    'analyze': ('/analysis/analyze_ontology', ['ontology', 'document']),
+    'check_prock': ('/error_checking/check_prock', ['ontology']),
+    'check_oops': ('/error_checking/check_oops', ['ontology']),
+}
+
+UPLOADS = {
+    'ontology': ('test_ontology.ttl', 'text/turtle'),
+    'document': ('test_document.pdf', 'application/pdf'),
+}
+
+def build_files(endpoint, contents):
+    # contents maps an upload field to an open file or its bytes
+    _, fields = ENDPOINTS[endpoint]
+    return {field: (UPLOADS[field][0], contents[field], UPLOADS[field][1]) for field in fields}
+
+def post_endpoint(api_url, endpoint, contents, session=requests):
+    path, _ = ENDPOINTS[endpoint]
+    return session.post(f"{api_url}{path}", files=build_files(endpoint, contents))
+
+def test_endpoint(api_url, endpoint, ontology_path, pdf_path):
+    path, fields = ENDPOINTS[endpoint]
+    print(f"\nTesting {path} endpoint:")
+    paths = {'ontology': ontology_path, 'document': pdf_path}
+    contents = {field: open(paths[field], 'rb') for field in fields}
     try:
-        response = requests.post(f"{api_url}/ontology/ontology_metrics", files=files)
+        response = post_endpoint(api_url, endpoint, contents)
         print_response(response)
     finally:
-        files['ontology'][1].close()
+        for file in contents.values():
+            file.close()
+
+def test_ontology_metrics(api_url, ontology_path):
+    test_endpoint(api_url, 'metrics', ontology_path, None)
 
 def test_extract_document(api_url, pdf_path):
-    print("\nTesting /document/extract_document endpoint:")
-    files = {
-        'document': ('test_document.pdf', open(pdf_path, 'rb'), 'application/pdf')
-    }
-    try:
-        response = requests.post(f"{api_url}/document/extract_document", files=files)
-        print_response(response)
-    finally:
-        files['document'][1].close()
+    test_endpoint(api_url, 'document', None, pdf_path)
 
 def test_analyze_ontology(api_url, ontology_path, pdf_path):
-    print("\nTesting /analysis/analyze_ontology endpoint:")
-    files = {
-        'ontology': ('test_ontology.ttl', open(ontology_path, 'rb'), 'text/turtle'),
-        'document': ('test_document.pdf', open(pdf_path, 'rb'), 'application/pdf')
-    }
-    try:
-        response = requests.post(f"{api_url}/analysis/analyze_ontology", files=files)
-        print_response(response)
-    finally:
-        for file in files.values():
-            file[1].close()
+    test_endpoint(api_url, 'analyze', ontology_path, pdf_path)
 
 def test_check_prock(api_url, ontology_path):
-    print("\nTesting /error_checking/check_prock endpoint:")
-    files = {
-        'ontology': ('test_ontology.ttl', open(ontology_path, 'rb'), 'text/turtle')
-    }
-    try:
-        response = requests.post(f"{api_url}/error_checking/check_prock", files=files)
-        print_response(response)
-    finally:
-        files['ontology'][1].close()
+    test_endpoint(api_url, 'check_prock', ontology_path, None)
 
 def test_check_oops(api_url, ontology_path):
-    print("\nTesting /error_checking/check_oops endpoint:")
-    files = {
-        'ontology': ('test_ontology.ttl', open(ontology_path, 'rb'), 'text/turtle')
-    }
-    try:
-        response = requests.post(f"{api_url}/error_checking/check_oops", files=files)
-        print_response(response)
-    finally:
-        files['ontology'][1].close()
+    test_endpoint(api_url, 'check_oops', ontology_path, None)
 
 def print_response(response):
     if response.status_code == 200:
@@ -70,7 +63,7 @@ def print_response(response):
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Test the Ontology Analysis API endpoints.")
-    parser.add_argument('--endpoint', choices=['metrics', 'document', 'analyze', 'check_prock', 'check_oops'],
+    parser.add_argument('--endpoint', choices=list(ENDPOINTS),
                         default='metrics', help="Specify which endpoint to test (default: metrics).")
     parser.add_argument('--api-url', default='http://localhost:5000',
                         help="The base URL of the API (default: http://localhost:5000)")
@@ -82,15 +75,6 @@ if __name__ == "__main__":
     args = parser.parse_args()
 
     try:
-        if args.endpoint == 'metrics':
-            test_ontology_metrics(args.api_url, args.ontology_path)
-        elif args.endpoint == 'document':
-            test_extract_document(args.api_url, args.pdf_path)
-        elif args.endpoint == 'analyze':
-            test_analyze_ontology(args.api_url, args.ontology_path, args.pdf_path)
-        elif args.endpoint == 'check_prock':
-            test_check_prock(args.api_url, args.ontology_path)
-        elif args.endpoint == 'check_oops':
-            test_check_oops(args.api_url, args.ontology_path)
+        test_endpoint(args.api_url, args.endpoint, args.ontology_path, args.pdf_path)
     except requests.RequestException as e:
-        print(f"An error occurred while making the request: {e}")
\ No newline at end of file
+        print(f"An error occurred while making the request: {e}")
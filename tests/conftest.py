@@ -0,0 +1,25 @@
+import os
+import sys
+import tempfile
+import pytest
+
+# Settings are read when config is first imported, so point every on-disk
+# store at a scratch directory
+_scratch = tempfile.mkdtemp(prefix='ontology-analysis-tests-')
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{os.path.join(_scratch, 'test.db')}")
+os.environ.setdefault('GRAPH_CACHE_DIR', os.path.join(_scratch, 'graph_cache'))
+os.environ.setdefault('PROFILE_DIR', os.path.join(_scratch, 'profiles'))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app
+    return create_app()
+
+
+@pytest.fixture
+def app_context(app):
+    with app.app_context():
+        yield app
@@ -0,0 +1,88 @@
+import io
+import threading
+import time
+import pytest
+import rdflib
+from models.parsed_ontology import ParsedOntology
+from services import analysis_processor
+from services.analysis_processor import AnalysisProcessor
+
+TURTLE = b"""@prefix owl: <http://www.w3.org/2002/07/owl#> .
+<http://example.org/A> a owl:Class .
+"""
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def stage(name, result):
+        def run(*args):
+            calls.append(name)
+            return result
+        return run
+
+    monkeypatch.setattr(analysis_processor.OntologyProcessor, 'process_ontology',
+                        stage('metrics', ({"Class count": 1}, None)))
+    monkeypatch.setattr(analysis_processor.DocumentProcessor, 'process_document',
+                        stage('document', ({"application_domain": "Testing", "competency_questions": ["Q?"]}, None)))
+    monkeypatch.setattr(analysis_processor.ErrorChecker, 'check_prock', stage('prock', []))
+    monkeypatch.setattr(analysis_processor.ErrorChecker, 'check_oops', stage('oops', []))
+    return calls
+
+
+def test_runs_every_stage_and_reports_timings(calls):
+    result, error = AnalysisProcessor.analyze(ParsedOntology(TURTLE, 'o.ttl'), io.BytesIO(b'%PDF'))
+    assert error is None
+    assert sorted(calls) == ['document', 'metrics', 'oops', 'prock']
+    assert result["application_domain"] == "Testing"
+    assert set(result["stage_timings"]) == {"ontology_metrics", "document", "prock", "oops"}
+
+
+def test_document_stage_runs_alongside_the_ontology_stage(calls, monkeypatch):
+    document_started = threading.Event()
+
+    def document(*args):
+        document_started.set()
+        return {"application_domain": "Testing"}, None
+
+    def metrics(*args):
+        # Would time out if the document stage only started after this one
+        assert document_started.wait(5)
+        return {"Class count": 1}, None
+
+    monkeypatch.setattr(analysis_processor.DocumentProcessor, 'process_document', document)
+    monkeypatch.setattr(analysis_processor.OntologyProcessor, 'process_ontology', metrics)
+    result, error = AnalysisProcessor.analyze(ParsedOntology(TURTLE, 'o.ttl'), io.BytesIO(b'%PDF'))
+    assert error is None and result["ontology_metrics"] == {"Class count": 1}
+
+
+def test_checkers_share_the_parse_and_skip_their_call_when_it_fails(monkeypatch):
+    # The real metrics stage parses; the checkers serialize the same ontology
+    monkeypatch.setattr(analysis_processor.DocumentProcessor, 'process_document',
+                        lambda document: ({"application_domain": "Testing"}, None))
+    requests = []
+
+    def checker(name):
+        def check(ontology):
+            turtle = ontology.turtle
+            requests.append(name)
+            return [len(turtle)]
+        return check
+
+    monkeypatch.setattr(analysis_processor.ErrorChecker, 'check_prock', checker('prock'))
+    monkeypatch.setattr(analysis_processor.ErrorChecker, 'check_oops', checker('oops'))
+    parses = []
+    parse = rdflib.Graph.parse
+    monkeypatch.setattr(rdflib.Graph, 'parse', lambda self, *args, **kwargs: parses.append(1) or parse(
+        self, *args, **kwargs))
+
+    result, error = AnalysisProcessor.analyze(ParsedOntology(TURTLE + b"# analyzed\n", 'o.ttl'), io.BytesIO(b'%PDF'))
+    assert error is None and sorted(requests) == ['oops', 'prock']
+    assert len(parses) == 1
+
+    requests.clear()
+    result, error = AnalysisProcessor.analyze(ParsedOntology(b"<not> turtle", 'o.ttl'), io.BytesIO(b'%PDF'))
+    assert result is None and error.startswith("Error processing ontology:")
+    time.sleep(0.1)
+    assert requests == []
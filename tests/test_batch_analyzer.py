@@ -0,0 +1,74 @@
+import io
+import json
+import os
+import zipfile
+from services import batch_analyzer
+from services.batch_analyzer import BatchAnalyzer
+
+
+def _analyze_or_exit(task, checks):
+    # Stands in for a parser that takes its worker process down
+    if os.path.basename(task[0]).startswith('crash'):
+        os._exit(1)
+    if os.path.basename(task[0]).startswith('raise'):
+        raise MemoryError('out of memory')
+    return {"filepath": task[0], "error": None}
+
+
+def _write(tmp_path, *names):
+    for name in names:
+        (tmp_path / name).write_text('<http://example.org/a> <http://example.org/b> <http://example.org/c> .\n')
+
+
+def test_analyzes_every_file(tmp_path):
+    _write(tmp_path, 'a.nt', 'b.nt', 'notes.txt')
+    records = list(BatchAnalyzer.run(str(tmp_path), max_workers=2))
+    assert sorted(os.path.basename(r["filepath"]) for r in records) == ['a.nt', 'b.nt']
+    assert all(r["error"] is None and r["ontology_metrics"] for r in records)
+
+
+def test_a_dying_worker_fails_only_its_own_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_analyzer, '_analyze_file', _analyze_or_exit)
+    _write(tmp_path, *[f"{name}.nt" for name in ('a', 'b', 'crash', 'c', 'd', 'e', 'f', 'raise', 'g')])
+
+    records = {os.path.basename(r["filepath"]): r["error"] for r in BatchAnalyzer.run(str(tmp_path), max_workers=2)}
+
+    assert len(records) == 9
+    assert "exited unexpectedly" in records.pop('crash.nt')
+    assert records.pop('raise.nt') == 'out of memory'
+    assert set(records.values()) == {None}
+
+
+def _upload(client, monkeypatch):
+    from api.routes import analysis_routes
+    archives = []
+    mkstemp = analysis_routes.tempfile.mkstemp
+
+    def recording_mkstemp(*args, **kwargs):
+        fd, path = mkstemp(*args, **kwargs)
+        archives.append(path)
+        return fd, path
+
+    monkeypatch.setattr(analysis_routes.tempfile, 'mkstemp', recording_mkstemp)
+    monkeypatch.setattr(batch_analyzer, '_analyze_file', _analyze_or_exit)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('a.nt', '<http://example.org/a> <http://example.org/b> <http://example.org/c> .\n')
+    buffer.seek(0)
+    response = client.post('/analysis/batch', data={'ontologies': (buffer, 'batch.zip')}, buffered=False)
+    return response, archives[0]
+
+
+def test_batch_route_removes_the_archive_once_the_response_is_sent(app, monkeypatch):
+    response, archive = _upload(app.test_client(), monkeypatch)
+    assert response.status_code == 200
+    assert [json.loads(line)["filepath"] for line in b''.join(response.response).splitlines()] == ['a.nt']
+    response.close()
+    assert not os.path.exists(archive)
+
+
+def test_batch_route_removes_the_archive_when_the_body_is_never_read(app, monkeypatch):
+    response, archive = _upload(app.test_client(), monkeypatch)
+    assert os.path.exists(archive)
+    response.close()
+    assert not os.path.exists(archive)
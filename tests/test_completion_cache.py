@@ -0,0 +1,59 @@
+import pytest
+from config import Config
+from services.completion_cache import CompletionCache
+from services.result_cache import ResultCache
+
+
+@pytest.fixture
+def cache():
+    cache = CompletionCache('test')
+    yield cache
+    ResultCache.instances.remove(cache)
+
+
+def test_key_covers_service_model_and_prompt():
+    keys = {
+        CompletionCache.prompt_hash('ollama', 'llama3', 'prompt'),
+        CompletionCache.prompt_hash('together', 'llama3', 'prompt'),
+        CompletionCache.prompt_hash('ollama', 'mistral', 'prompt'),
+        CompletionCache.prompt_hash('ollama', 'llama3', 'other prompt'),
+    }
+    assert len(keys) == 4
+
+
+def test_hits_report_the_llm_seconds_saved(cache):
+    assert cache.lookup('ollama', 'llama3', 'prompt') is None
+    cache.store('ollama', 'llama3', 'prompt', 'answer', 2.5)
+    assert cache.lookup('ollama', 'llama3', 'prompt') == 'answer'
+    assert cache.lookup('ollama', 'llama3', 'prompt') == 'answer'
+    assert cache.lookup('ollama', 'mistral', 'prompt') is None
+    assert cache.stats()["saved_llm_seconds"] == 5.0
+
+
+def test_database_entries_are_shared_per_prompt_version(app_context, cache):
+    cache.store('ollama', 'llama3', 'shared prompt', 'answer', 1.0)
+    same, newer = CompletionCache('test'), CompletionCache('newer')
+    try:
+        assert same.lookup('ollama', 'llama3', 'shared prompt') == 'answer'
+        assert newer.lookup('ollama', 'llama3', 'shared prompt') is None
+    finally:
+        ResultCache.instances.remove(same)
+        ResultCache.instances.remove(newer)
+
+
+def test_disabled_cache_stores_nothing(cache, monkeypatch):
+    monkeypatch.setattr(Config, 'LLM_CACHE_ENABLED', False)
+    cache.store('ollama', 'llama3', 'prompt', 'answer', 1.0)
+    assert cache.lookup('ollama', 'llama3', 'prompt') is None
+    monkeypatch.setattr(Config, 'LLM_CACHE_ENABLED', True)
+    assert cache.lookup('ollama', 'llama3', 'prompt') is None
+
+
+def test_cache_works_with_result_caching_disabled(app_context, cache, monkeypatch):
+    monkeypatch.setattr(Config, 'RESULT_CACHE_ENABLED', False)
+    cache.store('ollama', 'llama3', 'own switch', 'answer', 1.5)
+    cache.clear()
+    assert cache.lookup('ollama', 'llama3', 'own switch') == 'answer'
+    assert cache.lookup('ollama', 'llama3', 'own switch') == 'answer'
+    assert cache.stats()["db_hits"] == 1
+    assert cache.stats()["memory_hits"] == 1
@@ -0,0 +1,116 @@
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import has_app_context
+from benchmarks.sample_pdf import build_pdf
+from models.document_processor import DocumentProcessor as DocumentProcessorModel
+from services import instrumentation
+from services.document_processor import completion_cache, map_chunks
+
+
+def test_merge_results_keeps_the_common_domain_first_summary_and_distinct_questions():
+    merged = DocumentProcessorModel.merge_results([
+        {"application_domain": "Biology", "summary": "", "competency_questions": ["What is a cell?"]},
+        {"application_domain": "Chemistry", "summary": "About cells.",
+         "competency_questions": ["what is a cell", "Which cells divide?"]},
+        {"application_domain": " Chemistry ", "summary": "Later summary.",
+         "competency_questions": "Which proteins bind?"},
+    ])
+    assert merged == {
+        "application_domain": "Chemistry",
+        "summary": "About cells.",
+        "competency_questions": ["What is a cell?", "Which cells divide?", "Which proteins bind?"],
+    }
+
+
+def test_merge_results_of_empty_partials():
+    assert DocumentProcessorModel.merge_results([{}]) == {
+        "application_domain": "", "summary": "", "competency_questions": []}
+
+
+def test_map_chunks_runs_in_order_with_app_context_and_request_timings(app_context):
+    timings = []
+    token = instrumentation._request_timings.set(timings)
+    try:
+        def extract(chunk, number):
+            instrumentation.record_stage('llm', 0.5)
+            return chunk, number, has_app_context(), threading.current_thread().name
+
+        results = map_chunks(extract, ['a', 'b', 'c'], [1, 2, 3])
+    finally:
+        instrumentation._request_timings.reset(token)
+
+    assert [result[:3] for result in results] == [('a', 1, True), ('b', 2, True), ('c', 3, True)]
+    assert all(result[3].startswith('llm-chunk') for result in results)
+    assert timings == [('llm', 0.5)] * 3
+
+
+def test_completion_cache_database_tier_is_reached_from_chunk_threads(app_context):
+    completion_cache.store('ollama', 'model', 'chunk prompt', 'cached answer', 2.0)
+    completion_cache.clear()
+    before = completion_cache.stats()["db_hits"]
+
+    results = map_chunks(lambda prompt: completion_cache.lookup('ollama', 'model', prompt), ['chunk prompt'])
+
+    assert results == ['cached answer']
+    assert completion_cache.stats()["db_hits"] == before + 1
+
+
+class _WordEncoding:
+    # Stands in for tiktoken, which downloads its tables on first use
+    def encode(self, text):
+        return text.split()
+
+
+class _RecordingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = []
+
+    def submit(self, func, *args):
+        self.submitted.append(args)
+        return super().submit(func, *args)
+
+
+def _processor(pages_in_flight=2):
+    processor = DocumentProcessorModel.__new__(DocumentProcessorModel)
+    processor.encoding = _WordEncoding()
+    processor.pages_in_flight = pages_in_flight
+    return processor
+
+
+def _pdf(pages):
+    return build_pdf([f"Page {number} has six words." for number in range(1, pages + 1)])
+
+
+def test_parallel_extraction_matches_sequential_and_passes_a_path():
+    processor = _processor()
+    sequential = processor.extract_text_from_pdf(io.BytesIO(_pdf(7)))
+    with _RecordingExecutor() as executor:
+        parallel = processor.extract_text_from_pdf(io.BytesIO(_pdf(7)), executor=executor, pages_per_task=2)
+    assert parallel == sequential
+    assert "Page 7" in parallel
+    assert [args[1:] for args in executor.submitted] == [(0, 2), (2, 4), (4, 6), (6, 7)]
+    assert all(isinstance(args[0], str) and not os.path.exists(args[0]) for args in executor.submitted)
+
+
+def test_parallel_extraction_submits_lazily_and_stops_at_the_token_budget():
+    processor = _processor(pages_in_flight=2)
+    with _RecordingExecutor() as executor:
+        text = processor.extract_text_from_pdf(io.BytesIO(_pdf(40)), max_tokens=10, executor=executor,
+                                               pages_per_task=1)
+    # Five words per page, with a token of slack per page
+    assert text.count("Page") == 3
+    assert len(executor.submitted) <= 3 + 2
+
+
+def test_extraction_failure_is_logged_and_counted(caplog):
+    def failures():
+        return instrumentation.stage_errors._values.get(('pdf_extract',), 0)
+
+    before = failures()
+    with caplog.at_level('WARNING', logger='models.document_processor'):
+        assert _processor().extract_text_from_pdf(io.BytesIO(b'not a pdf')) is None
+    assert failures() == before + 1
+    assert "Failed to extract text from PDF" in caplog.text
@@ -0,0 +1,84 @@
+import os
+import numpy as np
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+from services.graph_cache import GraphCache
+
+EX = 'http://example.org/'
+
+
+def _graph(size=3):
+    graph = Graph()
+    graph.bind('ex', EX)
+    node = BNode()
+    for number in range(size):
+        graph.add((URIRef(f"{EX}s{number}"), URIRef(f"{EX}p"), Literal(number)))
+    graph.add((URIRef(f"{EX}s0"), URIRef(f"{EX}knows"), node))
+    graph.add((node, URIRef(f"{EX}label"), Literal("blank", lang='en')))
+    return graph
+
+
+def test_round_trip_keeps_the_graph(tmp_path):
+    cache = GraphCache(str(tmp_path))
+    graph = _graph()
+    assert cache.get('abc') is None
+    cache.put('abc', graph)
+    assert cache.contains('abc')
+
+    compact = cache.get('abc')
+    assert len(compact) == len(graph)
+    assert isomorphic(compact.to_graph(), graph)
+    assert set(compact.iter_triples()) == set(compact.to_graph())
+    assert cache.stats() == {"hits": 1, "misses": 1, "stores": 1, "evictions": 0}
+
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = GraphCache(str(tmp_path))
+    cache.put('abc', _graph())
+    prefix = cache._prefix('abc')
+    with open(f"{prefix}.json", 'w') as f:
+        f.write('{')
+    assert cache.get('abc') is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_least_recently_loaded_entries_are_evicted(tmp_path):
+    cache = GraphCache(str(tmp_path), max_bytes=10 ** 9)
+    for number, key in enumerate(('old', 'used', 'new')):
+        cache.put(key, _graph(50))
+        os.utime(f"{cache._prefix(key)}.npy", (number, number))
+    cache.get('old')
+
+    sizes = [os.path.getsize(path) for path in tmp_path.iterdir()]
+    cache.max_bytes = sum(sizes) - 1
+    cache.evict()
+
+    assert not cache.contains('used')
+    assert cache.contains('old') and cache.contains('new')
+    assert cache.stats()["evictions"] == 1
+
+
+def test_terms_are_memory_mapped_and_decoded_on_demand(tmp_path):
+    cache = GraphCache(str(tmp_path))
+    graph = _graph()
+    graph.add((URIRef(f"{EX}café"), URIRef(f"{EX}label"), Literal("ñandú", lang='es')))
+    cache.put('abc', graph)
+
+    compact = cache.get('abc')
+    for array in (compact.text, compact.offsets, compact.tags, compact.triples):
+        assert isinstance(array, np.memmap)
+    with open(f"{cache._prefix('abc')}.json", encoding='utf-8') as f:
+        assert 'café' not in f.read()
+    assert compact._terms is None
+    assert {compact.term(term_id) for term_id in range(compact.term_count)} >= {
+        URIRef(f"{EX}café"), Literal("ñandú", lang='es'), Literal(2)}
+    assert compact._terms is None
+    assert isomorphic(compact.to_graph(), graph)
+
+
+def test_entries_of_an_older_format_are_evicted(tmp_path):
+    cache = GraphCache(str(tmp_path), max_bytes=0)
+    for suffix in ('.npy', '.json'):
+        (tmp_path / f"old.v2{suffix}").write_bytes(b'x' * 10)
+    cache.evict()
+    assert list(tmp_path.iterdir()) == []
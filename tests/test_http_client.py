@@ -0,0 +1,89 @@
+import pytest
+import requests
+from error_checking.http_client import CheckerClient, CircuitBreaker, CircuitOpenError
+
+
+class FakeResponse:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def close(self):
+        pass
+
+
+class FakeSession:
+    # Replays a list of outcomes: a status code or an exception to raise
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.bodies = []
+
+    def post(self, url, data=None, **kwargs):
+        self.bodies.append(b''.join(data) if hasattr(data, '__next__') else data)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return FakeResponse(outcome)
+
+
+def client_with(outcomes, **kwargs):
+    endpoint = f"http://checker-{id(outcomes)}.test/api"
+    session = FakeSession(outcomes)
+    CheckerClient._sessions[f"http://checker-{id(outcomes)}.test"] = session
+    options = dict(max_retries=2, backoff_base=0, backoff_max=0, failure_threshold=2, reset_timeout=60)
+    options.update(kwargs)
+    return CheckerClient("Test", endpoint, 5, **options), session
+
+
+def test_retries_connection_errors_and_retryable_statuses():
+    client, session = client_with([requests.ConnectionError("down"), 503, 200])
+    assert client.post(b'body').status_code == 200
+    assert session.bodies == [b'body'] * 3
+    assert client.circuit.state == 'closed'
+
+
+def test_body_callable_is_called_for_every_attempt():
+    client, session = client_with([requests.ConnectionError("down"), 200])
+    client.post(lambda: iter([b'a', b'b']))
+    assert session.bodies == [b'ab', b'ab']
+
+
+def test_read_timeout_is_not_retried():
+    client, session = client_with([requests.ReadTimeout("slow"), 200])
+    with pytest.raises(requests.ReadTimeout):
+        client.post(b'body')
+    assert len(session.bodies) == 1
+
+
+def test_circuit_opens_after_consecutive_failures():
+    client, _ = client_with([requests.ConnectionError("down")] * 6, max_retries=0)
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            client.post(b'body')
+    with pytest.raises(CircuitOpenError):
+        client.post(b'body')
+
+
+@pytest.mark.parametrize('error', [
+    requests.exceptions.ChunkedEncodingError("truncated"),
+    requests.exceptions.InvalidHeader("bad header"),
+    ValueError("body callable failed"),
+])
+def test_unexpected_error_in_half_open_trial_does_not_wedge_the_circuit(error):
+    client, _ = client_with([error, 200], max_retries=0, failure_threshold=1, reset_timeout=0)
+    client.circuit.record_failure()
+    assert client.circuit.state == 'half-open'
+    with pytest.raises(type(error)):
+        client.post(b'body')
+    # The failed trial re-opened the circuit; with reset_timeout=0 the next
+    # call is another trial rather than being refused for good
+    assert client.post(b'body').status_code == 200
+    assert client.circuit.state == 'closed'
+
+
+def test_breaker_lets_a_single_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
@@ -0,0 +1,151 @@
+import io
+import threading
+import pytest
+from rdflib import OWL, RDF, RDFS, URIRef
+from models.parsed_ontology import ParsedOntology
+from services import incremental_metrics
+from services.incremental_metrics import IncrementalMetricsService
+from services.ontology_metrics import OntologyMetricsService
+
+EX = "http://example.org/incremental#"
+TURTLE = f"""@prefix owl: <http://www.w3.org/2002/07/owl#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix ex: <{EX}> .
+ex:A a owl:Class .
+ex:B a owl:Class ; rdfs:subClassOf ex:A .
+ex:p a owl:ObjectProperty .
+""".encode()
+
+
+def new_class(name):
+    return (URIRef(EX + name), RDF.type, OWL.Class)
+
+
+@pytest.fixture
+def base_hash():
+    incremental_metrics._states.clear()
+    ontology = ParsedOntology(TURTLE, 'base.ttl')
+    ontology.graph  # stores the graph in the graph cache
+    assert IncrementalMetricsService.has_version(ontology.content_hash)
+    return ontology.content_hash
+
+
+def full_metrics(turtle):
+    metrics, error = OntologyMetricsService.calculate_metrics(ParsedOntology(turtle, 'o.ttl'), False)
+    assert error is None
+    return metrics
+
+
+def test_delta_matches_a_full_recomputation(base_hash):
+    result, error = IncrementalMetricsService.apply_delta(
+        base_hash, [new_class('C'), (URIRef(EX + 'C'), RDFS.subClassOf, URIRef(EX + 'A'))],
+        [(URIRef(EX + 'B'), RDFS.subClassOf, URIRef(EX + 'A'))])
+    assert error is None
+    assert (result["added"], result["removed"]) == (2, 1)
+    edited = TURTLE.replace(b"ex:B a owl:Class ; rdfs:subClassOf ex:A .",
+                            b"ex:B a owl:Class .\nex:C a owl:Class ; rdfs:subClassOf ex:A .")
+    assert result["ontology_metrics"] == full_metrics(edited)
+    assert result["metrics_diff"]["Class count"] == {"old": 2, "new": 3, "change": 1}
+
+
+def test_base_version_survives_a_delta(base_hash):
+    first, _ = IncrementalMetricsService.apply_delta(base_hash, [new_class('C')], [])
+    second, _ = IncrementalMetricsService.apply_delta(base_hash, [new_class('D')], [])
+    assert first["ontology_hash"] != second["ontology_hash"]
+    assert first["ontology_metrics"] == second["ontology_metrics"]
+    chained, error = IncrementalMetricsService.apply_delta(first["ontology_hash"], [new_class('D')], [])
+    assert error is None and chained["ontology_metrics"]["Class count"] == 4
+
+
+def test_concurrent_deltas_on_a_derived_version_all_succeed(base_hash):
+    derived, _ = IncrementalMetricsService.apply_delta(base_hash, [new_class('C')], [])
+    results = []
+
+    def apply(name):
+        results.append(IncrementalMetricsService.apply_delta(derived["ontology_hash"], [new_class(name)], []))
+
+    threads = [threading.Thread(target=apply, args=(f"X{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert all(error is None for _, error in results)
+    assert {result["ontology_metrics"]["Class count"] for result, _ in results} == {4}
+
+
+def test_failed_delta_leaves_the_version_untouched(base_hash, monkeypatch):
+    derived, _ = IncrementalMetricsService.apply_delta(base_hash, [new_class('C')], [])
+
+    def broken_update(self, triples):
+        raise RuntimeError("index update failed")
+
+    monkeypatch.setattr(incremental_metrics.TripleIndex, 'update', broken_update)
+    result, error = IncrementalMetricsService.apply_delta(derived["ontology_hash"], [new_class('D')], [])
+    assert result is None and error == "index update failed"
+    monkeypatch.undo()
+
+    again, error = IncrementalMetricsService.apply_delta(derived["ontology_hash"], [], [])
+    assert error is None
+    assert again["ontology_metrics"] == derived["ontology_metrics"]
+
+
+def test_diff_against_a_new_version(base_hash):
+    edited = TURTLE + f"<{EX}C> a <http://www.w3.org/2002/07/owl#Class> .\n".encode()
+    result, error = IncrementalMetricsService.apply_version(base_hash, ParsedOntology(edited, 'v2.ttl'))
+    assert error is None
+    assert (result["added"], result["removed"]) == (1, 0)
+    assert result["ontology_metrics"] == full_metrics(edited)
+    assert IncrementalMetricsService.has_version(result["ontology_hash"])
+
+
+def test_unknown_version():
+    result, error = IncrementalMetricsService.apply_delta('0' * 64, [], [])
+    assert result is None and error.startswith("Unknown ontology version")
+
+
+def test_metrics_response_only_has_a_hash_for_known_versions(app, monkeypatch):
+    client = app.test_client()
+    upload = {'ontology': (io.BytesIO(TURTLE), 'o.ttl')}
+    response = client.post('/ontology/ontology_metrics', data=upload, content_type='multipart/form-data')
+    assert response.status_code == 200 and "ontology_hash" in response.get_json()
+
+    monkeypatch.setattr(IncrementalMetricsService, 'has_version', staticmethod(lambda ontology_hash: False))
+    upload = {'ontology': (io.BytesIO(TURTLE), 'o.ttl')}
+    response = client.post('/ontology/ontology_metrics', data=upload, content_type='multipart/form-data')
+    assert response.status_code == 200 and "ontology_hash" not in response.get_json()
+
+
+def test_a_delta_does_not_touch_the_whole_ontology(base_hash, monkeypatch):
+    base = incremental_metrics._get_state(base_hash)
+
+    def whole_ontology(*args):
+        raise AssertionError("the whole ontology was read")
+
+    monkeypatch.setattr(incremental_metrics.OntologyState, '__iter__', whole_ontology)
+    monkeypatch.setattr(incremental_metrics.TripleIndex, 'from_compact_graph', whole_ontology)
+    monkeypatch.setattr(incremental_metrics.TripleIndex, 'merge', whole_ontology)
+    result, error = IncrementalMetricsService.apply_delta(base_hash, [new_class('C')], [])
+    assert error is None
+
+    state = incremental_metrics._states[result["ontology_hash"]]
+    assert state.parent is base
+    assert state.added == {new_class('C')} and state.removed == frozenset()
+
+
+def test_long_chains_are_folded_and_stay_exact(base_hash, monkeypatch):
+    monkeypatch.setattr(incremental_metrics.Config, 'INCREMENTAL_MAX_CHAIN', 3)
+    sub_class = (URIRef(EX + 'B'), RDFS.subClassOf, URIRef(EX + 'A'))
+    edits = [([new_class('C')], []), ([], [sub_class]), ([new_class('D')], [new_class('C')]),
+             ([sub_class], []), ([new_class('E')], [new_class('A')]), ([new_class('C')], []),
+             ([], [new_class('D')])]
+    ontology_hash = base_hash
+    for added, removed in edits:
+        result, error = IncrementalMetricsService.apply_delta(ontology_hash, added, removed)
+        assert error is None
+        ontology_hash = result["ontology_hash"]
+        assert incremental_metrics._states[ontology_hash].depth <= 3
+
+    state = incremental_metrics._states[ontology_hash]
+    expected = TURTLE.replace(b"ex:A a owl:Class .\n", b"") + f"<{EX}C> a owl:Class .\n<{EX}E> a owl:Class .\n".encode()
+    assert result["ontology_metrics"] == full_metrics(expected)
+    assert set(state) == set(ParsedOntology(expected, 'o.ttl').graph)
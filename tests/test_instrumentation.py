@@ -0,0 +1,97 @@
+import pytest
+from flask import Flask
+from config import Config
+from services import instrumentation
+from services.instrumentation import Counter, Histogram, record_stage, server_timing
+
+
+@pytest.fixture
+def metric():
+    created = []
+
+    def create(cls, *args, **kwargs):
+        created.append(cls(*args, **kwargs))
+        return created[-1]
+
+    yield create
+    for metric in created:
+        instrumentation.registry.remove(metric)
+
+
+def test_histogram_buckets_are_cumulative_and_end_at_inf(metric):
+    histogram = metric(Histogram, 'test_seconds', 'Test durations', ['stage'], buckets=(0.1, 1, 10))
+    for value in (0.05, 0.1, 0.5, 5, 50):
+        histogram.observe(value, stage='parse')
+
+    assert histogram.render() == [
+        '# HELP ontology_analysis_test_seconds Test durations',
+        '# TYPE ontology_analysis_test_seconds histogram',
+        'ontology_analysis_test_seconds_bucket{stage="parse",le="0.1"} 2',
+        'ontology_analysis_test_seconds_bucket{stage="parse",le="1"} 3',
+        'ontology_analysis_test_seconds_bucket{stage="parse",le="10"} 4',
+        'ontology_analysis_test_seconds_bucket{stage="parse",le="+Inf"} 5',
+        'ontology_analysis_test_seconds_sum{stage="parse"} 55.65',
+        'ontology_analysis_test_seconds_count{stage="parse"} 5',
+    ]
+
+
+def test_label_values_are_escaped(metric):
+    counter = metric(Counter, 'test_total', 'Test events', ['reason'])
+    counter.inc(reason='a "quoted"\\path\nnext line')
+    counter.inc(2, reason='plain')
+
+    assert counter.render()[2:] == [
+        'ontology_analysis_test_total{reason="a \\"quoted\\"\\\\path\\nnext line"} 1',
+        'ontology_analysis_test_total{reason="plain"} 2',
+    ]
+
+
+def test_server_timing_sums_repeated_stages_in_first_seen_order():
+    timings = [('parse', 0.25), ('llm', 1.0), ('llm', 0.5), ('metrics', 0.0004), ('llm', 0.0015)]
+    assert server_timing(timings) == 'parse;dur=250.0, llm;dur=1501.5, metrics;dur=0.4'
+
+
+def _app(monkeypatch, enabled):
+    monkeypatch.setattr(Config, 'METRICS_ENABLED', enabled)
+    monkeypatch.setattr(Config, 'SERVER_TIMING_ENABLED', enabled)
+    app = Flask(__name__)
+    instrumentation.init_app(app)
+
+    @app.route('/work')
+    def work():
+        with instrumentation.stage('test_parse'):
+            pass
+        record_stage('test_llm', 0.5)
+        record_stage('test_llm', 0.25)
+        return 'done'
+
+    return app.test_client()
+
+
+def test_metrics_route_and_server_timing_header_when_enabled(monkeypatch):
+    client = _app(monkeypatch, True)
+
+    response = client.get('/work')
+    names = [entry.split(';')[0] for entry in response.headers['Server-Timing'].split(', ')]
+    assert names == ['test_parse', 'test_llm']
+    assert 'test_llm;dur=750.0' in response.headers['Server-Timing']
+    # Timings do not leak into the next request
+    assert 'test_llm;dur=750.0' in client.get('/work').headers['Server-Timing']
+
+    metrics = client.get('/metrics')
+    assert metrics.status_code == 200
+    assert metrics.mimetype == 'text/plain'
+    text = metrics.get_data(as_text=True)
+    assert '# TYPE ontology_analysis_stage_seconds histogram' in text
+    assert 'ontology_analysis_stage_seconds_bucket{stage="test_parse",le="+Inf"}' in text
+    assert 'ontology_analysis_stage_seconds_count{stage="test_llm"}' in text
+    assert '# TYPE ontology_analysis_result_cache_misses_total counter' in text
+
+
+def test_metrics_route_and_server_timing_header_when_disabled(monkeypatch):
+    client = _app(monkeypatch, False)
+
+    response = client.get('/work')
+    assert response.data == b'done'
+    assert 'Server-Timing' not in response.headers
+    assert client.get('/metrics').status_code == 404
@@ -0,0 +1,95 @@
+import io
+import pytest
+from werkzeug.datastructures import FileStorage
+from config import Config
+from extensions import db
+from models.job import Job
+from services.job_queue import JobQueue
+
+
+@pytest.fixture
+def queue(app_context, monkeypatch):
+    Job.query.delete()
+    db.session.commit()
+    handlers = {}
+
+    def add(name, handler):
+        handlers[name] = handler
+        monkeypatch.setitem(JobQueue.OPERATIONS, name, (handler, True, False))
+
+    yield add
+    db.session.rollback()
+    Job.query.delete()
+    db.session.commit()
+
+
+def submit(operation):
+    return JobQueue.submit(operation, FileStorage(io.BytesIO(b'<a> <b> <c> .'), filename='o.nt'))
+
+
+def test_claim_hands_a_job_out_once(queue):
+    queue('noop', lambda job, progress: ({}, None))
+    job = submit('noop')
+    claimed = JobQueue.claim('worker-1')
+    assert claimed.id == job.id and claimed.status == Job.RUNNING and claimed.attempts == 1
+    assert JobQueue.claim('worker-2') is None
+
+
+def test_run_records_result_and_progress(queue):
+    seen = []
+
+    def handler(job, progress):
+        progress(0.5)
+        seen.append(db.session.get(Job, job.id, populate_existing=True).progress)
+        return {"answer": 42}, None
+
+    queue('work', handler)
+    submit('work')
+    finished = JobQueue.run(JobQueue.claim('worker-1'))
+    assert seen == [0.5]
+    assert finished.status == Job.SUCCEEDED and finished.progress == 1.0
+    assert JobQueue.get_result(finished) == {"answer": 42}
+    assert finished.ontology_data is None
+
+
+def test_handler_errors_fail_the_job(queue):
+    def handler(job, progress):
+        raise RuntimeError("boom")
+
+    queue('broken', handler)
+    submit('broken')
+    finished = JobQueue.run(JobQueue.claim('worker-1'))
+    assert finished.status == Job.FAILED and finished.error == "boom"
+
+
+def test_deleting_a_running_job_discards_its_result(queue):
+    def handler(job, progress):
+        assert JobQueue.delete(job.id)
+        progress(0.5)
+        return {}, None
+
+    queue('deleted', handler)
+    job_id = submit('deleted').id
+    assert JobQueue.run(JobQueue.claim('worker-1')) is None
+    assert db.session.get(Job, job_id) is None
+
+
+def test_reclaimed_job_keeps_the_second_workers_outcome(queue, monkeypatch):
+    outcomes = iter([({"worker": 2}, None), ({"worker": 1}, None)])
+
+    def handler(job, progress):
+        if job.worker_id == 'worker-1':
+            # Worker 1 stalls past its lease; worker 2 re-claims and finishes first
+            monkeypatch.setattr(Config, 'JOB_LEASE_SECONDS', -1)
+            second = JobQueue.claim('worker-2')
+            monkeypatch.setattr(Config, 'JOB_LEASE_SECONDS', 3600)
+            assert second is not None and second.attempts == 2
+            assert JobQueue.run(second).status == Job.SUCCEEDED
+        return next(outcomes)
+
+    queue('slow', handler)
+    job_id = submit('slow').id
+    assert JobQueue.run(JobQueue.claim('worker-1')) is None
+    job = db.session.get(Job, job_id, populate_existing=True)
+    assert job.worker_id == 'worker-2'
+    assert JobQueue.get_result(job) == {"worker": 2}
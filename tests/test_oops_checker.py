@@ -0,0 +1,119 @@
+from xml.etree import ElementTree
+from config import Config
+from error_checking import oops_checker
+from error_checking.oops_checker import _read_pitfalls, _request_body
+
+
+def _pitfall(code, name, affected):
+    return f"""
+    <rdf:Description rdf:about="http://oops.linkeddata.es/data/{code}">
+        <rdf:type rdf:resource="http://oops.linkeddata.es/def#pitfall"/>
+        <oops:hasCode rdf:datatype="http://www.w3.org/2001/XMLSchema#string">{code}</oops:hasCode>
+        <oops:hasName rdf:datatype="http://www.w3.org/2001/XMLSchema#string">{name}</oops:hasName>
+        <oops:hasDescription rdf:datatype="http://www.w3.org/2001/XMLSchema#string">About {name} &amp; more</oops:hasDescription>
+        <oops:hasImportanceLevel rdf:datatype="http://www.w3.org/2001/XMLSchema#string">Minor</oops:hasImportanceLevel>
+        <oops:hasNumberAffectedElements rdf:datatype="http://www.w3.org/2001/XMLSchema#int">{affected}</oops:hasNumberAffectedElements>
+    </rdf:Description>"""
+
+
+def _affected_element(number):
+    return f"""
+    <rdf:Description rdf:about="http://oops.linkeddata.es/data/element{number}">
+        <oops:hasAffectedElement rdf:datatype="http://www.w3.org/2001/XMLSchema#anyURI">http://example.org/e{number}</oops:hasAffectedElement>
+    </rdf:Description>"""
+
+
+def _report(descriptions):
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"'
+        ' xmlns:oops="http://oops.linkeddata.es/def#">'
+        + ''.join(descriptions) + '\n</rdf:RDF>'
+    ).encode('utf-8')
+
+
+def _chunked(data, size):
+    return [data[start:start + size] for start in range(0, len(data), size)]
+
+
+REPORT = _report([_pitfall("P08", "Missing annotations", 12), _affected_element(1),
+                  _pitfall("P13", "Inverse relationships not explicitly declared", 3)])
+PITFALLS = [
+    {"name": "Missing annotations", "description": "About Missing annotations & more",
+     "importanceLevel": "Minor", "code": "P08", "numberAffectedElements": 12},
+    {"name": "Inverse relationships not explicitly declared",
+     "description": "About Inverse relationships not explicitly declared & more",
+     "importanceLevel": "Minor", "code": "P13", "numberAffectedElements": 3},
+]
+
+
+def test_report_in_one_chunk():
+    assert _read_pitfalls([REPORT]) == PITFALLS
+
+
+def test_report_split_inside_elements_and_multibyte_characters():
+    assert _read_pitfalls(_chunked(REPORT, 7)) == PITFALLS
+    assert _read_pitfalls(_chunked(REPORT, 1)) == PITFALLS
+
+    accented = _report([_pitfall("P22", "Nombres inconsistentes — ñandú", 1)])
+    assert [pitfall["name"] for pitfall in _read_pitfalls(_chunked(accented, 3))] == [
+        "Nombres inconsistentes — ñandú"]
+
+
+def test_unexpected_error_is_found_across_chunk_boundaries():
+    payload = b'<?xml version="1.0"?>\n<html><body>OOPS! unexpected_error while scanning</body></html>'
+    split = payload.index(b"unexpected_error") + 5
+    assert _read_pitfalls([payload[:split], payload[split:]]) is None
+    assert _read_pitfalls(_chunked(payload, 1)) is None
+
+
+def test_finished_descriptions_are_dropped_but_every_pitfall_is_kept(monkeypatch):
+    children = []
+
+    class RecordingParser(ElementTree.XMLPullParser):
+        root = None
+
+        def read_events(self):
+            for event, element in super().read_events():
+                if self.root is None:
+                    self.root = element
+                yield event, element
+            if self.root is not None:
+                children.append(len(self.root))
+
+    monkeypatch.setattr(oops_checker.ElementTree, "XMLPullParser", RecordingParser)
+    descriptions = []
+    for number in range(500):
+        descriptions.append(_pitfall(f"P{number:03d}", f"Pitfall {number}", number))
+        descriptions.append(_affected_element(number))
+    report = _report(descriptions)
+
+    pitfalls = _read_pitfalls(_chunked(report, 4096))
+
+    assert [pitfall["code"] for pitfall in pitfalls] == [f"P{number:03d}" for number in range(500)]
+    assert sum(pitfall["numberAffectedElements"] for pitfall in pitfalls) == sum(range(500))
+    assert len(children) > 100
+    assert max(children) <= 1
+
+
+def _old_request(owl_data):
+    # The envelope the checker built as one string before it was streamed
+    body = f"""<?xml version="1.0" encoding="UTF-8"?>
+                    <OOPSRequest>
+                        <OntologyURI></OntologyURI>
+                        <OntologyContent><![CDATA[{owl_data}]]></OntologyContent>
+                        <Pitfalls>P01,P02,P03,P04,P05,P06,P07,P08,P09,P10,P11,P12,P13,P14,P15,P16,P17,P18,P19,P20,P21,P22,P23,P24,P25,P26,P27,P28,P29,P30,P31,P32,P33,P34,P35,P36,P37,P38,P39,P40,P41</Pitfalls>
+                        <OutputFormat>RDF/XML</OutputFormat>
+                    </OOPSRequest>"""
+    return body.encode('utf-8')
+
+
+def test_request_body_is_byte_identical_to_the_old_request():
+    owl_data = '<rdf:RDF><owl:Class rdf:about="#Ñandú"/></rdf:RDF>\n' * 5000
+    assert len(owl_data) > 3 * oops_checker.CHUNK_SIZE
+
+    chunks = list(_request_body(owl_data, Config.OOPS_PITFALLS))
+
+    assert len(chunks) > 3
+    assert b''.join(chunks) == _old_request(owl_data)
+    assert b''.join(_request_body('', Config.OOPS_PITFALLS)) == _old_request('')
@@ -0,0 +1,47 @@
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from benchmarks.synthetic_ontology import generate_file
+from models.ontology_metrics import OntologyMetrics
+from models.streaming_index import line_ranges, parallel_triple_index, stream_triple_index
+
+
+@pytest.fixture(scope='module')
+def ntriples(tmp_path_factory):
+    path = tmp_path_factory.mktemp('parallel') / 'synthetic.nt'
+    generate_file(str(path), triples=3000, seed=11)
+    return path.read_bytes()
+
+
+@pytest.fixture(scope='module')
+def executor():
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        yield executor
+
+
+def metrics(index):
+    return OntologyMetrics(index=index).calculate_ontology_metrics()
+
+
+def test_line_ranges_cover_the_input_at_line_breaks(ntriples):
+    ranges = list(line_ranges(ntriples, 4096))
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(ntriples)
+    assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+    assert all(ntriples[end - 1:end] == b'\n' for _, end in ranges)
+
+
+@pytest.mark.parametrize('chunk_bytes', [2048, 64 * 1024, 1 << 30])
+def test_parallel_index_matches_the_streaming_index(ntriples, executor, chunk_bytes):
+    # Small chunks split blank-node class expressions across chunks
+    parallel = parallel_triple_index(ntriples, executor, chunk_bytes, 4)
+    streamed = stream_triple_index(data=ntriples, format='nt')
+    assert parallel.triple_count == streamed.triple_count
+    assert metrics(parallel) == metrics(streamed)
+
+
+def test_triples_repeated_across_chunks_are_counted_once(ntriples, executor):
+    lines = ntriples.splitlines(keepends=True)
+    repeated = ntriples + b''.join(lines[:200])
+    parallel = parallel_triple_index(repeated, executor, 2048, 4)
+    streamed = stream_triple_index(data=ntriples, format='nt')
+    assert parallel.triple_count == streamed.triple_count
+    assert metrics(parallel) == metrics(streamed)
@@ -0,0 +1,115 @@
+import pstats
+import threading
+import pytest
+from config import Config
+from services import profiler
+
+TOKEN = 'secret-admin-token'
+
+
+@pytest.fixture
+def client(app, monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'ADMIN_TOKEN', TOKEN)
+    monkeypatch.setattr(Config, 'PROFILE_DIR', str(tmp_path))
+    return app.test_client()
+
+
+def profiled_get(client, token=TOKEN):
+    headers = {'X-Profile': '1'}
+    if token is not None:
+        headers['X-Admin-Token'] = token
+    return client.get('/analysis/in_flight', headers=headers)
+
+
+def test_tokens_are_compared_in_constant_time(monkeypatch):
+    compared = []
+
+    def compare_digest(a, b):
+        compared.append((a, b))
+        return a == b
+
+    monkeypatch.setattr(Config, 'ADMIN_TOKEN', TOKEN)
+    monkeypatch.setattr(profiler.hmac, 'compare_digest', compare_digest)
+    assert profiler.is_admin(TOKEN)
+    assert not profiler.is_admin('wrong')
+    assert not profiler.is_admin(None)
+    assert compared == [(TOKEN, TOKEN), ('wrong', TOKEN)]
+
+    monkeypatch.setattr(Config, 'ADMIN_TOKEN', None)
+    assert not profiler.is_admin(TOKEN)
+
+
+@pytest.mark.parametrize('token', [None, 'wrong'])
+def test_profiling_and_profiles_require_the_admin_token(client, token):
+    assert profiled_get(client, token).status_code == 403
+    headers = {} if token is None else {'X-Admin-Token': token}
+    assert client.get('/profiles', headers=headers).status_code == 403
+    assert client.get(f"/profiles/{'0' * 32}", headers=headers).status_code == 403
+
+
+def test_profiled_request_is_stored_and_downloadable(client, tmp_path):
+    response = profiled_get(client)
+    assert response.status_code == 200
+    profile_id = response.headers['X-Profile-Id']
+
+    listed = client.get('/profiles', headers={'X-Admin-Token': TOKEN}).get_json()
+    assert [meta["profile_id"] for meta in listed] == [profile_id]
+    assert listed[0]["file"] == f"{profile_id}.prof" and listed[0]["top_functions"]
+
+    download = client.get(f"/profiles/{profile_id}", headers={'X-Admin-Token': TOKEN})
+    assert download.status_code == 200
+    path = tmp_path / 'downloaded.prof'
+    path.write_bytes(download.data)
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_unknown_or_malformed_profile_ids_are_not_found(client):
+    headers = {'X-Admin-Token': TOKEN}
+    assert client.get(f"/profiles/{'0' * 32}", headers=headers).status_code == 404
+    assert client.get('/profiles/..%2Fconfig', headers=headers).status_code == 404
+
+
+def test_stage_threads_are_sampled_not_cprofiled():
+    session = profiler.ProfileSession('cprofile', 'GET', '/')
+    request_profile = session.begin_thread(request_thread=True)
+    assert request_profile is not None
+    stage_profile, sampled = [], []
+
+    def stage():
+        stage_profile.append(session.begin_thread())
+        sampled.append(threading.get_ident() in session.threads)
+        session.end_thread(stage_profile[0])
+
+    thread = threading.Thread(target=stage)
+    thread.start()
+    thread.join()
+    session.end_thread(request_profile)
+    profiler._sampler.unwatch(session)
+    assert stage_profile == [None] and sampled == [True]
+    assert session.stats() is not None
+
+
+def test_a_second_profiled_request_is_sampled_instead(client):
+    # Another request holds the process-wide cProfile
+    other = profiler.ProfileSession('cprofile', 'GET', '/')
+    held = other.begin_thread(request_thread=True)
+    try:
+        response = profiled_get(client)
+    finally:
+        other.end_thread(held)
+    assert response.status_code == 200
+    meta = client.get('/profiles', headers={'X-Admin-Token': TOKEN}).get_json()[0]
+    assert meta["profile_id"] == response.headers['X-Profile-Id']
+    assert meta["file"].endswith('.samples.json')
+
+
+def test_unavailable_cprofile_falls_back_to_sampling(client, monkeypatch):
+    class Busy:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiler.cProfile, 'Profile', Busy)
+    response = profiled_get(client)
+    assert response.status_code == 200
+    assert profiler._start_cprofile() is None
+    assert not profiler._cprofile_active
@@ -0,0 +1,70 @@
+import uuid
+import pytest
+from models.cache_entry import CacheEntry
+from services.result_cache import ResultCache
+
+
+@pytest.fixture
+def make_cache():
+    caches = []
+
+    def make(**kwargs):
+        cache = ResultCache(f"test-{uuid.uuid4().hex[:8]}", '1', **kwargs)
+        caches.append(cache)
+        return cache
+    yield make
+    for cache in caches:
+        ResultCache.instances.remove(cache)
+
+
+def _db_keys(cache):
+    return sorted(entry.key.rsplit(':', 1)[1] for entry in CacheEntry.query.filter_by(namespace=cache.namespace))
+
+
+def test_hits_hand_out_copies(make_cache):
+    cache = make_cache()
+    cache.set('a', {"count": [1]})
+    first = cache.get('a')
+    first["count"].append(2)
+    assert cache.get('a') == {"count": [1]}
+    assert cache.get('missing') is None
+    assert cache.stats()["memory_hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_memory_tier_is_bounded_by_entries_and_bytes(make_cache):
+    cache = make_cache(max_entries=2, max_bytes=40)
+    cache.set('a', 'x' * 10)
+    cache.set('b', 'x' * 10)
+    cache.get('a')
+    cache.set('c', 'x' * 10)
+    assert list(cache._entries) == [cache.make_key('a'), cache.make_key('c')]
+    cache.set('big', 'x' * 50)
+    assert cache.make_key('big') not in cache._entries
+    assert cache.stats()["memory_bytes"] <= 40
+
+
+def test_database_tier_serves_misses_in_memory(app_context, make_cache):
+    cache = make_cache()
+    cache.set('a', {"value": 1})
+    cache.clear()
+    assert cache.get('a') == {"value": 1}
+    assert cache.get('a') == {"value": 1}
+    assert cache.stats()["db_hits"] == 1 and cache.stats()["memory_hits"] == 1
+
+
+def test_database_tier_is_bounded_by_entries(app_context, make_cache):
+    cache = make_cache(db_max_entries=2)
+    for key in 'abc':
+        cache.set(key, key)
+    assert _db_keys(cache) == ['b', 'c']
+
+
+def test_database_tier_is_bounded_by_bytes(app_context, make_cache):
+    # Each payload is 12 bytes of JSON
+    cache = make_cache(db_max_bytes=30)
+    for key in 'abc':
+        cache.set(key, 'x' * 10)
+    assert _db_keys(cache) == ['b', 'c']
+    cache.set('big', 'x' * 100)
+    assert _db_keys(cache) == []
+    assert cache.stats()["evictions"] >= 4
@@ -0,0 +1,74 @@
+import threading
+import pytest
+from services.single_flight import SingleFlight
+
+
+@pytest.fixture
+def flight():
+    flight = SingleFlight('test')
+    yield flight
+    SingleFlight.instances.remove(flight)
+
+
+def _run_concurrently(flight, key, func, callers):
+    results, errors = [None] * callers, [None] * callers
+
+    def call(index):
+        try:
+            results[index] = flight.do(key, func)
+        except Exception as e:
+            errors[index] = e
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def _wait_for_waiters(flight, count):
+    while flight.stats()["waiting"] < count:
+        threading.Event().wait(0.001)
+
+
+def test_concurrent_calls_run_once_and_get_copies(flight):
+    release, calls = threading.Event(), []
+
+    def compute():
+        calls.append(1)
+        release.wait()
+        return {"count": [1]}
+
+    threads, results, errors = _run_concurrently(flight, 'key', compute, 4)
+    _wait_for_waiters(flight, 3)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert errors == [None] * 4
+    assert results == [{"count": [1]}] * 4
+    assert len({id(result) for result in results}) == 4
+    assert flight.stats() == {"name": "test", "in_flight": 0, "waiting": 0, "leaders": 1,
+                              "coalesced": 3, "max_waiters": 3}
+
+
+def test_waiters_get_the_leaders_exception(flight):
+    release = threading.Event()
+
+    def compute():
+        release.wait()
+        raise ValueError('failed')
+
+    threads, results, errors = _run_concurrently(flight, 'key', compute, 3)
+    _wait_for_waiters(flight, 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert [str(error) for error in errors] == ['failed'] * 3
+
+
+def test_finished_calls_are_not_kept(flight):
+    assert flight.do('key', lambda: 1) == 1
+    assert flight.do('key', lambda: 2) == 2
+    assert flight.stats()["leaders"] == 2
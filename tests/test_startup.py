@@ -0,0 +1,8 @@
+import os
+from benchmarks import startup_benchmark
+
+
+def test_default_configuration_starts_without_the_heavy_modules(tmp_path):
+    env = {key: value for key, value in os.environ.items() if key not in startup_benchmark.WARMUP_SETTINGS}
+    env['DATABASE_URL'] = f"sqlite:///{tmp_path / 'startup.db'}"
+    assert startup_benchmark.measure(env, timeout=120)["heavy_modules"] == []
@@ -0,0 +1,116 @@
+import pytest
+import rdflib
+from benchmarks.synthetic_ontology import generate_file
+from models.compact_graph import CompactGraph
+from models.ontology_metrics import OntologyMetrics
+from models.streaming_index import IndexingStore, stream_triple_index
+from models.triple_index import IndexOverlay, TripleIndex
+
+
+@pytest.fixture(scope='module')
+def synthetic(tmp_path_factory):
+    # A few thousand triples with restrictions, individuals and blank-node GCIs
+    directory = tmp_path_factory.mktemp('synthetic')
+    paths = {}
+    for format in ('ttl', 'nt'):
+        paths[format] = str(directory / f"synthetic.{format}")
+        generate_file(paths[format], triples=3000, seed=7)
+    return paths
+
+
+def metrics(index):
+    return OntologyMetrics(index=index).calculate_ontology_metrics()
+
+
+def graph_metrics(data, format):
+    graph = rdflib.Graph().parse(data=data, format=format)
+    return OntologyMetrics(graph).calculate_ontology_metrics()
+
+
+@pytest.mark.parametrize('format', ['ttl', 'nt'])
+def test_streaming_index_matches_the_graph(synthetic, format):
+    rdf_format = 'turtle' if format == 'ttl' else 'nt'
+    with open(synthetic[format], 'rb') as f:
+        data = f.read()
+    assert metrics(stream_triple_index(data=data, format=rdf_format)) == graph_metrics(data, rdf_format)
+
+
+def test_streaming_counts_repeated_triples_once(synthetic):
+    with open(synthetic['nt'], 'rb') as f:
+        data = f.read()
+    lines = data.splitlines(keepends=True)
+    repeated = data + b''.join(lines[::3])
+    streamed = stream_triple_index(data=repeated, format='nt')
+    assert streamed.triple_count == len(rdflib.Graph().parse(data=data, format='nt'))
+    assert metrics(streamed) == graph_metrics(repeated, 'nt')
+
+
+class _CollidingURIRef(rdflib.URIRef):
+    def __hash__(self):
+        return 0
+
+
+def test_streaming_keeps_distinct_triples_whose_hashes_collide():
+    store = IndexingStore(TripleIndex())
+    first = (_CollidingURIRef('http://example.org/a'), rdflib.RDF.type, rdflib.OWL.Class)
+    second = (_CollidingURIRef('http://example.org/b'), rdflib.RDF.type, rdflib.OWL.Class)
+    assert hash(first) == hash(second)
+    assert store.add_new(first) is not None
+    assert store.add_new(second) is not None
+    assert store.add_new(first) is None
+    store.flush()
+    assert store.index.triple_count == 2
+
+
+def test_numpy_and_python_indexes_agree(synthetic):
+    graph = rdflib.Graph().parse(synthetic['ttl'], format='turtle')
+    compact = CompactGraph.from_graph(graph)
+    vectorized = TripleIndex.from_compact_graph(compact)
+    assert metrics(vectorized) == metrics(TripleIndex.from_triples(compact.iter_triples()))
+    assert metrics(vectorized) == metrics(TripleIndex.from_triples(graph))
+
+
+def test_merge_and_subtract(synthetic):
+    triples = list(rdflib.Graph().parse(synthetic['ttl'], format='turtle'))
+    whole = TripleIndex.from_triples(triples)
+    first, second = TripleIndex.from_triples(triples[:1000]), TripleIndex.from_triples(triples[1000:])
+    merged = TripleIndex()
+    merged.merge(first)
+    merged.merge(second)
+    assert metrics(merged) == metrics(whole)
+    assert metrics(first) == metrics(TripleIndex.from_triples(triples[:1000]))
+    merged.subtract(second)
+    assert metrics(merged) == metrics(first)
+
+
+def test_metrics_service_gives_the_same_result_on_both_paths(synthetic):
+    from models.parsed_ontology import ParsedOntology
+    from services.ontology_metrics import OntologyMetricsService
+    with open(synthetic['nt'], 'rb') as f:
+        data = f.read()
+    # Repeated lines, and content no other test has put in the graph cache
+    data += b''.join(data.splitlines(keepends=True)[::5]) + b'<urn:path> <urn:test> "both" .\n'
+    streamed, error = OntologyMetricsService.calculate_metrics(ParsedOntology(data, 'o.nt'), True)
+    assert error is None
+    in_memory, error = OntologyMetricsService.calculate_metrics(ParsedOntology(data, 'o.nt'), False)
+    assert error is None
+    assert streamed == in_memory
+
+
+def test_overlay_matches_a_full_index_after_changes(synthetic):
+    # Removing and re-adding slices touches GCIs, equivalences and qualified restrictions
+    triples = list(rdflib.Graph().parse(synthetic['nt'], format='nt'))
+    ex = rdflib.Namespace('http://example.org/hidden#')
+    for number in range(10):
+        triples += [(ex[f"C{number}"], rdflib.OWL.equivalentClass, ex[f"D{number}"]),
+                    (ex[f"C{number}"], rdflib.RDFS.subClassOf, ex.A)]
+    overlay = IndexOverlay.over(TripleIndex.from_triples(triples))
+    current = set(triples)
+    for step in range(4):
+        removed = set(triples[step::5])
+        added = set(triples[step + 1::7]) - current
+        removed &= current
+        overlay = overlay.derive(TripleIndex.from_triples(added), TripleIndex.from_triples(removed))
+        current = (current - removed) | added
+        assert metrics(overlay) == metrics(TripleIndex.from_triples(current))
+        assert overlay.triple_count == len(current)
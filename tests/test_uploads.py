@@ -0,0 +1,108 @@
+import gzip
+import io
+import mmap
+import zipfile
+import pytest
+from werkzeug.datastructures import FileStorage
+from werkzeug.exceptions import HTTPException
+from api.uploads import load_ontology
+from config import Config
+from utils.upload_utils import UploadTooLarge, read_ontology_upload
+
+TURTLE = b"@prefix ex: <http://example.org/> .\nex:Cell a ex:Thing .\n"
+RDF_XML = (b'<?xml version="1.0"?>\n<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#">'
+           b'<rdf:Description rdf:about="http://example.org/Cell"/></rdf:RDF>\n')
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+def test_plain_upload_is_read_into_memory():
+    data, name = read_ontology_upload(io.BytesIO(TURTLE), 'cell.ttl')
+    assert (data, name) == (TURTLE, 'cell.ttl')
+
+
+def test_gzipped_upload_is_decompressed_and_keeps_the_inner_name():
+    data, name = read_ontology_upload(io.BytesIO(gzip.compress(TURTLE)), 'cell.ttl.gz')
+    assert (bytes(data), name) == (TURTLE, 'cell.ttl')
+
+
+def test_zip_upload_yields_its_one_ontology_also_when_gzipped_inside():
+    archive = _zip({'README.txt': b'notes', 'onto/cell.owl': RDF_XML})
+    data, name = read_ontology_upload(archive, 'upload.zip')
+    assert (bytes(data), name) == (RDF_XML, 'onto/cell.owl')
+
+    archive = _zip({'cell.ttl.gz': gzip.compress(TURTLE)})
+    data, name = read_ontology_upload(archive, 'upload.zip')
+    assert (bytes(data), name) == (TURTLE, 'cell.ttl')
+
+
+def test_zip_upload_needs_exactly_one_ontology():
+    with pytest.raises(ValueError, match="exactly one ontology file"):
+        read_ontology_upload(_zip({'a.ttl': TURTLE, 'b.owl': RDF_XML}), 'upload.zip')
+    with pytest.raises(ValueError, match="found 0"):
+        read_ontology_upload(_zip({'README.txt': b'notes'}), 'upload.zip')
+
+
+def test_decompressed_size_is_limited(monkeypatch):
+    monkeypatch.setattr(Config, 'MAX_DECOMPRESSED_BYTES', 1000)
+    # Small enough to pass as an upload, far too big once decompressed
+    bomb = gzip.compress(b' ' * 100000)
+    assert len(bomb) < 1000
+    with pytest.raises(UploadTooLarge):
+        read_ontology_upload(io.BytesIO(bomb), 'bomb.ttl.gz')
+    with pytest.raises(UploadTooLarge):
+        read_ontology_upload(_zip({'bomb.ttl': b' ' * 100000}), 'bomb.zip')
+    with pytest.raises(UploadTooLarge):
+        read_ontology_upload(_zip({'bomb.ttl.gz': bomb}), 'bomb.zip')
+
+
+def test_corrupt_archives_are_rejected_as_bad_input():
+    with pytest.raises(ValueError, match="Corrupt compressed upload"):
+        read_ontology_upload(io.BytesIO(b'not gzip at all'), 'cell.ttl.gz')
+    with pytest.raises(ValueError, match="Corrupt compressed upload"):
+        read_ontology_upload(io.BytesIO(gzip.compress(TURTLE)[:20]), 'cell.ttl.gz')
+    with pytest.raises(ValueError, match="Corrupt compressed upload"):
+        read_ontology_upload(io.BytesIO(b'PK not a zip'), 'upload.zip')
+
+
+def test_uploads_above_the_spool_size_are_memory_mapped(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'UPLOAD_SPOOL_BYTES', 64)
+    path = tmp_path / 'cell.ttl'
+    path.write_bytes(TURTLE * 10)
+    with open(path, 'rb') as f:
+        data, name = read_ontology_upload(f, 'cell.ttl')
+    assert isinstance(data, mmap.mmap)
+    assert (data[:], name) == (TURTLE * 10, 'cell.ttl')
+
+    # Decompressed contents outgrowing the spool size go to a temporary file
+    data, name = read_ontology_upload(io.BytesIO(gzip.compress(TURTLE * 10)), 'cell.ttl.gz')
+    assert isinstance(data, mmap.mmap)
+    assert data[:] == TURTLE * 10
+
+    # Small uploads stay in memory
+    data, _ = read_ontology_upload(io.BytesIO(TURTLE), 'cell.ttl')
+    assert isinstance(data, bytes)
+
+
+def _status(ontology_file):
+    with pytest.raises(HTTPException) as error:
+        load_ontology(ontology_file)
+    return error.value.code
+
+
+def test_load_ontology_maps_upload_errors_to_http_statuses(app, monkeypatch):
+    with app.test_request_context():
+        ontology = load_ontology(FileStorage(io.BytesIO(gzip.compress(TURTLE)), 'cell.ttl.gz'))
+        assert (bytes(ontology.data), ontology.format) == (TURTLE, 'turtle')
+
+        assert _status(FileStorage(io.BytesIO(TURTLE), 'cell.txt')) == 400
+        assert _status(FileStorage(io.BytesIO(b'garbage'), 'cell.ttl.gz')) == 400
+        monkeypatch.setattr(Config, 'MAX_DECOMPRESSED_BYTES', 10)
+        assert _status(FileStorage(io.BytesIO(gzip.compress(TURTLE)), 'cell.ttl.gz')) == 413
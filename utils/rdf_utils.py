@@ -1,10 +1,13 @@
 from rdflib import Graph
+from models.parsed_ontology import ParsedOntology
 import logging
 
 logger = logging.getLogger(__name__)
 
 def validate_and_convert_to_owl(rdf_data):
     try:
+        if isinstance(rdf_data, ParsedOntology):
+            return rdf_data.rdf_xml
         g = Graph()
         g.parse(data=rdf_data, format="turtle")
         return g.serialize(format='xml')
@@ -0,0 +1,127 @@
+import gzip
+import io
+import mmap
+import os
+import tempfile
+import zipfile
+from config import Config
+
+# rdflib parser per ontology file extension; any of them may also be gzipped
+ONTOLOGY_FORMATS = {
+    '.ttl': 'turtle',
+    '.nt': 'nt',
+    '.owl': 'xml',
+    '.rdf': 'xml',
+}
+COPY_CHUNK_SIZE = 1024 * 1024
+
+class UploadTooLarge(ValueError):
+    pass
+
+def _strip_gz(filename):
+    return filename[:-len('.gz')] if filename.lower().endswith('.gz') else filename
+
+def ontology_format(filename):
+    return ONTOLOGY_FORMATS.get(os.path.splitext(_strip_gz(filename or '').lower())[1])
+
+def is_supported_ontology(filename):
+    return bool(filename) and (filename.lower().endswith('.zip') or ontology_format(filename) is not None)
+
+def sniff_format(head):
+    # For files without a telling extension (e.g. inside a zip archive)
+    head = bytes(head).lstrip(b'\xef\xbb\xbf \t\r\n')
+    if head.startswith((b'<?xml', b'<rdf:RDF', b'<!DOCTYPE rdf')):
+        return 'xml'
+    return 'turtle'
+
+class BufferReader(io.RawIOBase):
+    # A read-only file over a bytes object or memory map that does not copy it
+    def __init__(self, buffer):
+        self._view = memoryview(buffer)
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        count = min(len(b), len(self._view) - self._position)
+        b[:count] = self._view[self._position:self._position + count]
+        self._position += count
+        return count
+
+def open_buffer(buffer):
+    return io.BufferedReader(BufferReader(buffer), COPY_CHUNK_SIZE)
+
+def _map_file(f):
+    f.flush()
+    if os.fstat(f.fileno()).st_size == 0:
+        return b''
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+def _buffer(stream):
+    # Small uploads are read into memory; larger ones are already spooled to
+    # disk by the server (or are files on disk) and are memory-mapped.
+    try:
+        stream.seek(0, os.SEEK_END)
+        size = stream.tell()
+        stream.seek(0)
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        size = None
+    if size is not None and size > Config.UPLOAD_SPOOL_BYTES:
+        try:
+            return _map_file(stream)
+        except (AttributeError, OSError, io.UnsupportedOperation, ValueError):
+            pass
+    return _spool(stream, None)
+
+def _spool(reader, limit):
+    # Copies a stream in chunks into memory, or into an anonymous temporary
+    # file once it outgrows UPLOAD_SPOOL_BYTES, refusing more than `limit` bytes
+    chunks, size, spooled = [], 0, None
+    while True:
+        chunk = reader.read(COPY_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if limit is not None and size > limit:
+            raise UploadTooLarge(f"Uncompressed ontology exceeds the limit of {limit} bytes")
+        if spooled is None and size > Config.UPLOAD_SPOOL_BYTES:
+            spooled = tempfile.TemporaryFile()
+            spooled.writelines(chunks)
+            chunks = None
+        if spooled is None:
+            chunks.append(chunk)
+        else:
+            spooled.write(chunk)
+    if spooled is None:
+        return b''.join(chunks)
+    with spooled:
+        return _map_file(spooled)
+
+def read_ontology_upload(stream, filename):
+    # The contents of an uploaded ontology as one buffer (bytes or a read-only
+    # memory map), decompressing .gz files and single-ontology .zip archives,
+    # and the name of the file the contents came from.
+    filename = filename or ''
+    try:
+        if filename.lower().endswith('.zip'):
+            with zipfile.ZipFile(stream) as archive:
+                members = [info for info in archive.infolist()
+                           if not info.is_dir() and ontology_format(info.filename) is not None]
+                if len(members) != 1:
+                    raise ValueError("A zip archive must contain exactly one ontology file "
+                                     f"({', '.join(sorted(ONTOLOGY_FORMATS))}), found {len(members)}")
+                if members[0].file_size > Config.MAX_DECOMPRESSED_BYTES:
+                    raise UploadTooLarge(f"Uncompressed ontology exceeds the limit of "
+                                         f"{Config.MAX_DECOMPRESSED_BYTES} bytes")
+                name = members[0].filename
+                with archive.open(members[0]) as member:
+                    if name.lower().endswith('.gz'):
+                        return read_ontology_upload(member, name)
+                    return _spool(member, Config.MAX_DECOMPRESSED_BYTES), name
+        if filename.lower().endswith('.gz'):
+            with gzip.GzipFile(fileobj=stream) as decompressed:
+                return _spool(decompressed, Config.MAX_DECOMPRESSED_BYTES), _strip_gz(filename)
+    except (zipfile.BadZipFile, gzip.BadGzipFile, EOFError) as e:
+        raise ValueError(f"Corrupt compressed upload: {e}")
+    return _buffer(stream), filename
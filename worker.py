@@ -0,0 +1,55 @@
+import argparse
+import logging
+import os
+import socket
+import time
+from app import create_app
+from config import Config
+from extensions import db
+from services.job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+EXPIRY_INTERVAL = 60
+
+def run_worker(worker_id, poll_interval, burst=False):
+    app = create_app()
+    with app.app_context():
+        logger.info(f"Worker {worker_id} polling for jobs")
+        last_expiry = 0
+        while True:
+            if time.monotonic() - last_expiry > EXPIRY_INTERVAL:
+                JobQueue.expire()
+                last_expiry = time.monotonic()
+
+            job = JobQueue.claim(worker_id)
+            if job is None:
+                if burst:
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            job_id = job.id
+            logger.info(f"Running job {job_id} ({job.operation}, attempt {job.attempts})")
+            try:
+                job = JobQueue.run(job)
+                if job is not None:
+                    logger.info(f"Job {job_id} {job.status}")
+            except Exception:
+                # A database error must not stop the worker; the job's lease
+                # expires and another attempt picks it up
+                logger.exception(f"Could not record the outcome of job {job_id}")
+                db.session.rollback()
+            db.session.remove()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Process queued analysis jobs.")
+    parser.add_argument('--worker-id', default=f"{socket.gethostname()}:{os.getpid()}",
+                        help="Identifier recorded on claimed jobs (default: hostname:pid)")
+    parser.add_argument('--poll-interval', type=float, default=Config.JOB_POLL_INTERVAL,
+                        help="Seconds to wait when the queue is empty")
+    parser.add_argument('--burst', action='store_true',
+                        help="Exit once the queue is empty instead of polling")
+    args = parser.parse_args()
+
+    run_worker(args.worker_id, args.poll_interval, args.burst)